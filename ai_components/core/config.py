@@ -86,6 +86,12 @@ class Settings(BaseSettings):
     
     # Logging
     LOG_LEVEL: str = Field(default="INFO", env="ANFL_LOG_LEVEL")
+
+    # Models
+    MODEL_MEMORY_BUDGET_GB: Optional[float] = Field(
+        default=None,
+        env="ANFL_MODEL_MEMORY_BUDGET_GB"
+    )
     
     class Config:
         """Pydantic config class."""
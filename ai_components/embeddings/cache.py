@@ -0,0 +1,163 @@
+"""Content-hash embedding cache for ANFL."""
+
+import asyncio
+import hashlib
+import os
+import re
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.logging import get_logger
+from .config import EmbeddingCacheConfig
+
+logger = get_logger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different inputs share a cache entry."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def cache_key(model_name: str, text: str) -> str:
+    """Cache key of a text under a model."""
+    payload = f"{model_name}\0{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """LRU of embeddings keyed by content hash, with an optional disk tier.
+
+    Disk entries are one ``.npy`` file per key under a two-character fan-out
+    directory, so the cache survives restarts and can be shared by workers
+    on one host.
+    """
+
+    def __init__(self, config: EmbeddingCacheConfig):
+        """Initialize the cache.
+
+        Args:
+            config: Cache configuration
+        """
+        self.config = config
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._disk_path = Path(config.disk_path) if config.disk_path else None
+        if self._disk_path:
+            self._disk_path.mkdir(parents=True, exist_ok=True)
+        self.stats: Dict[str, int] = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+    def __len__(self) -> int:
+        """Number of embeddings held in memory."""
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[np.ndarray]:
+        """Look up an embedding in memory, then on disk."""
+        return (await self.get_many([key]))[0]
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up embeddings in memory, then on disk.
+
+        Disk reads run in the default executor so the event loop is not
+        blocked.
+
+        Returns:
+            One embedding or None per key, in input order
+        """
+        found: List[Optional[np.ndarray]] = [None] * len(keys)
+        missing = []
+        for position, key in enumerate(keys):
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                found[position] = embedding
+            else:
+                missing.append(position)
+
+        if self._disk_path and missing:
+            loaded = await asyncio.get_running_loop().run_in_executor(
+                None, self._read_disk, [keys[position] for position in missing]
+            )
+            for position, embedding in zip(missing, loaded):
+                if embedding is not None:
+                    self._remember(keys[position], embedding)
+                    self.stats["disk_hits"] += 1
+                    found[position] = embedding
+
+        self.stats["misses"] += sum(1 for embedding in found if embedding is None)
+        return found
+
+    async def put(self, key: str, embedding: np.ndarray) -> np.ndarray:
+        """Store an embedding in memory and, if enabled, on disk.
+
+        Returns:
+            The stored read-only copy
+        """
+        return (await self.put_many([(key, embedding)]))[0]
+
+    async def put_many(self, entries: Sequence[Tuple[str, np.ndarray]]) -> List[np.ndarray]:
+        """Store embeddings in memory and, if enabled, on disk.
+
+        Disk writes run in the default executor; a failed write is logged
+        and leaves the entry in memory only.
+
+        Returns:
+            The stored read-only copies, in input order
+        """
+        stored = []
+        for key, embedding in entries:
+            embedding = np.array(embedding, dtype=np.float32)
+            embedding.flags.writeable = False
+            self._remember(key, embedding)
+            stored.append(embedding)
+        if self._disk_path and stored:
+            keys = [key for key, _ in entries]
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._write_disk, list(zip(keys, stored))
+                )
+            except OSError as e:
+                logger.warning(f"Failed to write embeddings to the disk cache: {str(e)}")
+        return stored
+
+    def _read_disk(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """Load entries from disk; runs in an executor."""
+        loaded: List[Optional[np.ndarray]] = []
+        for key in keys:
+            path = self._entry_path(key)
+            embedding = None
+            if path.exists():
+                try:
+                    embedding = np.load(path)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Discarding unreadable cache entry {path}: {str(e)}")
+            loaded.append(embedding)
+        return loaded
+
+    def _write_disk(self, entries: List[Tuple[str, np.ndarray]]) -> None:
+        """Write entries that are not on disk yet; runs in an executor."""
+        for key, embedding in entries:
+            path = self._entry_path(key)
+            if path.exists():
+                continue
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, embedding)
+            os.replace(tmp, path)
+
+    def _remember(self, key: str, embedding: np.ndarray) -> None:
+        """Insert into the LRU, evicting the oldest entries past the limit."""
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+
+    def _entry_path(self, key: str) -> Path:
+        """Disk location of a cache entry."""
+        return self._disk_path / key[:2] / f"{key}.npy"
@@ -0,0 +1,43 @@
+"""
+Configuration for the ANFL embedding service.
+
+This module defines the encoder, micro-batching and cache settings used by
+the embedding service.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class EmbeddingCacheConfig(BaseModel):
+    """Configuration for the content-hash embedding cache."""
+
+    max_entries: int = Field(100000, description="Embeddings kept in the in-memory LRU")
+    disk_path: Optional[Path] = Field(
+        None, description="Directory for the on-disk cache; disabled when unset"
+    )
+
+
+class EmbeddingConfig(BaseModel):
+    """Configuration for the embedding service."""
+
+    model_name: str = Field(
+        "sentence-transformers/all-MiniLM-L6-v2",
+        description="sentence-transformers model name or local path",
+    )
+    max_batch_size: int = Field(32, description="Maximum texts encoded in one micro-batch")
+    max_wait_ms: int = Field(
+        10, description="Maximum time a request waits for its micro-batch to fill"
+    )
+    normalize_embeddings: bool = Field(True, description="L2-normalize embeddings")
+    use_process: bool = Field(
+        False, description="Run the encoder in a worker process instead of a thread"
+    )
+    num_threads: Optional[int] = Field(
+        None, description="CPU threads for the encoder; torch default when unset"
+    )
+    cache: EmbeddingCacheConfig = Field(
+        default_factory=EmbeddingCacheConfig, description="Embedding cache configuration"
+    )
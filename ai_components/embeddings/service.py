@@ -0,0 +1,265 @@
+"""Micro-batched embedding service for ANFL.
+
+Concurrent ``embed`` calls are queued and encoded together in batches of up
+to ``max_batch_size`` texts, waiting at most ``max_wait_ms`` for a batch to
+fill. The encoder runs on CPU in a worker thread, or in a worker process
+when ``use_process`` is set, so the event loop is never blocked.
+"""
+
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.exceptions import ModelError, ModelLoadError
+from ..core.logging import get_logger
+from .cache import EmbeddingCache, cache_key, normalize_text
+from .config import EmbeddingConfig
+
+logger = get_logger(__name__)
+
+# Encoder of a worker process, loaded by _init_worker
+_worker_encoder: Any = None
+
+
+def _load_encoder(model_name: str, num_threads: Optional[int]) -> Any:
+    """Load a sentence-transformers model on CPU."""
+    # Keep the encoder off any GPU even when one is visible
+    os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    return SentenceTransformer(model_name, device="cpu")
+
+
+def _encode(encoder: Any, texts: List[str], normalize: bool) -> np.ndarray:
+    """Encode texts into a float32 matrix."""
+    embeddings = encoder.encode(
+        texts,
+        batch_size=len(texts),
+        convert_to_numpy=True,
+        normalize_embeddings=normalize,
+        show_progress_bar=False,
+    )
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def _init_worker(model_name: str, num_threads: Optional[int]) -> None:
+    """Load the encoder once per worker process."""
+    global _worker_encoder
+    _worker_encoder = _load_encoder(model_name, num_threads)
+
+
+def _worker_dimension() -> int:
+    """Embedding dimension of the worker process encoder."""
+    return int(_worker_encoder.get_sentence_embedding_dimension())
+
+
+def _worker_encode(texts: List[str], normalize: bool) -> np.ndarray:
+    """Encode texts in a worker process."""
+    return _encode(_worker_encoder, texts, normalize)
+
+
+class EmbeddingService:
+    """Async embedding service with dynamic micro-batching and caching."""
+
+    def __init__(self, config: Optional[EmbeddingConfig] = None):
+        """Initialize the embedding service.
+
+        Args:
+            config: Embedding configuration
+        """
+        self.config = config or EmbeddingConfig()
+        self.cache = EmbeddingCache(self.config.cache)
+        self._encoder: Any = None
+        self._executor: Optional[Executor] = None
+        self._dimension: Optional[int] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "encoded": 0,
+            "batches": 0,
+        }
+
+    @property
+    def embedding_model(self) -> str:
+        """Model name to record in ``VectorMetadata.embedding_model``."""
+        return self.config.model_name
+
+    @property
+    def dimension(self) -> int:
+        """Embedding dimension to record in ``VectorMetadata.dimension``."""
+        if self._dimension is None:
+            raise ModelLoadError(
+                "Embedding service is not started", details={"model_name": self.config.model_name}
+            )
+        return self._dimension
+
+    def metadata_fields(self) -> Dict[str, Any]:
+        """Fields that describe embeddings produced by this service."""
+        return {"embedding_model": self.embedding_model, "dimension": self.dimension}
+
+    async def start(self) -> None:
+        """Load the encoder and start the batching task."""
+        if self._task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            if self.config.use_process:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=1,
+                    initializer=_init_worker,
+                    initargs=(self.config.model_name, self.config.num_threads),
+                )
+                self._dimension = await loop.run_in_executor(self._executor, _worker_dimension)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+                self._encoder = await loop.run_in_executor(
+                    self._executor, _load_encoder, self.config.model_name, self.config.num_threads
+                )
+                self._dimension = int(self._encoder.get_sentence_embedding_dimension())
+        except Exception as e:
+            if self._executor:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            raise ModelLoadError(
+                f"Failed to load embedding model: {str(e)}",
+                details={"model_name": self.config.model_name},
+            )
+
+        self._queue = asyncio.Queue()
+        self._task = loop.create_task(self._run())
+        logger.info(
+            f"Embedding service started: {self.config.model_name} "
+            f"(dimension={self._dimension}, process={self.config.use_process})"
+        )
+
+    async def close(self) -> None:
+        """Finish queued requests and release the encoder."""
+        if self._task:
+            await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._encoder = None
+        logger.info(f"Embedding service closed: {self.stats}")
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed one text.
+
+        Returns:
+            float32 vector of length ``dimension``
+        """
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: Sequence[str]) -> List[np.ndarray]:
+        """Embed texts, served from the cache where possible.
+
+        Returns:
+            One float32 vector per text, in input order
+        """
+        if self._task is None:
+            raise ModelError(
+                "Embedding service is not started", details={"model_name": self.config.model_name}
+            )
+
+        keys = [cache_key(self.config.model_name, text) for text in texts]
+        results = await self.cache.get_many(keys)
+        waiting: List[Tuple[int, asyncio.Future]] = []
+        for position, (text, key, cached) in enumerate(zip(texts, keys, results)):
+            self.stats["requests"] += 1
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                continue
+
+            future = self._inflight.get(key)
+            if future is None:
+                future = asyncio.get_running_loop().create_future()
+                self._inflight[key] = future
+                self._queue.put_nowait((key, normalize_text(text), future))
+            else:
+                self.stats["coalesced"] += 1
+            waiting.append((position, future))
+
+        for position, future in waiting:
+            results[position] = await asyncio.shield(future)
+        return results
+
+    async def _run(self) -> None:
+        """Collect queued texts into micro-batches and encode them."""
+        loop = asyncio.get_running_loop()
+        max_wait = self.config.max_wait_ms / 1000
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + max_wait
+            while len(batch) < self.config.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._encode_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _encode_batch(self, batch: List[Tuple[str, str, asyncio.Future]]) -> None:
+        """Encode one micro-batch and resolve its requests."""
+        texts = [text for _, text, _ in batch]
+        loop = asyncio.get_running_loop()
+        try:
+            if self.config.use_process:
+                embeddings = await loop.run_in_executor(
+                    self._executor, _worker_encode, texts, self.config.normalize_embeddings
+                )
+            else:
+                embeddings = await loop.run_in_executor(
+                    self._executor, _encode, self._encoder, texts, self.config.normalize_embeddings
+                )
+        except Exception as e:
+            logger.error(f"Failed to encode batch of {len(batch)} texts: {str(e)}")
+            error = ModelError(
+                f"Embedding failed: {str(e)}", details={"model_name": self.config.model_name}
+            )
+            for key, _, future in batch:
+                self._inflight.pop(key, None)
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self.stats["batches"] += 1
+        self.stats["encoded"] += len(batch)
+        stored = await self.cache.put_many(
+            [(key, embedding) for (key, _, _), embedding in zip(batch, embeddings)]
+        )
+        for (key, _, future), embedding in zip(batch, stored):
+            self._inflight.pop(key, None)
+            if not future.done():
+                future.set_result(embedding)
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
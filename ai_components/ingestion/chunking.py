@@ -0,0 +1,71 @@
+"""Text normalization and chunking for ANFL ingestion."""
+
+import re
+import unicodedata
+from typing import Any, Dict, List
+
+_WHITESPACE = re.compile(r"[ \t\f\v]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize unicode and whitespace while keeping paragraph breaks."""
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n")
+    text = _WHITESPACE.sub(" ", text)
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def chat_history_text(history: Dict[str, Any]) -> str:
+    """Flatten a chat history into one document, one message per paragraph."""
+    parts = []
+    title = normalize_text(history.get("title") or "")
+    if title:
+        parts.append(title)
+    for message in history.get("messages") or []:
+        content = normalize_text(message.get("content") or "")
+        if content:
+            parts.append(f"{message.get('role') or 'unknown'}: {content}")
+    return "\n\n".join(parts)
+
+
+def chunk_text(text: str, chunk_size: int = 512, chunk_overlap: int = 128) -> List[str]:
+    """Split text into overlapping windows that end on whitespace.
+
+    Args:
+        text: Text to split
+        chunk_size: Maximum characters per chunk
+        chunk_overlap: Characters shared by adjacent chunks
+
+    Returns:
+        Chunks in document order
+    """
+    if chunk_overlap >= chunk_size:
+        raise ValueError("chunk_overlap must be smaller than chunk_size")
+
+    chunks = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            # Prefer a paragraph break, then any whitespace, in the second half
+            boundary = text.rfind("\n\n", start + chunk_size // 2, end)
+            if boundary == -1:
+                boundary = max(
+                    text.rfind(" ", start + chunk_size // 2, end),
+                    text.rfind("\n", start + chunk_size // 2, end),
+                )
+            if boundary > start:
+                end = boundary
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= length:
+            break
+
+        next_start = max(end - chunk_overlap, start + 1)
+        # Start the next window on a word boundary
+        space = text.find(" ", next_start, end)
+        start = space + 1 if space != -1 else next_start
+    return chunks
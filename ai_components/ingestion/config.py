@@ -0,0 +1,51 @@
+"""
+Configuration for the ANFL ingestion pipeline.
+
+Defaults follow the batch processing settings of the vector processing
+design: 4 workers, queues of 1000 items and backpressure at 5000 pending
+items with a 0.8 throttle threshold.
+"""
+
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+class IngestionConfig(BaseModel):
+    """Configuration for the staged ingestion pipeline."""
+
+    workers: int = Field(4, description="Default worker count per stage")
+    stage_workers: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Worker count overrides for the normalize, chunk, embed and store stages",
+    )
+    queue_size: int = Field(1000, description="Capacity of each inter-stage queue")
+    max_pending: int = Field(
+        5000, description="Items admitted but not yet stored before the reader blocks"
+    )
+    throttle_threshold: float = Field(
+        0.8, description="Fraction of max_pending at which the reader starts slowing down"
+    )
+    throttle_delay_ms: int = Field(5, description="Delay added per admitted item while throttled")
+
+    # Chunking
+    chunk_size: int = Field(512, description="Maximum characters per chunk")
+    chunk_overlap: int = Field(128, description="Characters shared by adjacent chunks")
+
+    # Batching
+    embed_batch_size: int = Field(20, description="Chunks per embedding call")
+    store_batch_size: int = Field(100, description="Chunks per vector store write")
+    batch_timeout_ms: int = Field(
+        50, description="Maximum wait for a batching stage to fill a batch"
+    )
+
+    # Reading and output
+    read_block_size: int = Field(65536, description="Bytes read per file block")
+    namespace: Optional[str] = Field(None, description="Vector store namespace")
+    report_interval: int = Field(
+        30, description="Seconds between progress reports; 0 disables them"
+    )
+
+    def workers_for(self, stage: str) -> int:
+        """Worker count of a stage."""
+        return self.stage_workers.get(stage, self.workers)
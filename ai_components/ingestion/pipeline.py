@@ -0,0 +1,322 @@
+"""Staged streaming ingestion pipeline for ANFL.
+
+Items flow through ``read -> normalize -> chunk -> embed -> store``. Each
+stage has its own worker pool and the stages are joined by bounded queues,
+so a slow stage fills its input queue and blocks the stages before it. On
+top of that, the reader admits new items only while fewer than
+``max_pending`` items are in flight, and slows down once
+``throttle_threshold`` of that budget is used.
+"""
+
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, List, Optional, Union
+
+from ..core.logging import get_logger
+from ..embeddings.service import EmbeddingService
+from ..vector_store.core.db_manager import DatabaseManager
+from .chunking import chat_history_text, chunk_text
+from .config import IngestionConfig
+from .reader import iter_chat_histories
+
+logger = get_logger(__name__)
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class _Stage:
+    """One pipeline stage with its workers, input queue and counters."""
+
+    def __init__(
+        self,
+        name: str,
+        workers: int,
+        queue_size: int,
+        handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        batch_size: int = 1,
+    ):
+        self.name = name
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.handler = handler
+        self.batch_size = batch_size
+        self.processed = 0
+        self.emitted = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.finished_workers = 0
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """Throughput and queue depth of the stage."""
+        return {
+            "processed": self.processed,
+            "emitted": self.emitted,
+            "failed": self.failed,
+            "queue_depth": self.queue.qsize(),
+            "throughput_per_s": round(self.processed / elapsed, 2) if elapsed else 0.0,
+            "utilization": (
+                round(self.busy_seconds / (elapsed * self.workers), 3) if elapsed else 0.0
+            ),
+        }
+
+
+class IngestionPipeline:
+    """Streams documents into the vector store through bounded stages."""
+
+    def __init__(
+        self, config: IngestionConfig, db_manager: DatabaseManager, embedder: EmbeddingService
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            config: Ingestion configuration
+            db_manager: Initialized database manager
+            embedder: Started embedding service
+        """
+        self.config = config
+        self.db_manager = db_manager
+        self.embedder = embedder
+        self._pending = 0
+        self._pending_changed = asyncio.Condition()
+        self._started_at: Optional[float] = None
+        self.admitted = 0
+        self.throttled = 0
+        self.stages: List[_Stage] = [
+            _Stage(
+                "normalize", config.workers_for("normalize"), config.queue_size, self._normalize
+            ),
+            _Stage("chunk", config.workers_for("chunk"), config.queue_size, self._chunk),
+            _Stage(
+                "embed",
+                config.workers_for("embed"),
+                config.queue_size,
+                self._embed,
+                config.embed_batch_size,
+            ),
+            _Stage(
+                "store",
+                config.workers_for("store"),
+                config.queue_size,
+                self._store,
+                config.store_batch_size,
+            ),
+        ]
+
+    @property
+    def pending(self) -> int:
+        """Items admitted by the reader and not yet stored or dropped."""
+        return self._pending
+
+    async def ingest_file(self, path: Union[str, Path]) -> Dict[str, Any]:
+        """Ingest a scraper chat history export.
+
+        Returns:
+            Final pipeline report
+        """
+        return await self.run(iter_chat_histories(path, self.config.read_block_size))
+
+    async def run(self, source: AsyncIterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Drive every item of ``source`` through the pipeline.
+
+        Returns:
+            Final pipeline report
+        """
+        self._started_at = time.perf_counter()
+        tasks = [
+            asyncio.create_task(self._worker(index, stage))
+            for index, stage in enumerate(self.stages)
+            for _ in range(stage.workers)
+        ]
+        reporter = None
+        if self.config.report_interval:
+            reporter = asyncio.create_task(self._report_periodically())
+
+        try:
+            await self._read(source)
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            if reporter:
+                reporter.cancel()
+
+        report = self.report()
+        logger.info(f"Ingestion finished: {report}")
+        return report
+
+    async def _read(self, source: AsyncIterable[Dict[str, Any]]) -> None:
+        """Admit source items under the pending budget."""
+        first = self.stages[0]
+        threshold = self.config.max_pending * self.config.throttle_threshold
+        delay = self.config.throttle_delay_ms / 1000
+        try:
+            async for item in source:
+                async with self._pending_changed:
+                    await self._pending_changed.wait_for(
+                        lambda: self._pending < self.config.max_pending
+                    )
+                    self._pending += 1
+                self.admitted += 1
+                if self._pending >= threshold:
+                    self.throttled += 1
+                    await asyncio.sleep(delay)
+                await first.queue.put(item)
+        finally:
+            for _ in range(first.workers):
+                await first.queue.put(_DONE)
+
+    async def _worker(self, index: int, stage: _Stage) -> None:
+        """Run one worker of a stage until its input is exhausted."""
+        downstream = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        timeout = self.config.batch_timeout_ms / 1000
+        done = False
+        while not done:
+            item = await stage.queue.get()
+            if item is _DONE:
+                break
+            batch = [item]
+            deadline = time.perf_counter() + timeout
+            while len(batch) < stage.batch_size:
+                if stage.queue.empty():
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(stage.queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = stage.queue.get_nowait()
+                if item is _DONE:
+                    done = True
+                    break
+                batch.append(item)
+
+            started = time.perf_counter()
+            try:
+                outputs = await stage.handler(batch)
+            except Exception as e:
+                stage.failed += len(batch)
+                logger.error(f"Stage {stage.name} failed on {len(batch)} items: {str(e)}")
+                outputs = []
+                await self._adjust_pending(-len(batch))
+            stage.busy_seconds += time.perf_counter() - started
+            stage.processed += len(batch)
+            stage.emitted += len(outputs)
+
+            if downstream:
+                for output in outputs:
+                    await downstream.queue.put(output)
+
+        stage.finished_workers += 1
+        if stage.finished_workers == stage.workers and downstream:
+            for _ in range(downstream.workers):
+                await downstream.queue.put(_DONE)
+
+    async def _adjust_pending(self, delta: int) -> None:
+        """Change the pending count and wake the reader if it went down."""
+        if not delta:
+            return
+        async with self._pending_changed:
+            self._pending += delta
+            if delta < 0:
+                self._pending_changed.notify_all()
+
+    async def _normalize(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Turn chat histories into plain-text documents."""
+        documents = []
+        for history in batch:
+            text = chat_history_text(history)
+            if not text:
+                continue
+            metadata = history.get("metadata") or {}
+            documents.append(
+                {
+                    "id": str(history.get("id") or hashlib.sha1(text.encode()).hexdigest()),
+                    "title": history.get("title") or "",
+                    "text": text,
+                    "source": metadata.get("source"),
+                    "scraped_at": metadata.get("scraped_at"),
+                }
+            )
+        await self._adjust_pending(len(documents) - len(batch))
+        return documents
+
+    async def _chunk(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Split documents into overlapping chunks."""
+        chunks = []
+        for document in batch:
+            pieces = chunk_text(document["text"], self.config.chunk_size, self.config.chunk_overlap)
+            for position, text in enumerate(pieces):
+                chunks.append(
+                    {
+                        "vector_id": f"{document['id']}:{position}",
+                        "text": text,
+                        "document_id": document["id"],
+                        "chunk_index": position,
+                        "chunk_count": len(pieces),
+                        "title": document["title"],
+                        "source": document["source"],
+                        "scraped_at": document["scraped_at"],
+                    }
+                )
+        # One pending item per document becomes one per chunk
+        await self._adjust_pending(len(chunks) - len(batch))
+        return chunks
+
+    async def _embed(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Embed a batch of chunks."""
+        embeddings = await self.embedder.embed_many([chunk["text"] for chunk in batch])
+        for chunk, embedding in zip(batch, embeddings):
+            chunk["vector"] = embedding.tolist()
+        return batch
+
+    async def _store(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write a batch of embedded chunks to the vector store."""
+        now = datetime.now(timezone.utc).isoformat()
+        model_fields = self.embedder.metadata_fields()
+        vectors = [(chunk["vector_id"], chunk["vector"]) for chunk in batch]
+        metadata = [
+            {
+                "created_at": now,
+                "updated_at": now,
+                **model_fields,
+                "custom_metadata": {
+                    key: chunk[key]
+                    for key in (
+                        "text",
+                        "document_id",
+                        "chunk_index",
+                        "chunk_count",
+                        "title",
+                        "source",
+                        "scraped_at",
+                    )
+                },
+            }
+            for chunk in batch
+        ]
+        await self.db_manager.store_vectors(vectors, metadata, namespace=self.config.namespace)
+        await self._adjust_pending(-len(batch))
+        return []
+
+    def report(self) -> Dict[str, Any]:
+        """Per-stage throughput and queue depth."""
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "admitted": self.admitted,
+            "pending": self._pending,
+            "throttled": self.throttled,
+            "stages": {stage.name: stage.report(elapsed) for stage in self.stages},
+        }
+
+    async def _report_periodically(self) -> None:
+        """Log progress every ``report_interval`` seconds."""
+        while True:
+            await asyncio.sleep(self.config.report_interval)
+            logger.info(f"Ingestion progress: {self.report()}")
@@ -0,0 +1,93 @@
+"""Streaming readers for scraper chat history exports."""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Union
+
+from ..core.exceptions import ValidationError
+
+_WHITESPACE = " \t\r\n"
+
+
+async def iter_json_array(path: Union[str, Path], block_size: int = 65536) -> AsyncIterator[Any]:
+    """Yield the elements of a top-level JSON array one at a time.
+
+    The file is read in blocks on a worker thread and each element is
+    decoded as soon as it is complete, so memory use is bounded by the
+    largest element and not by the file size.
+
+    Args:
+        path: JSON file holding one array
+        block_size: Characters read per block
+
+    Raises:
+        ValidationError: If the file is not a JSON array
+    """
+    decoder = json.JSONDecoder()
+    loop = asyncio.get_running_loop()
+    path = Path(path)
+
+    with open(path, encoding="utf-8") as f:
+        buffer = ""
+        position = 0
+        eof = False
+        started = False
+
+        async def fill() -> bool:
+            nonlocal buffer, position, eof
+            block = await loop.run_in_executor(None, f.read, block_size)
+            if not block:
+                eof = True
+                return False
+            buffer = buffer[position:] + block
+            position = 0
+            return True
+
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position == len(buffer):
+                if eof or not await fill():
+                    raise ValidationError(
+                        "Unexpected end of JSON array", details={"path": str(path)}
+                    )
+                continue
+
+            char = buffer[position]
+            if not started:
+                if char != "[":
+                    raise ValidationError("Expected a JSON array", details={"path": str(path)})
+                started = True
+                position += 1
+                continue
+            if char == "]":
+                return
+            if char == ",":
+                position += 1
+                continue
+
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                # The element may continue in the next block
+                if eof or not await fill():
+                    raise ValidationError(
+                        f"Malformed JSON array element: {e.msg}",
+                        details={"path": str(path), "offset": e.pos},
+                    )
+                continue
+            position = end
+            yield element
+
+
+async def iter_chat_histories(
+    path: Union[str, Path], block_size: int = 65536
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream the ``ChatHistory`` records written by the chat scraper.
+
+    Records without messages are skipped.
+    """
+    async for history in iter_json_array(path, block_size):
+        if isinstance(history, dict) and history.get("messages"):
+            yield history
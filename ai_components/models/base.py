@@ -1,12 +1,18 @@
 """Base model class for ANFL."""
 
 import abc
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
 
 from ..core.config import settings
 from ..core.exceptions import ModelLoadError, ModelNotFoundError
 from ..core.logging import get_logger
+from .moe.config import load_moe_config
+from .weights import MappedWeights, load_weights
 
 logger = get_logger(__name__)
 
@@ -42,6 +48,36 @@ class BaseModel(abc.ABC):
         """Check if the model is loaded."""
         return self._is_loaded
 
+    def memory_bytes(self) -> int:
+        """Resident memory of the loaded model, or an estimate before loading.
+
+        Uses ``config["memory_bytes"]`` when set, otherwise the size of the
+        model files. Subclasses that know their exact footprint should
+        override this.
+        """
+        if "memory_bytes" in self.config:
+            return int(self.config["memory_bytes"])
+        if self.model_path.is_file():
+            return self.model_path.stat().st_size
+        if self.model_path.is_dir():
+            return sum(path.stat().st_size for path in self.model_path.rglob("*") if path.is_file())
+        return 0
+
+    def map_weights(self, filename: Optional[str] = None) -> MappedWeights:
+        """Memory-map the model's weights read-only.
+
+        Subclasses call this from ``load`` instead of reading weights into
+        private memory, so processes loading the same model share its pages.
+
+        Args:
+            filename: Weight file under ``model_path``; the whole
+                ``model_path`` when omitted
+
+        Returns:
+            Mapping of tensor name to read-only array
+        """
+        return load_weights(self.model_path / filename if filename else self.model_path)
+
     @abc.abstractmethod
     async def load(self) -> None:
         """Load the model into memory.
@@ -93,22 +129,340 @@ class BaseModel(abc.ABC):
         return f"{self.__class__.__name__}(model_name='{self.model_name}', loaded={self.is_loaded})"
 
 
+@dataclass
+class _ModelUsage:
+    """Bookkeeping the registry keeps per model."""
+
+    pinned: bool = False
+    in_flight: int = 0
+    uses: int = 0
+    last_used: float = 0.0
+    memory_bytes: int = 0
+    evicted: bool = False
+    loading: Optional["asyncio.Future[None]"] = None
+    unloading: Optional["asyncio.Future[None]"] = None
+    drained: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def __post_init__(self) -> None:
+        self.drained.set()
+
+
 class ModelRegistry:
-    """Registry for managing model instances."""
+    """Registry for managing model instances.
+
+    Loaded models are held within a memory budget. A load that would exceed
+    it first unloads idle models, least recently used first (or least
+    frequently used with ``eviction_policy="lfu"``). Pinned models and
+    models with requests in flight are never evicted.
 
-    def __init__(self):
-        """Initialize the model registry."""
+    Concurrent loads of the same model share one in-progress load, and an
+    unload waits for requests in flight to finish.
+    """
+
+    def __init__(
+        self,
+        max_memory_gb: Optional[float] = None,
+        eviction_policy: str = "lru"
+    ):
+        """Initialize the model registry.
+
+        Args:
+            max_memory_gb: Memory budget for loaded models; unbounded when None
+            eviction_policy: "lru" or "lfu"
+        """
+        if eviction_policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy: {eviction_policy}")
         self._models: Dict[str, BaseModel] = {}
+        self._usage: Dict[str, _ModelUsage] = {}
+        self.max_memory_bytes = int(max_memory_gb * 1024 ** 3) if max_memory_gb else None
+        self.eviction_policy = eviction_policy
+        self._memory_lock = asyncio.Lock()
+        self._reserved_bytes = 0
+        self._load_listeners: List[Callable[[str], None]] = []
+        self._counters: Dict[str, int] = {
+            "loads": 0,
+            "shared_loads": 0,
+            "reloads": 0,
+            "evictions": 0,
+            "evicted_bytes": 0,
+            "rejected": 0,
+        }
         logger.info("Initializing model registry")
 
-    async def register(self, model: BaseModel) -> None:
+    async def register(self, model: BaseModel, pinned: bool = False) -> None:
         """Register a model instance.
         
         Args:
             model: Model instance to register
+            pinned: Never evict this model to make room for others
         """
         self._models[model.model_name] = model
+        self._usage[model.model_name] = _ModelUsage(
+            pinned=pinned,
+            memory_bytes=model.memory_bytes() if model.is_loaded else 0
+        )
         logger.info(f"Registered model: {model.model_name}")
+        self._notify_loaded(model.model_name)
+
+    def add_load_listener(self, callback: Callable[[str], None]) -> None:
+        """Call ``callback(model_name)`` on registration and after every load.
+
+        Listeners run on the event loop and must not block; slow work such
+        as warming a model up belongs in a task they start.
+
+        Args:
+            callback: Receives the name of the registered or loaded model
+        """
+        self._load_listeners.append(callback)
+
+    def _notify_loaded(self, model_name: str) -> None:
+        for callback in self._load_listeners:
+            try:
+                callback(model_name)
+            except Exception as e:
+                logger.error(f"Load listener failed for model {model_name}: {str(e)}")
+
+    def pin(self, model_name: str, pinned: bool = True) -> None:
+        """Pin or unpin a registered model.
+
+        Args:
+            model_name: Name of the model
+            pinned: Whether the model may be evicted
+        """
+        self._get_usage(model_name).pinned = pinned
+
+    def _get_usage(self, model_name: str) -> _ModelUsage:
+        if model_name not in self._usage:
+            raise ModelNotFoundError(
+                f"Model not found: {model_name}",
+                details={"available_models": list(self._models.keys())}
+            )
+        return self._usage[model_name]
+
+    def memory_usage(self) -> int:
+        """Bytes held by loaded models."""
+        return sum(
+            usage.memory_bytes
+            for name, usage in self._usage.items()
+            if self._models[name].is_loaded
+        )
+
+    async def load(self, model_name: str) -> BaseModel:
+        """Load a registered model, evicting idle models to stay within budget.
+
+        Concurrent calls for the same model wait on a single load and all
+        see its error if it fails; a later call tries again.
+
+        Args:
+            model_name: Name of the model to load
+
+        Returns:
+            Loaded model instance
+
+        Raises:
+            ModelNotFoundError: If model is not registered
+            ModelLoadError: If evicting every idle model would not free enough memory
+        """
+        usage = self._get_usage(model_name)
+        model = self._models[model_name]
+        usage.uses += 1
+        usage.last_used = time.monotonic()
+        while usage.unloading is not None:
+            await asyncio.shield(usage.unloading)
+        if model.is_loaded:
+            return model
+
+        if usage.loading is None:
+            usage.loading = asyncio.ensure_future(self._load(model_name))
+            usage.loading.add_done_callback(lambda future: self._load_done(usage, future))
+        else:
+            self._counters["shared_loads"] += 1
+        await asyncio.shield(usage.loading)
+        return model
+
+    def _load_done(self, usage: _ModelUsage, future: "asyncio.Future[None]") -> None:
+        if usage.loading is future:
+            usage.loading = None
+        if not future.cancelled():
+            # Retrieved here so a load nobody awaits any more is not reported as unhandled
+            future.exception()
+
+    async def _load(self, model_name: str) -> None:
+        """Make room for a model, then load it outside the budget lock."""
+        usage = self._usage[model_name]
+        model = self._models[model_name]
+        async with self._memory_lock:
+            needed = model.memory_bytes()
+            await self._make_room(needed, model_name)
+            self._reserved_bytes += needed
+        try:
+            await model.load()
+        finally:
+            self._reserved_bytes -= needed
+
+        usage.memory_bytes = model.memory_bytes()
+        self._counters["loads"] += 1
+        if usage.evicted:
+            usage.evicted = False
+            self._counters["reloads"] += 1
+            logger.info(f"Reloaded evicted model: {model_name}")
+        if usage.memory_bytes > needed:
+            # The estimate was low; free what we can without failing the load
+            async with self._memory_lock:
+                await self._make_room(0, model_name, strict=False)
+        self._notify_loaded(model_name)
+
+    async def _make_room(self, needed: int, model_name: str, strict: bool = True) -> None:
+        """Evict idle models until ``needed`` more bytes fit in the budget."""
+        if self.max_memory_bytes is None:
+            return
+        excess = self.memory_usage() + self._reserved_bytes + needed - self.max_memory_bytes
+        if excess <= 0:
+            return
+
+        candidates = self._eviction_candidates(model_name)
+        if strict and sum(self._usage[name].memory_bytes for name in candidates) < excess:
+            self._counters["rejected"] += 1
+            raise ModelLoadError(
+                f"Not enough memory to load model: {model_name}",
+                details={
+                    "model_name": model_name,
+                    "needed_bytes": needed,
+                    "used_bytes": self.memory_usage(),
+                    "reserved_bytes": self._reserved_bytes,
+                    "budget_bytes": self.max_memory_bytes,
+                    "evictable_models": candidates,
+                }
+            )
+
+        for name in candidates:
+            if excess <= 0:
+                break
+            # Evictions await; a candidate may have been acquired or pinned since the list was built
+            if not self._is_evictable(name, model_name):
+                continue
+            excess -= await self._evict(name)
+        if excess > 0 and strict:
+            self._counters["rejected"] += 1
+            raise ModelLoadError(
+                f"Not enough memory to load model: {model_name}",
+                details={
+                    "model_name": model_name,
+                    "needed_bytes": needed,
+                    "used_bytes": self.memory_usage(),
+                    "reserved_bytes": self._reserved_bytes,
+                    "budget_bytes": self.max_memory_bytes,
+                }
+            )
+        if excess > 0:
+            logger.warning(
+                f"Loaded models exceed the memory budget by {excess} bytes; "
+                "no idle models left to evict"
+            )
+
+    def _is_evictable(self, name: str, model_name: str) -> bool:
+        """Whether ``name`` is loaded, unpinned, idle and not already unloading."""
+        usage = self._usage.get(name)
+        return (
+            usage is not None
+            and name != model_name
+            and self._models[name].is_loaded
+            and not usage.pinned
+            and usage.in_flight == 0
+            and usage.unloading is None
+        )
+
+    def _eviction_candidates(self, model_name: str) -> List[str]:
+        """Idle, unpinned loaded models in eviction order."""
+        idle = [name for name in self._usage if self._is_evictable(name, model_name)]
+        if self.eviction_policy == "lfu":
+            return sorted(
+                idle, key=lambda name: (self._usage[name].uses, self._usage[name].last_used)
+            )
+        return sorted(idle, key=lambda name: self._usage[name].last_used)
+
+    async def _evict(self, model_name: str) -> int:
+        """Unload a model to free memory; returns the bytes freed."""
+        usage = self._usage[model_name]
+        freed = usage.memory_bytes
+        # Same path as unload(), so load() and acquire() wait for the eviction
+        await asyncio.shield(self._start_unload(model_name))
+        usage.evicted = True
+        self._counters["evictions"] += 1
+        self._counters["evicted_bytes"] += freed
+        logger.info(f"Evicted model {model_name} to free {freed} bytes")
+        return freed
+
+    async def unload(self, model_name: str) -> None:
+        """Unload a registered model once its requests in flight have finished.
+
+        New requests for the model wait until the unload is done and then
+        load it again.
+
+        Args:
+            model_name: Name of the model to unload
+        """
+        self._get_usage(model_name)
+        await asyncio.shield(self._start_unload(model_name))
+
+    def _start_unload(self, model_name: str) -> "asyncio.Future[None]":
+        """The model's in-progress unload, starting one if there is none."""
+        usage = self._usage[model_name]
+        if usage.unloading is None:
+            usage.unloading = asyncio.ensure_future(self._drain_and_unload(model_name))
+            usage.unloading.add_done_callback(lambda future: self._unload_done(usage, future))
+        return usage.unloading
+
+    def _unload_done(self, usage: _ModelUsage, future: "asyncio.Future[None]") -> None:
+        if usage.unloading is future:
+            usage.unloading = None
+        if not future.cancelled():
+            future.exception()
+
+    async def _drain_and_unload(self, model_name: str) -> None:
+        usage = self._usage[model_name]
+        model = self._models[model_name]
+        if usage.loading is not None:
+            await asyncio.wait([usage.loading])
+        await usage.drained.wait()
+        if model.is_loaded:
+            await model.unload()
+        usage.memory_bytes = 0
+
+    @asynccontextmanager
+    async def acquire(self, model_name: str) -> AsyncIterator[BaseModel]:
+        """Load a model and keep it from being evicted while in use.
+
+        Args:
+            model_name: Name of the model
+
+        Yields:
+            Loaded model instance
+        """
+        usage = self._get_usage(model_name)
+        while usage.unloading is not None:
+            await asyncio.shield(usage.unloading)
+        usage.in_flight += 1
+        usage.drained.clear()
+        try:
+            yield await self.load(model_name)
+        finally:
+            usage.in_flight -= 1
+            if usage.in_flight == 0:
+                usage.drained.set()
+
+    async def predict(self, model_name: str, input_data: Any) -> Any:
+        """Run a prediction, loading the model on demand.
+
+        Args:
+            model_name: Name of the model
+            input_data: Input data for prediction
+
+        Returns:
+            Model predictions
+        """
+        async with self.acquire(model_name) as model:
+            return await model.predict(input_data)
 
     async def unregister(self, model_name: str) -> None:
         """Unregister a model instance.
@@ -117,29 +471,33 @@ class ModelRegistry:
             model_name: Name of the model to unregister
         """
         if model_name in self._models:
-            model = self._models[model_name]
-            if model.is_loaded:
-                await model.unload()
+            await self.unload(model_name)
             del self._models[model_name]
+            del self._usage[model_name]
             logger.info(f"Unregistered model: {model_name}")
 
-    async def get_model(self, model_name: str) -> BaseModel:
+    async def get_model(self, model_name: str, load: bool = False) -> BaseModel:
         """Get a registered model instance.
         
         Args:
             model_name: Name of the model to retrieve
+            load: Load the model if it is not loaded yet. Use ``acquire`` to
+                also keep it from being evicted while in use
             
         Returns:
             Registered model instance
             
         Raises:
             ModelNotFoundError: If model is not registered
+            ModelLoadError: If ``load`` is set and the model cannot be loaded
         """
         if model_name not in self._models:
             raise ModelNotFoundError(
                 f"Model not found: {model_name}",
                 details={"available_models": list(self._models.keys())}
             )
+        if load:
+            return await self.load(model_name)
         return self._models[model_name]
 
     def list_models(self) -> Dict[str, bool]:
@@ -150,9 +508,26 @@ class ModelRegistry:
         """
         return {name: model.is_loaded for name, model in self._models.items()}
 
+    def stats(self) -> Dict[str, Any]:
+        """Memory use, loads, reloads and evictions.
+
+        Returns:
+            Dictionary of registry metrics
+        """
+        stats: Dict[str, Any] = dict(self._counters)
+        stats["budget_bytes"] = self.max_memory_bytes
+        stats["used_bytes"] = self.memory_usage()
+        stats["loaded"] = sum(1 for model in self._models.values() if model.is_loaded)
+        stats["pinned"] = sum(1 for usage in self._usage.values() if usage.pinned)
+        stats["in_flight"] = sum(usage.in_flight for usage in self._usage.values())
+        return stats
+
 
-# Create global model registry instance
-model_registry = ModelRegistry()
+# Create global model registry instance, bounded by the MoE memory budget
+# unless settings.MODEL_MEMORY_BUDGET_GB overrides it
+model_registry = ModelRegistry(
+    max_memory_gb=settings.MODEL_MEMORY_BUDGET_GB or load_moe_config().max_memory_gb
+)
 
 # Export classes and registry
 __all__ = ["BaseModel", "ModelRegistry", "model_registry"]
\ No newline at end of file
@@ -0,0 +1,260 @@
+"""
+Per-expert dynamic micro-batching for the ANFL Mixture of Experts system.
+
+Each expert gets an ``ExpertBatcher`` that queues single requests and runs
+them through the expert's batched forward pass: a batch is sent once it
+holds ``batch_size`` requests or its first request has waited
+``linger_ms``. Outputs are scattered back to the waiting callers.
+
+A request that the current queue and the recent batch latency say cannot
+finish within ``timeout_ms`` is rejected immediately with
+``ExpertTimeoutError`` instead of being queued, and requests whose deadline
+passes while queued are dropped before the forward pass.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ...core.logging import get_logger
+from .config import ExpertConfig
+from .exceptions import ExpertTimeoutError, ExpertUnavailableError, MoEError
+
+logger = get_logger(__name__)
+
+# Batched forward pass: a list of inputs to a sequence of outputs, sync or async
+Forward = Callable[[List[Any]], Any]
+
+# Weight of the newest batch in the batch latency average
+LATENCY_SMOOTHING = 0.2
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    """Mark an exception as retrieved when its caller already timed out."""
+    if not future.cancelled():
+        future.exception()
+
+
+class ExpertBatcher:
+    """Dynamic micro-batching queue in front of one expert."""
+
+    def __init__(self, expert: ExpertConfig, forward: Forward, executor: Optional[Executor] = None):
+        """Initialize the batcher.
+
+        Args:
+            expert: Expert configuration
+            forward: Batched forward pass returning one output per input;
+                synchronous functions run in ``executor``
+            executor: Executor for a synchronous forward pass; a
+                single-thread executor is created when omitted
+        """
+        self.expert = expert
+        self._forward = forward
+        self._is_async = asyncio.iscoroutinefunction(forward)
+        self._executor = executor
+        self._owns_executor = False
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = 0
+        self._batch_ms: Optional[float] = None
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "batches": 0,
+            "processed": 0,
+            "rejected": 0,
+            "expired": 0,
+            "failed": 0,
+        }
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the batching task is accepting requests."""
+        return self._task is not None
+
+    @property
+    def pending(self) -> int:
+        """Requests queued or in the running batch."""
+        queued = self._queue.qsize() if self._queue else 0
+        return queued + self._running
+
+    @property
+    def batch_latency_ms(self) -> Optional[float]:
+        """Smoothed duration of recent forward passes."""
+        return self._batch_ms
+
+    def reset_latency(self, batch_ms: Optional[float] = None) -> None:
+        """Replace the smoothed batch latency, e.g. with the steady value after warm-up."""
+        self._batch_ms = batch_ms
+
+    def estimated_wait_ms(self) -> float:
+        """Expected time until a request submitted now has its output."""
+        batches = self.pending // self.expert.batch_size + 1
+        return self.expert.linger_ms + batches * (self._batch_ms or 0.0)
+
+    async def start(self) -> None:
+        """Start the batching task."""
+        if self._task is not None:
+            return
+        if not self._is_async and self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"expert-{self.expert.name}"
+            )
+            self._owns_executor = True
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(
+            f"Expert batcher started: {self.expert.name} "
+            f"(batch_size={self.expert.batch_size}, linger_ms={self.expert.linger_ms})"
+        )
+
+    async def close(self) -> None:
+        """Finish queued requests and stop the batching task."""
+        if self._task:
+            await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._owns_executor = False
+        logger.info(f"Expert batcher closed: {self.expert.name} {self.stats}")
+
+    async def submit(self, input_data: Any, timeout_ms: Optional[float] = None) -> Any:
+        """Run one input through the expert as part of a batch.
+
+        Args:
+            input_data: Input for the expert
+            timeout_ms: Deadline for this request; defaults to the expert's
+                ``timeout_ms``
+
+        Returns:
+            The expert's output for the input
+
+        Raises:
+            ExpertUnavailableError: If the batcher is not started
+            ExpertTimeoutError: If the request cannot finish in time
+            MoEError: If the forward pass fails
+        """
+        if self._task is None:
+            raise ExpertUnavailableError(
+                f"Expert {self.expert.name} is not started", details={"expert": self.expert.name}
+            )
+        self.stats["requests"] += 1
+        timeout_ms = timeout_ms if timeout_ms is not None else self.expert.timeout_ms
+        estimated = self.estimated_wait_ms()
+        if estimated > timeout_ms:
+            self.stats["rejected"] += 1
+            raise ExpertTimeoutError(
+                f"Expert {self.expert.name} cannot answer within {timeout_ms}ms",
+                details={
+                    "expert": self.expert.name,
+                    "estimated_ms": estimated,
+                    "pending": self.pending,
+                },
+            )
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_ms / 1000
+        future = loop.create_future()
+        future.add_done_callback(_consume_exception)
+        self._queue.put_nowait((input_data, deadline, future))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), deadline - loop.time())
+        except asyncio.TimeoutError:
+            raise ExpertTimeoutError(
+                f"Expert {self.expert.name} did not answer within {timeout_ms}ms",
+                details={"expert": self.expert.name, "pending": self.pending},
+            )
+
+    async def _run(self) -> None:
+        """Collect queued requests into batches and run them."""
+        loop = asyncio.get_running_loop()
+        linger = self.expert.linger_ms / 1000
+        batch_size = self.expert.batch_size
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + linger
+            while len(batch) < batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._run_batch(batch)
+            finally:
+                self._running = 0
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _run_batch(self, batch: List[Tuple[Any, float, asyncio.Future]]) -> None:
+        """Run one forward pass and resolve its requests."""
+        now = asyncio.get_running_loop().time()
+        live = []
+        for item in batch:
+            _, deadline, future = item
+            if future.done():
+                continue
+            if deadline <= now:
+                self.stats["expired"] += 1
+                future.set_exception(
+                    ExpertTimeoutError(
+                        f"Request expired in the queue of expert {self.expert.name}",
+                        details={"expert": self.expert.name},
+                    )
+                )
+                continue
+            live.append(item)
+        if not live:
+            return
+
+        self._running = len(live)
+        inputs = [input_data for input_data, _, _ in live]
+        started = time.perf_counter()
+        try:
+            if self._is_async:
+                outputs = await self._forward(inputs)
+            else:
+                outputs = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self._forward, inputs
+                )
+            if len(outputs) != len(inputs):
+                raise ValueError(
+                    f"forward returned {len(outputs)} outputs for {len(inputs)} inputs"
+                )
+        except Exception as e:
+            logger.error(f"Expert {self.expert.name} failed on a batch of {len(live)}: {str(e)}")
+            self.stats["failed"] += len(live)
+            error = MoEError(
+                f"Expert {self.expert.name} failed: {str(e)}",
+                details={"expert": self.expert.name, "batch_size": len(live)},
+            )
+            for _, _, future in live:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        elapsed = (time.perf_counter() - started) * 1000
+        if self._batch_ms is None:
+            self._batch_ms = elapsed
+        else:
+            self._batch_ms += LATENCY_SMOOTHING * (elapsed - self._batch_ms)
+        self.stats["batches"] += 1
+        self.stats["processed"] += len(live)
+        for (_, _, future), output in zip(live, outputs):
+            if not future.done():
+                future.set_result(output)
+
+
+__all__ = ["ExpertBatcher"]
@@ -0,0 +1,278 @@
+"""
+Hedged, retried and fallback expert calls for ANFL Mixture of Experts.
+
+``ExpertCallPolicy.invoke`` routes a request and calls the chosen expert
+with a deadline of its ``timeout_ms``. If the call is still running after
+that expert's observed p95 latency, a duplicate goes to the next eligible
+expert and whichever answers first wins; the other is cancelled. Failed or
+timed-out attempts are retried on experts that have not failed this
+request yet, after a full-jitter exponential backoff, up to
+``max_retries`` times. Once the other experts are exhausted the router
+offers ``fallback_expert``; if it was never tried, it is called last.
+
+Hedging starts once an expert has ``HEDGE_MIN_SAMPLES`` latencies, so the
+p95 is meaningful. ``stats`` reports the hedge rate, how often the hedge
+won, and the latency percentiles of whole calls.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from ...core.logging import get_logger
+from .config import MoEConfig
+from .exceptions import ExpertTimeoutError, NoEligibleExpertError
+from .router import Features, MoERouter
+
+logger = get_logger(__name__)
+
+# Latencies an expert needs before its p95 is used as the hedge delay
+HEDGE_MIN_SAMPLES = 20
+
+# New latencies between recomputations of an expert's p95
+P95_REFRESH = 32
+
+# Upper bound of the retry backoff
+MAX_BACKOFF_MS = 1000.0
+
+ExpertCall = Callable[[str, Any], Awaitable[Any]]
+
+
+@dataclass
+class CallResult:
+    """Output of an expert call and how it was obtained."""
+
+    output: Any
+    expert: str
+    attempts: int
+    hedged: bool = False
+    fallback: bool = False
+    latency_ms: float = 0.0
+
+
+class ExpertCallPolicy:
+    """Timeouts, hedging, retries and fallback around expert calls."""
+
+    def __init__(
+        self, config: MoEConfig, router: MoERouter, call: ExpertCall, seed: Optional[int] = None
+    ):
+        """Initialize the policy.
+
+        Args:
+            config: MoE configuration
+            router: Router choosing the primary and hedge experts
+            call: Calls an expert by name with one input, e.g.
+                ``lambda name, x: batchers[name].submit(x)``
+            seed: Seed for the backoff jitter
+        """
+        self.config = config
+        self.router_config = config.router
+        self.router = router
+        self._call = call
+        self._rng = random.Random(seed)
+        window = config.monitoring.performance_window_size
+        self._latencies: Dict[str, Deque[float]] = {
+            name: deque(maxlen=window) for name in config.experts
+        }
+        self._p95: Dict[str, Tuple[int, float]] = {}
+        self._recorded: Dict[str, int] = {}
+        self._calls: Deque[float] = deque(maxlen=window)
+        self._counters: Dict[str, int] = {
+            "calls": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "retries": 0,
+            "fallbacks": 0,
+            "failures": 0,
+        }
+
+    def p95(self, name: str) -> Optional[float]:
+        """Observed p95 latency of an expert, once enough calls are recorded."""
+        latencies = self._latencies.get(name)
+        if latencies is None or len(latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        recorded = self._recorded[name]
+        cached = self._p95.get(name)
+        if cached is None or recorded - cached[0] >= P95_REFRESH:
+            cached = (recorded, float(np.percentile(latencies, 95)))
+            self._p95[name] = cached
+        return cached[1]
+
+    def _record(self, name: str, latency_ms: float) -> None:
+        if name not in self._latencies:
+            self._latencies[name] = deque(maxlen=self.config.monitoring.performance_window_size)
+        self._latencies[name].append(latency_ms)
+        self._recorded[name] = self._recorded.get(name, 0) + 1
+
+    def _timeout_ms(self, name: str) -> float:
+        return self.config.experts[name].timeout_ms
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff in seconds."""
+        ceiling = min(MAX_BACKOFF_MS, self.router_config.retry_backoff_ms * 2 ** (attempt - 1))
+        return self._rng.uniform(0, ceiling) / 1000
+
+    async def _timed(self, name: str, input_data: Any) -> Any:
+        started = time.perf_counter()
+        output = await self._call(name, input_data)
+        self._record(name, (time.perf_counter() - started) * 1000)
+        return output
+
+    async def invoke(self, input_data: Any, features: Features) -> CallResult:
+        """Call the best expert for a request, hedging, retrying and falling back.
+
+        Raises:
+            The last expert error when every attempt and the fallback failed,
+            or NoEligibleExpertError when no expert could be tried
+        """
+        started = time.perf_counter()
+        self._counters["calls"] += 1
+        failed: Set[str] = set()
+        last_error: Optional[Exception] = None
+        attempts = 0
+
+        for attempt in range(self.router_config.max_retries + 1):
+            try:
+                decision = self.router.route(features, exclude=failed, top_k=1)
+            except NoEligibleExpertError as e:
+                last_error = last_error or e
+                break
+            if attempt:
+                self._counters["retries"] += 1
+                await asyncio.sleep(self._backoff(attempt))
+            attempts += 1
+            if decision.fallback:
+                self._counters["fallbacks"] += 1
+            try:
+                output, expert, hedged = await self._attempt(
+                    decision.expert, input_data, features, failed
+                )
+            except Exception as e:
+                logger.debug(f"Expert call to {decision.expert} failed: {str(e)}")
+                last_error = e
+                continue
+            return self._finish(
+                CallResult(output, expert, attempts, hedged, fallback=decision.fallback), started
+            )
+
+        # The router only offers the fallback while it is ready; try it regardless
+        fallback = self.router_config.fallback_expert
+        if fallback is not None and fallback in self.config.experts and fallback not in failed:
+            attempts += 1
+            self._counters["fallbacks"] += 1
+            try:
+                output = await asyncio.wait_for(
+                    self._timed(fallback, input_data), self._timeout_ms(fallback) / 1000
+                )
+            except asyncio.TimeoutError:
+                last_error = ExpertTimeoutError(
+                    f"Fallback expert {fallback} did not answer in time",
+                    details={"expert": fallback},
+                )
+            except Exception as e:
+                last_error = e
+            else:
+                return self._finish(CallResult(output, fallback, attempts, fallback=True), started)
+
+        self._counters["failures"] += 1
+        raise last_error or NoEligibleExpertError(
+            "No expert can take the request", details={"tasks": sorted(features)}
+        )
+
+    async def _attempt(
+        self, primary: str, input_data: Any, features: Features, failed: Set[str]
+    ) -> Tuple[Any, str, bool]:
+        """One call to ``primary``, hedged to a second expert past its p95.
+
+        Experts that fail or time out are added to ``failed``.
+        """
+        loop = asyncio.get_running_loop()
+        tasks: Dict[asyncio.Task, str] = {
+            loop.create_task(self._timed(primary, input_data)): primary
+        }
+        deadline = loop.time() + self._timeout_ms(primary) / 1000
+        hedged = False
+        last_error: Optional[Exception] = None
+        try:
+            pending = set(tasks)
+            delay = self.p95(primary) if self.router_config.hedging else None
+            if delay is not None and loop.time() + delay / 1000 < deadline:
+                done, pending = await asyncio.wait(pending, timeout=delay / 1000)
+                if not done:
+                    hedge = self._hedge_target(features, failed | {primary})
+                    if hedge is not None:
+                        hedged = True
+                        self._counters["hedged"] += 1
+                        task = loop.create_task(self._timed(hedge, input_data))
+                        tasks[task] = hedge
+                        pending.add(task)
+                        deadline = max(deadline, loop.time() + self._timeout_ms(hedge) / 1000)
+                else:
+                    pending = done | pending
+
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if tasks[task] != primary:
+                            self._counters["hedge_wins"] += 1
+                        return task.result(), tasks[task], hedged
+                    last_error = task.exception()
+                    failed.add(tasks[task])
+
+            for task in pending:
+                name = tasks[task]
+                failed.add(name)
+                self._record(name, self._timeout_ms(name))
+            if pending:
+                raise ExpertTimeoutError(
+                    f"Expert {primary} did not answer within {self._timeout_ms(primary)}ms",
+                    details={"experts": sorted(tasks[task] for task in pending)},
+                )
+            raise last_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _hedge_target(self, features: Features, exclude: Set[str]) -> Optional[str]:
+        """Second eligible expert for a hedge, if any."""
+        try:
+            decision = self.router.route(features, exclude=exclude, top_k=1)
+        except NoEligibleExpertError:
+            return None
+        return None if decision.fallback else decision.expert
+
+    def _finish(self, result: CallResult, started: float) -> CallResult:
+        result.latency_ms = (time.perf_counter() - started) * 1000
+        self._calls.append(result.latency_ms)
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        """Counters, hedge rate and whole-call latency percentiles."""
+        stats: Dict[str, float] = dict(self._counters)
+        calls = self._counters["calls"]
+        stats["hedge_rate"] = self._counters["hedged"] / calls if calls else 0.0
+        stats["hedge_win_rate"] = (
+            self._counters["hedge_wins"] / self._counters["hedged"]
+            if self._counters["hedged"]
+            else 0.0
+        )
+        for percentile in (50, 95, 99):
+            stats[f"p{percentile}_ms"] = (
+                float(np.percentile(self._calls, percentile)) if self._calls else 0.0
+            )
+        return stats
+
+
+__all__ = ["CallResult", "ExpertCallPolicy"]
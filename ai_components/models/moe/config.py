@@ -34,6 +34,10 @@ class ExpertConfig(BaseModel):
         5000,
         description="Maximum time in milliseconds for expert processing"
     )
+    linger_ms: float = Field(
+        2.0,
+        description="Maximum time a request waits for its batch to fill"
+    )
 
 
 class RouterConfig(BaseModel):
@@ -41,7 +45,13 @@ class RouterConfig(BaseModel):
     
     routing_strategy: str = Field(
         "weighted_random",
-        description="Strategy for routing requests to experts"
+        description=(
+            "Strategy for routing requests to experts (weighted_random, top_k, capacity_aware)"
+        )
+    )
+    top_k: int = Field(
+        1,
+        description="Number of experts selected per request"
     )
     load_balancing: bool = Field(
         True,
@@ -51,6 +61,14 @@ class RouterConfig(BaseModel):
         3,
         description="Maximum number of routing retries"
     )
+    retry_backoff_ms: float = Field(
+        10.0,
+        description="Base delay before a retry; doubles per attempt, with full jitter"
+    )
+    hedging: bool = Field(
+        True,
+        description="Send a duplicate to a second expert once the first exceeds its p95 latency"
+    )
     fallback_expert: Optional[str] = Field(
         None,
         description="Expert to use when others fail"
@@ -119,6 +137,14 @@ class MoEConfig(BaseModel):
         0.1,
         description="Dropout rate for expert networks"
     )
+    gate_top_k: int = Field(
+        2,
+        description="Experts each token is dispatched to by the gating layer"
+    )
+    capacity_factor: float = Field(
+        1.25,
+        description="Per-expert token capacity relative to an even split; overflow is dropped"
+    )
     
     # Training settings
     training_strategy: str = Field(
@@ -137,7 +163,7 @@ class MoEConfig(BaseModel):
     # Resource management
     max_memory_gb: float = Field(
         32.0,
-        description="Maximum memory usage in GB"
+        description="Memory budget in GB of the global model registry"
     )
     gpu_allocation_strategy: str = Field(
         "dynamic",
@@ -0,0 +1,49 @@
+"""Exceptions for the ANFL Mixture of Experts system."""
+
+from ...core.exceptions import ModelError
+
+
+class MoEError(ModelError):
+    """Base exception for Mixture of Experts errors."""
+
+    pass
+
+
+class RoutingError(MoEError):
+    """Raised when a request cannot be routed."""
+
+    pass
+
+
+class NoEligibleExpertError(RoutingError):
+    """Raised when no expert, including the fallback, can take a request."""
+
+    pass
+
+
+class ExpertTimeoutError(MoEError):
+    """Raised when a request cannot finish within its expert's ``timeout_ms``."""
+
+    pass
+
+
+class ExpertUnavailableError(MoEError):
+    """Raised when a request is sent to an expert that is not running."""
+
+    pass
+
+
+class ExpertOverloadedError(MoEError):
+    """Raised when an expert and the fallback expert are both at capacity."""
+
+    pass
+
+
+__all__ = [
+    "MoEError",
+    "RoutingError",
+    "NoEligibleExpertError",
+    "ExpertTimeoutError",
+    "ExpertUnavailableError",
+    "ExpertOverloadedError",
+]
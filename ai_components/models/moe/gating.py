@@ -0,0 +1,259 @@
+"""
+Vectorized token-level top-k gating for the ANFL Mixture of Experts system.
+
+``MoELayer`` routes a whole batch of tokens at once:
+
+1. gate logits for every token in one matrix product, softmax, and the
+   top ``k`` experts per token;
+2. one stable sort of the (token, expert) assignments by expert, which
+   places each expert's tokens contiguously, first choices ahead of second
+   choices, and a gather of their rows into a single dispatch buffer;
+3. each expert runs once on its slice of the buffer;
+4. every token's output is gathered back from the buffer and summed with
+   its gate weights.
+
+Each expert takes at most ``ceil(capacity_factor * tokens * k / experts)``
+assignments; the rest are dropped and contribute nothing to their token.
+The auxiliary load-balancing loss is the Switch Transformer one,
+``experts * sum(fraction_routed * mean_probability)``, which is 1.0 for a
+perfectly balanced router.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from .config import MoEConfig
+
+# An expert maps a (tokens, input_dim) block to (tokens, output_dim)
+Expert = Callable[[np.ndarray], np.ndarray]
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    """Row-wise softmax in float32."""
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    np.exp(shifted, out=shifted)
+    shifted /= shifted.sum(axis=1, keepdims=True)
+    return shifted
+
+
+def expert_capacity(tokens: int, num_experts: int, k: int, capacity_factor: float) -> int:
+    """Assignments each expert accepts for a batch."""
+    return max(1, math.ceil(capacity_factor * tokens * k / num_experts))
+
+
+@dataclass
+class GateOutput:
+    """Top-k gate for a batch of tokens."""
+
+    probs: np.ndarray  # (tokens, experts) softmax of the logits
+    experts: np.ndarray  # (tokens, k) chosen experts, best first
+    weights: np.ndarray  # (tokens, k) gate weights, renormalized over the k choices
+
+
+@dataclass
+class DispatchPlan:
+    """Where each (token, choice) assignment sits in the dispatch buffer."""
+
+    tokens: np.ndarray  # (kept,) source token of each buffer row
+    offsets: np.ndarray  # (experts + 1,) start of each expert's slice
+    slots: np.ndarray  # (tokens, k) buffer row of each assignment, -1 if dropped
+    capacity: int
+    dropped: int
+
+    def expert_slice(self, expert: int) -> slice:
+        return slice(self.offsets[expert], self.offsets[expert + 1])
+
+
+class TopKGate:
+    """Linear gate choosing ``k`` experts per token."""
+
+    def __init__(
+        self,
+        input_dim: int,
+        num_experts: int,
+        k: int = 2,
+        weights: Optional[np.ndarray] = None,
+        seed: Optional[int] = None,
+    ):
+        """Initialize the gate.
+
+        Args:
+            input_dim: Token dimension
+            num_experts: Number of experts
+            k: Experts per token
+            weights: (input_dim, num_experts) gate matrix; random when omitted
+            seed: Seed for the random gate matrix
+        """
+        if not 1 <= k <= num_experts:
+            raise ValueError(f"k must be between 1 and {num_experts}, got {k}")
+        self.num_experts = num_experts
+        self.k = k
+        if weights is None:
+            rng = np.random.default_rng(seed)
+            weights = rng.standard_normal((input_dim, num_experts), dtype=np.float32)
+            weights /= np.sqrt(input_dim)
+        self.weights = np.ascontiguousarray(weights, dtype=np.float32)
+
+    def __call__(self, x: np.ndarray) -> GateOutput:
+        """Gate a (tokens, input_dim) batch."""
+        probs = softmax(x @ self.weights)
+        if self.k == 1:
+            experts = probs.argmax(axis=1)[:, None]
+        else:
+            top = np.argpartition(-probs, self.k - 1, axis=1)[:, : self.k]
+            order = np.argsort(-np.take_along_axis(probs, top, axis=1), axis=1, kind="stable")
+            experts = np.take_along_axis(top, order, axis=1)
+        weights = np.take_along_axis(probs, experts, axis=1)
+        weights /= weights.sum(axis=1, keepdims=True)
+        return GateOutput(probs, experts, weights)
+
+
+def plan_dispatch(experts: np.ndarray, num_experts: int, capacity: int) -> DispatchPlan:
+    """Sort assignments by expert and drop those beyond capacity.
+
+    Assignments are ranked choice-major, so an expert fills up with tokens
+    that chose it first before any that chose it second.
+    """
+    tokens, k = experts.shape
+    flat_expert = experts.T.ravel()
+    order = np.argsort(flat_expert, kind="stable")
+    sorted_expert = flat_expert[order]
+
+    counts = np.bincount(flat_expert, minlength=num_experts)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    position = np.arange(len(order)) - starts[sorted_expert]
+    kept = position < capacity
+
+    kept_counts = np.minimum(counts, capacity)
+    offsets = np.concatenate(([0], np.cumsum(kept_counts)))
+    slots = np.full(tokens * k, -1, dtype=np.intp)
+    slots[order[kept]] = offsets[sorted_expert[kept]] + position[kept]
+    return DispatchPlan(
+        tokens=(order[kept] % tokens),
+        offsets=offsets,
+        slots=slots.reshape(k, tokens).T,
+        capacity=capacity,
+        dropped=int(len(order) - kept.sum()),
+    )
+
+
+def load_balancing_loss(gate: GateOutput, num_experts: int) -> float:
+    """Switch Transformer auxiliary loss over all k choices; 0.0 for an empty batch."""
+    if gate.experts.size == 0:
+        return 0.0
+    routed = np.bincount(gate.experts.ravel(), minlength=num_experts) / gate.experts.size
+    mean_prob = gate.probs.mean(axis=0)
+    return float(num_experts * np.dot(routed, mean_prob))
+
+
+class FeedForwardExpert:
+    """Two-layer ReLU feed-forward expert."""
+
+    def __init__(self, input_dim: int, hidden_dim: int, rng: np.random.Generator):
+        self.w1 = rng.standard_normal((input_dim, hidden_dim), dtype=np.float32) / np.sqrt(
+            input_dim
+        )
+        self.w2 = rng.standard_normal((hidden_dim, input_dim), dtype=np.float32) / np.sqrt(
+            hidden_dim
+        )
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        hidden = x @ self.w1
+        np.maximum(hidden, 0, out=hidden)
+        return hidden @ self.w2
+
+
+@dataclass
+class MoEOutput:
+    """Result of one MoE layer forward pass."""
+
+    output: np.ndarray
+    aux_loss: float
+    dropped: int
+    expert_counts: np.ndarray
+
+
+class MoELayer:
+    """Token-level mixture of experts with vectorized dispatch."""
+
+    def __init__(
+        self,
+        gate: TopKGate,
+        experts: Sequence[Expert],
+        capacity_factor: float = 1.25,
+        load_balance_coefficient: float = 0.01,
+    ):
+        """Initialize the layer.
+
+        Args:
+            gate: Top-k gate
+            experts: One callable per gate output
+            capacity_factor: Expert capacity relative to an even split
+            load_balance_coefficient: Weight of the auxiliary loss
+        """
+        if len(experts) != gate.num_experts:
+            raise ValueError(
+                f"Gate has {gate.num_experts} outputs but {len(experts)} experts were given"
+            )
+        self.gate = gate
+        self.experts: List[Expert] = list(experts)
+        self.capacity_factor = capacity_factor
+        self.load_balance_coefficient = load_balance_coefficient
+
+    @classmethod
+    def from_config(cls, config: MoEConfig, seed: Optional[int] = None) -> "MoELayer":
+        """Randomly initialized layer shaped by ``MoEConfig``."""
+        rng = np.random.default_rng(seed)
+        gate = TopKGate(config.input_dim, config.num_experts, config.gate_top_k, seed=seed)
+        experts = [
+            FeedForwardExpert(config.input_dim, config.hidden_dim, rng)
+            for _ in range(config.num_experts)
+        ]
+        return cls(gate, experts, config.capacity_factor, config.load_balance_coefficient)
+
+    def __call__(self, x: np.ndarray) -> MoEOutput:
+        """Run a (tokens, input_dim) batch through the layer."""
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        gate = self.gate(x)
+        capacity = expert_capacity(len(x), self.gate.num_experts, self.gate.k, self.capacity_factor)
+        plan = plan_dispatch(gate.experts, self.gate.num_experts, capacity)
+
+        buffer = x[plan.tokens]
+        outputs = None
+        for index, expert in enumerate(self.experts):
+            rows = plan.expert_slice(index)
+            if rows.start == rows.stop:
+                continue
+            result = expert(buffer[rows])
+            if outputs is None:
+                # One spare zero row receives the dropped assignments
+                outputs = np.zeros((len(buffer) + 1, result.shape[1]), dtype=np.float32)
+            outputs[rows] = result
+
+        if outputs is None:
+            output = np.zeros_like(x)
+        else:
+            gathered = outputs[plan.slots]
+            output = np.einsum("tk,tkd->td", gate.weights, gathered)
+
+        return MoEOutput(
+            output=output,
+            aux_loss=self.load_balance_coefficient
+            * load_balancing_loss(gate, self.gate.num_experts),
+            dropped=plan.dropped,
+            expert_counts=np.diff(plan.offsets),
+        )
+
+
+__all__ = [
+    "FeedForwardExpert",
+    "MoELayer",
+    "MoEOutput",
+    "TopKGate",
+    "expert_capacity",
+    "load_balancing_loss",
+    "plan_dispatch",
+]
@@ -0,0 +1,166 @@
+"""
+Capacity tracking and admission control for ANFL Mixture of Experts.
+
+``LoadBalancer`` counts the requests admitted to each expert and not yet
+finished, against ``ExpertConfig.capacity``. An expert at capacity sheds
+new requests to ``RouterConfig.fallback_expert`` when it has room and, given
+``is_ready``, has warmed up; it rejects them with ``ExpertOverloadedError``
+otherwise. Pass ``load`` to ``MoERouter`` so routing skips saturated experts
+and ``power_of_two`` compares live utilization.
+
+``load_imbalance`` is how far the busiest expert's share of recent
+admissions, per unit of capacity, is above the average expert's:
+``max(share) / mean(share) - 1`` over the last ``performance_window_size``
+admissions. It is compared with ``alert_thresholds["load_imbalance"]``.
+"""
+
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional
+
+from .config import MoEConfig
+from .exceptions import ExpertOverloadedError
+
+if TYPE_CHECKING:
+    from .batching import ExpertBatcher
+
+
+class LoadBalancer:
+    """Live per-expert load with capacity-based admission control."""
+
+    def __init__(self, config: MoEConfig, is_ready: Optional[Callable[[str], bool]] = None):
+        """Initialize the load balancer.
+
+        Args:
+            config: MoE configuration
+            is_ready: Whether an expert may take live traffic, e.g.
+                ``ExpertWarmup.is_ready``; all experts are ready when omitted
+        """
+        self.config = config
+        self._is_ready = is_ready
+        self._in_flight: Counter = Counter()
+        self._batchers: Dict[str, "ExpertBatcher"] = {}
+        self._window: deque = deque(maxlen=config.monitoring.performance_window_size)
+        self._recent: Counter = Counter()
+        self._counters: Dict[str, Counter] = {
+            "admitted": Counter(),
+            "redirected": Counter(),
+            "shed": Counter(),
+        }
+
+    def attach(self, name: str, batcher: "ExpertBatcher") -> None:
+        """Report an expert's batching queue depth in ``stats``."""
+        self._batchers[name] = batcher
+
+    def detach(self, name: str) -> None:
+        """Stop reporting an expert's queue depth."""
+        self._batchers.pop(name, None)
+
+    def load(self, name: str) -> int:
+        """Requests admitted to an expert and not yet released."""
+        return self._in_flight[name]
+
+    def utilization(self, name: str) -> float:
+        """In-flight requests as a fraction of the expert's capacity."""
+        return self._in_flight[name] / self.config.experts[name].capacity
+
+    def has_capacity(self, name: str) -> bool:
+        """Whether an expert can admit another request."""
+        return self._in_flight[name] < self.config.experts[name].capacity
+
+    def admit(self, name: str) -> str:
+        """Admit a request, redirecting it to the fallback expert if needed.
+
+        Returns:
+            The expert that admitted the request; release it when done
+
+        Raises:
+            ExpertOverloadedError: If the expert is at capacity and the
+                fallback is too, or is not ready
+        """
+        target = name
+        if not self.has_capacity(name):
+            fallback = self.config.router.fallback_expert
+            if (
+                fallback is None
+                or fallback == name
+                or fallback not in self.config.experts
+                or not self.has_capacity(fallback)
+                or (self._is_ready is not None and not self._is_ready(fallback))
+            ):
+                self._counters["shed"][name] += 1
+                raise ExpertOverloadedError(
+                    f"Expert {name} is at capacity",
+                    details={
+                        "expert": name,
+                        "in_flight": self._in_flight[name],
+                        "capacity": self.config.experts[name].capacity,
+                        "fallback": fallback,
+                    },
+                )
+            self._counters["redirected"][name] += 1
+            target = fallback
+
+        self._in_flight[target] += 1
+        self._counters["admitted"][target] += 1
+        if len(self._window) == self._window.maxlen:
+            self._recent[self._window[0]] -= 1
+        self._window.append(target)
+        self._recent[target] += 1
+        return target
+
+    def release(self, name: str) -> None:
+        """Mark a request admitted to ``name`` as finished."""
+        if self._in_flight[name] > 0:
+            self._in_flight[name] -= 1
+
+    @contextmanager
+    def acquire(self, name: str) -> Iterator[str]:
+        """Admit a request for the duration of a block.
+
+        Yields:
+            The expert that admitted the request
+        """
+        target = self.admit(name)
+        try:
+            yield target
+        finally:
+            self.release(target)
+
+    def load_imbalance(self) -> float:
+        """Busiest expert's capacity-normalized share of recent admissions over the mean, less 1."""
+        if not self._window:
+            return 0.0
+        shares = [
+            self._recent[name] / expert.capacity for name, expert in self.config.experts.items()
+        ]
+        mean = sum(shares) / len(shares)
+        return max(shares) / mean - 1.0
+
+    def imbalance_alert(self) -> bool:
+        """Whether ``load_imbalance`` exceeds its alert threshold."""
+        threshold = self.config.monitoring.alert_thresholds.get("load_imbalance")
+        return threshold is not None and self.load_imbalance() > threshold
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-expert load and admission counters, plus ``load_imbalance``."""
+        experts = {}
+        for name, expert in self.config.experts.items():
+            batcher = self._batchers.get(name)
+            experts[name] = {
+                "in_flight": self._in_flight[name],
+                "queue_depth": batcher.pending if batcher else 0,
+                "capacity": expert.capacity,
+                "utilization": self.utilization(name),
+                "admitted": self._counters["admitted"][name],
+                "redirected": self._counters["redirected"][name],
+                "shed": self._counters["shed"][name],
+            }
+        return {
+            "experts": experts,
+            "load_imbalance": self.load_imbalance(),
+            "imbalance_alert": self.imbalance_alert(),
+        }
+
+
+__all__ = ["LoadBalancer"]
@@ -0,0 +1,475 @@
+"""
+Process-pool expert execution for the ANFL Mixture of Experts system.
+
+CPU-bound experts running in the server process hold the GIL and stall the
+event loop. ``ExpertProcess`` runs a group of experts in a worker process
+started with ``spawn``; ``ProcessExpertBackend`` maps expert names to
+their worker.
+
+Tensors never go through pickle: each worker has ``slots`` shared memory
+blocks, each split into an input and an output half of ``slot_bytes``. The
+parent copies a request's array into a free slot and sends only (request
+id, slot, expert, shape, dtype) over a pipe; the worker runs the expert on
+a view of the slot and writes the result into the other half. Requests
+beyond the free slots wait in the parent.
+
+The pipe and the process sentinel are watched by the event loop, so
+dispatch never blocks it. When a worker dies, the requests it had not
+answered go back to the front of the queue and the worker is restarted.
+Until those requests are done the worker gets them one at a time, so only
+the request that crashes it is blamed; a request that has been in flight
+during ``max_attempts`` crashes is failed, so one poison input cannot
+crash-loop the worker.
+
+Expert factories run in the worker and must be picklable, e.g. module-level
+functions or ``functools.partial`` of them.
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ...core.logging import get_logger
+from .exceptions import ExpertUnavailableError, MoEError
+
+logger = get_logger(__name__)
+
+# An expert maps a (rows, input_dim) array to a (rows, output_dim) array
+ExpertFactory = Callable[[], Callable[[np.ndarray], np.ndarray]]
+
+DEFAULT_SLOT_BYTES = 16 * 1024 * 1024
+
+# dtype kinds that can cross shared memory: bool, signed, unsigned, float, complex
+NUMERIC_KINDS = "biufc"
+
+
+def _worker_main(
+    conn: Any, factories: Dict[str, ExpertFactory], slot_names: List[str], slot_bytes: int
+) -> None:
+    """Worker loop: build the experts, then answer requests until told to stop."""
+    experts = {name: factory() for name, factory in factories.items()}
+    slots = [SharedMemory(name=name) for name in slot_names]
+    conn.send(("ready", None, None, None))
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            request_id, slot, expert, shape, dtype = message
+            buffer = slots[slot].buf
+            try:
+                x = np.ndarray(shape, dtype=dtype, buffer=buffer[:slot_bytes])
+                y = np.ascontiguousarray(experts[expert](x))
+                del x
+                if y.nbytes > slot_bytes:
+                    raise ValueError(
+                        f"Output of {y.nbytes} bytes exceeds the {slot_bytes}-byte slot"
+                    )
+                out = np.ndarray(y.shape, dtype=y.dtype, buffer=buffer[slot_bytes:])
+                out[...] = y
+                del out
+                conn.send((request_id, y.shape, y.dtype.str, None))
+            except Exception as e:
+                conn.send((request_id, None, None, f"{type(e).__name__}: {e}"))
+            finally:
+                del buffer
+    finally:
+        for shm in slots:
+            shm.close()
+
+
+@dataclass
+class _Request:
+    """A request waiting for, or being processed by, the worker."""
+
+    request_id: int
+    expert: str
+    array: np.ndarray
+    future: asyncio.Future
+    attempts: int = 0
+    slot: int = -1
+
+
+class ExpertProcess:
+    """A worker process hosting a group of experts."""
+
+    def __init__(
+        self,
+        factories: Dict[str, ExpertFactory],
+        slots: int = 4,
+        slot_bytes: int = DEFAULT_SLOT_BYTES,
+        max_attempts: int = 2,
+        restart_delay: float = 1.0,
+        name: Optional[str] = None,
+    ):
+        """Initialize the worker handle.
+
+        Args:
+            factories: Expert name to a picklable factory building the expert
+            slots: Requests the worker may hold at once
+            slot_bytes: Largest input, and largest output, of one request
+            max_attempts: Worker crashes a request may live through
+            restart_delay: Seconds to wait before restarting a crashed worker
+            name: Name used in logs
+        """
+        self.factories = dict(factories)
+        self.name = name or "+".join(sorted(self.factories))
+        self.slot_count = slots
+        self.slot_bytes = slot_bytes
+        self.max_attempts = max_attempts
+        self.restart_delay = restart_delay
+        self._context = multiprocessing.get_context("spawn")
+        self._slots: List[SharedMemory] = []
+        self._free: List[int] = []
+        self._waiting: Deque[_Request] = deque()
+        self._sent: Dict[int, _Request] = {}
+        self._suspects = 0
+        self._ids = itertools.count()
+        self._process: Any = None
+        self._conn: Any = None
+        self._watching = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Future] = None
+        self._closing = False
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "completed": 0,
+            "failed": 0,
+            "requeued": 0,
+            "restarts": 0,
+        }
+
+    @property
+    def pending(self) -> int:
+        """Requests queued in the parent or held by the worker."""
+        return len(self._waiting) + len(self._sent)
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether a worker is up and accepting requests."""
+        return self._ready is not None and self._ready.done() and not self._ready.exception()
+
+    async def start(self) -> None:
+        """Allocate the shared slots and start the worker."""
+        if self._process is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._closing = False
+        self._slots = [
+            SharedMemory(create=True, size=2 * self.slot_bytes) for _ in range(self.slot_count)
+        ]
+        self._spawn()
+        try:
+            await asyncio.shield(self._ready)
+        except Exception:
+            await self.close()
+            raise
+        logger.info(f"Expert process started: {self.name} (pid={self._process.pid})")
+
+    def _spawn(self) -> None:
+        """Start a worker and watch its pipe and sentinel."""
+        parent, child = self._context.Pipe()
+        self._conn = parent
+        self._ready = self._loop.create_future()
+        self._ready.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(child, self.factories, [shm.name for shm in self._slots], self.slot_bytes),
+            name=f"expert-{self.name}",
+            daemon=True,
+        )
+        self._process.start()
+        child.close()
+        self._free = list(range(self.slot_count))
+        self._loop.add_reader(parent.fileno(), self._on_readable)
+        self._loop.add_reader(self._process.sentinel, self._on_exit)
+        self._watching = True
+
+    def _unwatch(self) -> None:
+        """Stop watching the worker and close the pipe."""
+        if self._watching:
+            self._loop.remove_reader(self._conn.fileno())
+            self._loop.remove_reader(self._process.sentinel)
+            self._conn.close()
+            self._watching = False
+
+    async def run(self, expert: str, x: np.ndarray) -> np.ndarray:
+        """Run an expert on an array in the worker.
+
+        Raises:
+            ExpertUnavailableError: If the worker is not running
+            ValueError: If the array is not numeric or does not fit a slot
+            MoEError: If the expert raises or keeps crashing the worker
+        """
+        if self._process is None or self._closing:
+            raise ExpertUnavailableError(
+                f"Expert process {self.name} is not running", details={"expert": expert}
+            )
+        if expert not in self.factories:
+            raise ExpertUnavailableError(
+                f"Expert {expert} is not hosted by process {self.name}",
+                details={"experts": sorted(self.factories)},
+            )
+        array = np.ascontiguousarray(x)
+        # Only plain numbers survive a byte copy into shared memory; object
+        # arrays would hand the worker raw pointers into this process
+        if array.dtype.kind not in NUMERIC_KINDS:
+            raise ValueError(
+                f"Expert inputs must be numeric or bool arrays, got dtype {array.dtype}"
+            )
+        if array.nbytes > self.slot_bytes:
+            raise ValueError(
+                f"Input of {array.nbytes} bytes exceeds the {self.slot_bytes}-byte slot"
+            )
+
+        self.stats["requests"] += 1
+        future = self._loop.create_future()
+        self._waiting.append(_Request(next(self._ids), expert, array, future))
+        self._pump()
+        return await future
+
+    def _pump(self) -> None:
+        """Send waiting requests to free slots."""
+        if not self.is_ready:
+            return
+        while self._free and self._waiting:
+            if self._suspects and self._sent:
+                # Requests that were in flight during a crash run alone
+                return
+            request = self._waiting.popleft()
+            if request.future.done():
+                self._settle(request)
+                continue
+            request.slot = self._free.pop()
+            view = np.ndarray(
+                request.array.shape, request.array.dtype, buffer=self._slots[request.slot].buf
+            )
+            view[...] = request.array
+            del view
+            self._sent[request.request_id] = request
+            self._conn.send(
+                (
+                    request.request_id,
+                    request.slot,
+                    request.expert,
+                    request.array.shape,
+                    request.array.dtype.str,
+                )
+            )
+
+    def _on_readable(self) -> None:
+        """Handle worker replies."""
+        try:
+            while self._conn.poll():
+                self._handle_reply(self._conn.recv())
+        except (EOFError, OSError):
+            # The worker is gone; _on_exit requeues its requests
+            return
+        self._pump()
+
+    def _handle_reply(self, reply: Tuple[Any, Any, Any, Optional[str]]) -> None:
+        request_id, shape, dtype, error = reply
+        if request_id == "ready":
+            if not self._ready.done():
+                self._ready.set_result(None)
+            return
+        request = self._sent.pop(request_id, None)
+        if request is None:
+            return
+        self._free.append(request.slot)
+        self._settle(request)
+        if request.future.done():
+            return
+        if error is not None:
+            self.stats["failed"] += 1
+            request.future.set_exception(
+                MoEError(
+                    f"Expert {request.expert} failed: {error}",
+                    details={"expert": request.expert, "process": self.name},
+                )
+            )
+            return
+        out = np.ndarray(
+            shape, dtype=dtype, buffer=self._slots[request.slot].buf[self.slot_bytes :]
+        )
+        self.stats["completed"] += 1
+        request.future.set_result(out.copy())
+        del out
+
+    def _settle(self, request: _Request) -> None:
+        """Forget a request that is leaving the queue for good."""
+        if request.attempts:
+            self._suspects -= 1
+
+    def _on_exit(self) -> None:
+        """Requeue the dead worker's requests and restart it."""
+        # Replies the worker sent before exiting are still valid
+        try:
+            while self._conn.poll():
+                self._handle_reply(self._conn.recv())
+        except (EOFError, OSError):
+            pass
+        self._unwatch()
+        # The sentinel fires as the process exits; reaping it takes a moment
+        self._process.join(0.1)
+        exitcode = self._process.exitcode
+        started = self._ready.done()
+        if not started:
+            self._ready.set_exception(
+                ExpertUnavailableError(
+                    f"Expert process {self.name} exited during startup (exit code {exitcode})",
+                    details={"process": self.name},
+                )
+            )
+        if self._closing:
+            return
+
+        requeue = sorted(self._sent.values(), key=lambda r: r.request_id, reverse=True)
+        self._sent.clear()
+        for request in requeue:
+            if not request.attempts:
+                self._suspects += 1
+            request.attempts += 1
+            if request.attempts >= self.max_attempts:
+                self._settle(request)
+                self.stats["failed"] += 1
+                if not request.future.done():
+                    request.future.set_exception(
+                        MoEError(
+                            f"Expert {request.expert} crashed its worker {request.attempts} times",
+                            details={"expert": request.expert, "process": self.name},
+                        )
+                    )
+                continue
+            self.stats["requeued"] += 1
+            self._waiting.appendleft(request)
+
+        if not started:
+            # A worker that cannot start would crash-loop; fail what is waiting
+            logger.error(f"Expert process {self.name} exited during startup (exit code {exitcode})")
+            self._fail_waiting(self._ready.exception())
+            self._process = None
+            return
+
+        self.stats["restarts"] += 1
+        logger.warning(
+            f"Expert process {self.name} exited (exit code {exitcode}); "
+            f"restarting with {len(self._waiting)} queued requests"
+        )
+        self._loop.call_later(self.restart_delay, self._restart)
+
+    def _restart(self) -> None:
+        if self._closing:
+            return
+        self._spawn()
+        self._ready.add_done_callback(lambda f: self._pump())
+
+    def _fail_waiting(self, error: Exception) -> None:
+        while self._waiting:
+            request = self._waiting.popleft()
+            self._settle(request)
+            if not request.future.done():
+                self.stats["failed"] += 1
+                request.future.set_exception(error)
+
+    async def close(self) -> None:
+        """Stop the worker and release the shared slots."""
+        self._closing = True
+        if self._process is not None:
+            self._fail_waiting(
+                ExpertUnavailableError(
+                    f"Expert process {self.name} is closing", details={"process": self.name}
+                )
+            )
+            if self._process.is_alive():
+                try:
+                    self._conn.send(None)
+                except OSError:
+                    pass
+                await self._loop.run_in_executor(None, self._process.join, 5)
+                if self._process.is_alive():
+                    self._process.kill()
+                    await self._loop.run_in_executor(None, self._process.join)
+            self._unwatch()
+            for request in self._sent.values():
+                if not request.future.done():
+                    request.future.set_exception(
+                        ExpertUnavailableError(
+                            f"Expert process {self.name} closed", details={"process": self.name}
+                        )
+                    )
+            self._sent.clear()
+            self._suspects = 0
+            self._process = None
+        for shm in self._slots:
+            shm.close()
+            shm.unlink()
+        self._slots = []
+        logger.info(f"Expert process closed: {self.name} {self.stats}")
+
+
+class ProcessExpertBackend:
+    """Experts spread over worker processes, addressed by expert name."""
+
+    def __init__(self, groups: Sequence[Dict[str, ExpertFactory]], **process_options: Any):
+        """Initialize the backend.
+
+        Args:
+            groups: Experts to host together in one worker, per worker
+            process_options: ``ExpertProcess`` options shared by all workers
+        """
+        self.processes = [ExpertProcess(group, **process_options) for group in groups]
+        self._by_expert: Dict[str, ExpertProcess] = {}
+        for process in self.processes:
+            for expert in process.factories:
+                if expert in self._by_expert:
+                    raise ValueError(f"Expert {expert} is assigned to more than one process")
+                self._by_expert[expert] = process
+
+    async def start(self) -> None:
+        """Start every worker."""
+        try:
+            await asyncio.gather(*(process.start() for process in self.processes))
+        except Exception:
+            await self.close()
+            raise
+
+    async def close(self) -> None:
+        """Stop every worker."""
+        await asyncio.gather(*(process.close() for process in self.processes))
+
+    async def run(self, expert: str, x: np.ndarray) -> np.ndarray:
+        """Run an expert on an array in its worker."""
+        process = self._by_expert.get(expert)
+        if process is None:
+            raise ExpertUnavailableError(
+                f"Expert {expert} is not hosted by any process",
+                details={"experts": sorted(self._by_expert)},
+            )
+        return await process.run(expert, x)
+
+    def forward(self, expert: str) -> Callable[[List[Any]], Any]:
+        """Async batched forward pass for ``ExpertBatcher``."""
+
+        async def forward(inputs: List[Any]) -> List[np.ndarray]:
+            return list(await self.run(expert, np.stack(inputs)))
+
+        return forward
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Counters per worker."""
+        return {
+            process.name: dict(process.stats, pending=process.pending) for process in self.processes
+        }
+
+
+__all__ = ["ExpertProcess", "ProcessExpertBackend"]
@@ -0,0 +1,290 @@
+"""
+Request router for the ANFL Mixture of Experts system.
+
+Requests are described by features: task names mapped to weights, taken
+from ``context["tasks"]`` (or ``context["task"]``). An expert's score is the
+total weight of the tasks in its ``specialization``; experts specialized in
+``general_purpose`` also get a small prior so they take requests nothing
+else matches.
+
+Scores depend only on the features, so they are memoized in an LRU of
+``routing_cache_size`` entries keyed by a digest of the features. The
+strategy is applied on every request, which keeps weighted sampling random
+and capacity-aware choices current:
+
+* ``weighted_random`` samples experts in proportion to their scores;
+* ``top_k`` takes the highest-scoring experts;
+* ``capacity_aware`` scales scores by each expert's free capacity;
+* ``power_of_two`` draws two eligible experts at random and takes the one
+  using less of its capacity (power-of-two-choices).
+"""
+
+import hashlib
+import random
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ...core.exceptions import ConfigurationError
+from ...core.logging import get_logger
+from .config import MoEConfig
+from .exceptions import NoEligibleExpertError
+
+logger = get_logger(__name__)
+
+STRATEGIES = ("weighted_random", "top_k", "capacity_aware", "power_of_two")
+GENERAL_SPECIALIZATION = "general_purpose"
+
+# Score general-purpose experts get before any task matches
+GENERAL_PRIOR = 0.1
+
+Features = Dict[str, float]
+
+
+def extract_features(input_data: Any, context: Optional[Dict[str, Any]] = None) -> Features:
+    """Routing features of a request.
+
+    Tasks come from the context, or from the input when it is a mapping, as
+    a task name, a list of names, or a mapping of names to weights.
+    """
+    source = context or {}
+    if "tasks" not in source and "task" not in source and isinstance(input_data, dict):
+        source = input_data
+    tasks = source.get("tasks", source.get("task"))
+    if tasks is None:
+        return {}
+    if isinstance(tasks, str):
+        return {tasks: 1.0}
+    if isinstance(tasks, dict):
+        return {str(task): float(weight) for task, weight in tasks.items()}
+    return {str(task): 1.0 for task in tasks}
+
+
+def feature_digest(features: Features) -> bytes:
+    """Stable 16-byte digest of routing features."""
+    payload = "\x1f".join(f"{task}\x1e{weight!r}" for task, weight in sorted(features.items()))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+
+@dataclass(frozen=True)
+class RoutingDecision:
+    """Experts chosen for a request, best first, with their gate weights."""
+
+    experts: Tuple[str, ...]
+    weights: Tuple[float, ...]
+    cached: bool = False
+    fallback: bool = False
+
+    @property
+    def expert(self) -> str:
+        """The primary expert."""
+        return self.experts[0]
+
+
+class MoERouter:
+    """Scores experts against request features and picks per the routing strategy."""
+
+    def __init__(
+        self,
+        config: MoEConfig,
+        load: Optional[Callable[[str], float]] = None,
+        seed: Optional[int] = None,
+        is_ready: Optional[Callable[[str], bool]] = None,
+    ):
+        """Initialize the router.
+
+        Args:
+            config: MoE configuration
+            load: Returns an expert's current in-flight requests, e.g.
+                ``LoadBalancer.load``; used by ``capacity_aware`` and
+                ``power_of_two`` and, with ``load_balancing``, to skip
+                experts at capacity
+            seed: Seed for ``weighted_random`` and ``power_of_two`` sampling
+            is_ready: Whether an expert may take live traffic, e.g.
+                ``ExpertWarmup.is_ready``; all experts are ready when omitted
+        """
+        self.config = config
+        self.router_config = config.router
+        if self.router_config.routing_strategy not in STRATEGIES:
+            raise ConfigurationError(
+                f"Unknown routing strategy: {self.router_config.routing_strategy}",
+                details={"strategies": list(STRATEGIES)},
+            )
+        self._load = load
+        self._is_ready = is_ready
+        self._rng = random.Random(seed)
+        self._cache: "OrderedDict[bytes, Tuple[float, ...]]" = OrderedDict()
+        self._timings: deque = deque(maxlen=config.monitoring.performance_window_size)
+        self._counters: Dict[str, int] = {
+            "routed": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "fallbacks": 0,
+        }
+        self._build()
+
+    def _build(self) -> None:
+        """Index expert specializations for scoring."""
+        experts = self.config.experts
+        self._names: List[str] = list(experts)
+        self._capacities: List[int] = [experts[name].capacity for name in self._names]
+        self._by_task: Dict[str, List[int]] = {}
+        for index, name in enumerate(self._names):
+            for task in experts[name].specialization:
+                self._by_task.setdefault(task, []).append(index)
+        self._prior = tuple(
+            GENERAL_PRIOR if GENERAL_SPECIALIZATION in experts[name].specialization else 0.0
+            for name in self._names
+        )
+
+    def update_experts(self) -> None:
+        """Re-index after ``config.experts`` changed, dropping cached scores."""
+        self._build()
+        self._cache.clear()
+
+    def scores(self, features: Features) -> Tuple[Tuple[float, ...], bool]:
+        """Score of every expert for the features, and whether it was cached."""
+        key = feature_digest(features)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self._counters["cache_hits"] += 1
+            return cached, True
+
+        self._counters["cache_misses"] += 1
+        scores = list(self._prior)
+        for task, weight in features.items():
+            for index in self._by_task.get(task, ()):
+                scores[index] += weight
+        result = tuple(scores)
+        self._cache[key] = result
+        if len(self._cache) > self.router_config.routing_cache_size:
+            self._cache.popitem(last=False)
+        return result, False
+
+    def route(
+        self, features: Features, exclude: Iterable[str] = (), top_k: Optional[int] = None
+    ) -> RoutingDecision:
+        """Choose experts for a request.
+
+        Args:
+            features: Routing features, see ``extract_features``
+            exclude: Experts to skip, e.g. ones that already failed this request
+            top_k: Experts to select; defaults to ``router.top_k``
+
+        Returns:
+            Routing decision
+
+        Raises:
+            NoEligibleExpertError: If no ready expert scores above zero and
+                the fallback expert is unset, excluded or not ready
+        """
+        started = time.perf_counter_ns()
+        try:
+            return self._route(features, set(exclude), top_k or self.router_config.top_k)
+        finally:
+            self._counters["routed"] += 1
+            self._timings.append((time.perf_counter_ns() - started) / 1000)
+
+    def _route(self, features: Features, exclude: set, k: int) -> RoutingDecision:
+        scores, cached = self.scores(features)
+        strategy = self.router_config.routing_strategy
+        check_load = self._load is not None and (
+            strategy in ("capacity_aware", "power_of_two") or self.router_config.load_balancing
+        )
+
+        candidates: List[Tuple[float, int]] = []
+        headrooms: Dict[int, float] = {}
+        for index, score in enumerate(scores):
+            if score <= 0 or self._names[index] in exclude:
+                continue
+            if self._is_ready and not self._is_ready(self._names[index]):
+                continue
+            if check_load:
+                headroom = 1.0 - self._load(self._names[index]) / self._capacities[index]
+                if headroom <= 0:
+                    continue
+                headrooms[index] = headroom
+                if strategy == "capacity_aware":
+                    score *= headroom
+            candidates.append((score, index))
+
+        if not candidates:
+            return self._fallback(features, exclude, cached)
+
+        if strategy == "weighted_random" and len(candidates) > k:
+            chosen = self._sample(candidates, k)
+        elif strategy == "power_of_two" and len(candidates) > k:
+            chosen = self._two_choices(candidates, headrooms, k)
+        else:
+            chosen = sorted(candidates, reverse=True)[:k]
+        total = sum(score for score, _ in chosen)
+        return RoutingDecision(
+            tuple(self._names[index] for _, index in chosen),
+            tuple(score / total for score, _ in chosen),
+            cached,
+        )
+
+    def _sample(self, candidates: List[Tuple[float, int]], k: int) -> List[Tuple[float, int]]:
+        """Weighted sampling of ``k`` candidates without replacement."""
+        remaining = list(candidates)
+        chosen = []
+        for _ in range(k):
+            pick = self._rng.random() * sum(score for score, _ in remaining)
+            for position, (score, _) in enumerate(remaining):
+                pick -= score
+                if pick < 0:
+                    break
+            chosen.append(remaining.pop(position))
+        return chosen
+
+    def _two_choices(
+        self, candidates: List[Tuple[float, int]], headrooms: Dict[int, float], k: int
+    ) -> List[Tuple[float, int]]:
+        """Power-of-two-choices: of two random candidates keep the less loaded."""
+        remaining = list(candidates)
+        chosen = []
+        for _ in range(k):
+            if len(remaining) == 1:
+                chosen.append(remaining.pop())
+                break
+            first, second = self._rng.sample(range(len(remaining)), 2)
+            key_first = (headrooms.get(remaining[first][1], 1.0), remaining[first][0])
+            key_second = (headrooms.get(remaining[second][1], 1.0), remaining[second][0])
+            chosen.append(remaining.pop(first if key_first >= key_second else second))
+        return chosen
+
+    def _fallback(self, features: Features, exclude: set, cached: bool) -> RoutingDecision:
+        """Send a request nothing else can take to the fallback expert."""
+        fallback = self.router_config.fallback_expert
+        if (
+            fallback is None
+            or fallback in exclude
+            or fallback not in self.config.experts
+            or (self._is_ready and not self._is_ready(fallback))
+        ):
+            raise NoEligibleExpertError(
+                "No expert can take the request",
+                details={"tasks": sorted(features), "excluded": sorted(exclude)},
+            )
+        self._counters["fallbacks"] += 1
+        logger.debug(f"Routing to fallback expert {fallback}")
+        return RoutingDecision((fallback,), (1.0,), cached, fallback=True)
+
+    def stats(self) -> Dict[str, float]:
+        """Routing counters and per-request overhead in microseconds."""
+        timings = sorted(self._timings)
+        stats: Dict[str, float] = dict(self._counters)
+        stats["cache_size"] = len(self._cache)
+        stats["mean_us"] = sum(timings) / len(timings) if timings else 0.0
+        stats["p99_us"] = timings[int(len(timings) * 0.99)] if timings else 0.0
+        return stats
+
+
+__all__ = [
+    "MoERouter",
+    "RoutingDecision",
+    "extract_features",
+    "feature_digest",
+]
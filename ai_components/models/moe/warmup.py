@@ -0,0 +1,220 @@
+"""
+Expert warm-up for the ANFL Mixture of Experts system.
+
+A freshly loaded expert pays for allocator growth, cold caches and one-time
+graph tracing on its first requests. ``ExpertWarmup`` runs an expert's
+``warm_up_samples`` inputs through its ``ExpertBatcher`` at each warm-up
+batch size (powers of two up to ``batch_size``), then keeps sending full
+batches until the latency of the last few is stable, and only then marks
+the expert ready. Pass ``is_ready`` to ``MoERouter`` and ``LoadBalancer``
+so live traffic waits for it, and ``attach`` it to the ``ModelRegistry`` so
+experts are warmed up when registered and again after every reload.
+
+Inputs are recorded samples when given, otherwise synthetic float32
+vectors of ``MoEConfig.input_dim``. An expert whose latency never settles
+within ``max_sample_factor`` times its warm-up samples is still marked
+ready, with a warning, rather than kept out of service.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from ...core.logging import get_logger
+from .batching import ExpertBatcher
+from .config import MoEConfig
+
+if TYPE_CHECKING:
+    from ..base import ModelRegistry
+
+logger = get_logger(__name__)
+
+# Deadline for warm-up requests; first calls may be far slower than timeout_ms
+WARMUP_TIMEOUT_MS = 300000
+
+
+@dataclass
+class WarmupReport:
+    """Outcome of warming up one expert."""
+
+    expert: str
+    samples: int = 0
+    batch_sizes: List[int] = field(default_factory=list)
+    first_batch_ms: Optional[float] = None
+    steady_batch_ms: Optional[float] = None
+    stabilized: bool = False
+    duration_s: float = 0.0
+
+
+def warmup_batch_sizes(batch_size: int) -> List[int]:
+    """Powers of two below ``batch_size``, then ``batch_size`` itself."""
+    sizes = []
+    size = 1
+    while size < batch_size:
+        sizes.append(size)
+        size *= 2
+    sizes.append(batch_size)
+    return sizes
+
+
+def is_stable(latencies: Sequence[float], tolerance: float) -> bool:
+    """Whether every latency is within ``tolerance`` of their median."""
+    median = float(np.median(latencies))
+    return all(abs(latency - median) <= tolerance * median for latency in latencies)
+
+
+class ExpertWarmup:
+    """Warms experts up and tracks which ones may take live traffic."""
+
+    def __init__(
+        self,
+        config: MoEConfig,
+        sample_factory: Optional[Callable[[int], Any]] = None,
+        stability_window: int = 5,
+        tolerance: float = 0.15,
+        max_sample_factor: int = 3,
+    ):
+        """Initialize warm-up.
+
+        Args:
+            config: MoE configuration
+            sample_factory: Makes the n-th synthetic input; defaults to
+                random vectors of ``input_dim``
+            stability_window: Full batches whose latency must agree
+            tolerance: Allowed relative deviation from their median
+            max_sample_factor: Give up waiting for stability after this many
+                times ``warm_up_samples``
+        """
+        self.config = config
+        self.stability_window = stability_window
+        self.tolerance = tolerance
+        self.max_sample_factor = max_sample_factor
+        self._sample_factory = sample_factory or self._synthetic_sample
+        self._rng = np.random.default_rng(0)
+        self._ready: Dict[str, bool] = {}
+        self._warmups: Dict[str, asyncio.Task] = {}
+        self.reports: Dict[str, WarmupReport] = {}
+
+    def _synthetic_sample(self, index: int) -> np.ndarray:
+        return self._rng.standard_normal(self.config.input_dim, dtype=np.float32)
+
+    def is_ready(self, name: str) -> bool:
+        """Whether an expert has finished warming up."""
+        return self._ready.get(name, False)
+
+    def mark_unready(self, name: str) -> None:
+        """Take an expert out of live traffic, e.g. before a reload."""
+        self._ready[name] = False
+
+    def attach(self, registry: "ModelRegistry", batchers: Mapping[str, ExpertBatcher]) -> None:
+        """Warm experts up whenever the registry registers or loads them.
+
+        Each warm-up loads the expert first, so a registered expert is
+        brought into service without waiting for traffic it cannot get.
+
+        Args:
+            registry: Registry holding the expert models, named after their experts
+            batchers: Expert name to its started batcher, looked up when
+                the expert loads
+        """
+
+        def on_load(name: str) -> None:
+            if name not in self.config.experts or name in self._warmups:
+                return
+            batcher = batchers.get(name)
+            if batcher is None:
+                logger.warning(f"Expert {name} has no batcher to warm it up through")
+                return
+            task = asyncio.get_running_loop().create_task(
+                self._load_and_warm_up(registry, name, batcher)
+            )
+            self._warmups[name] = task
+            task.add_done_callback(lambda _: self._warmups.pop(name, None))
+
+        registry.add_load_listener(on_load)
+
+    async def _load_and_warm_up(
+        self, registry: "ModelRegistry", name: str, batcher: ExpertBatcher
+    ) -> None:
+        self.mark_unready(name)
+        try:
+            await registry.load(name)
+            await self.warm_up(name, batcher)
+        except Exception as e:
+            logger.error(f"Failed to warm up expert {name}: {str(e)}")
+
+    async def warm_up(
+        self, name: str, batcher: ExpertBatcher, samples: Optional[Sequence[Any]] = None
+    ) -> WarmupReport:
+        """Warm an expert up through its batcher and mark it ready.
+
+        Call when the expert is registered or reloaded; it is kept out of
+        live traffic until this returns.
+
+        Args:
+            name: Expert name
+            batcher: Started batcher of the expert
+            samples: Recorded inputs to replay; synthetic inputs otherwise
+
+        Returns:
+            Warm-up report
+        """
+        self.mark_unready(name)
+        expert = self.config.experts[name]
+        report = WarmupReport(expert=name, batch_sizes=warmup_batch_sizes(expert.batch_size))
+        started = time.perf_counter()
+
+        def next_inputs(count: int) -> List[Any]:
+            start = report.samples
+            report.samples += count
+            if samples:
+                return [samples[(start + i) % len(samples)] for i in range(count)]
+            return [self._sample_factory(start + i) for i in range(count)]
+
+        async def run_batch(size: int) -> float:
+            inputs = next_inputs(size)
+            batch_started = time.perf_counter()
+            await asyncio.gather(*(batcher.submit(x, WARMUP_TIMEOUT_MS) for x in inputs))
+            return (time.perf_counter() - batch_started) * 1000
+
+        # One pass over every batch size, repeated until the sample budget is spent
+        while True:
+            for size in report.batch_sizes:
+                latency = await run_batch(size)
+                if report.first_batch_ms is None:
+                    report.first_batch_ms = latency
+            if report.samples >= expert.warm_up_samples:
+                break
+
+        # Full batches until their latency settles
+        recent: List[float] = []
+        limit = max(expert.warm_up_samples, 1) * self.max_sample_factor
+        while True:
+            recent.append(await run_batch(expert.batch_size))
+            recent = recent[-self.stability_window :]
+            if len(recent) == self.stability_window and is_stable(recent, self.tolerance):
+                report.stabilized = True
+                break
+            if report.samples >= limit and len(recent) == self.stability_window:
+                break
+
+        report.steady_batch_ms = float(np.median(recent))
+        report.duration_s = time.perf_counter() - started
+        batcher.reset_latency(report.steady_batch_ms)
+        if not report.stabilized:
+            logger.warning(
+                f"Expert {name} latency did not stabilize after {report.samples} warm-up samples"
+            )
+        self.reports[name] = report
+        self._ready[name] = True
+        logger.info(
+            f"Expert {name} ready after {report.samples} warm-up samples: "
+            f"first batch {report.first_batch_ms:.1f}ms, steady {report.steady_batch_ms:.1f}ms"
+        )
+        return report
+
+
+__all__ = ["ExpertWarmup", "WarmupReport", "warmup_batch_sizes"]
@@ -0,0 +1,313 @@
+"""
+Memory-mapped, zero-copy model weights for ANFL models.
+
+``load_weights`` maps weight files read-only and returns numpy views into
+the mapping, so opening a checkpoint is near-instant and its pages are
+read on first touch. Each page lives in the OS page cache once, however
+many worker processes map the same file.
+
+Supported layouts:
+
+- ``.safetensors`` files, parsed directly: an 8-byte little-endian header
+  length, a JSON header of dtype, shape and data offsets per tensor, then
+  the raw tensor bytes. A directory of shards is merged.
+- ``.npy`` files, one tensor each, named after the file. A directory of
+  them is one checkpoint.
+
+``convert_checkpoint`` rewrites existing checkpoints (``.npz``, ``.npy``,
+``.safetensors`` and PyTorch ``.pt``/``.pth``/``.bin`` state dicts) into
+either layout. Reading PyTorch checkpoints needs ``torch``.
+"""
+
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Union
+
+import numpy as np
+
+from ..core.exceptions import ModelLoadError
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+SAFETENSORS_DTYPES: Dict[str, np.dtype] = {
+    "F64": np.dtype("<f8"),
+    "F32": np.dtype("<f4"),
+    "F16": np.dtype("<f2"),
+    "I64": np.dtype("<i8"),
+    "I32": np.dtype("<i4"),
+    "I16": np.dtype("<i2"),
+    "I8": np.dtype("i1"),
+    "U64": np.dtype("<u8"),
+    "U32": np.dtype("<u4"),
+    "U16": np.dtype("<u2"),
+    "U8": np.dtype("u1"),
+    "BOOL": np.dtype("?"),
+}
+_DTYPE_NAMES = {dtype: name for name, dtype in SAFETENSORS_DTYPES.items()}
+
+# Tensor data starts on this boundary so mapped arrays are aligned
+HEADER_ALIGNMENT = 8
+
+TORCH_SUFFIXES = (".pt", ".pth", ".bin")
+
+PathLike = Union[str, Path]
+
+
+class MappedWeights(Mapping[str, np.ndarray]):
+    """Read-only tensors backed by memory-mapped weight files."""
+
+    def __init__(self, tensors: Dict[str, np.ndarray], paths: List[Path], metadata: Dict[str, str]):
+        self._tensors = tensors
+        self.paths = paths
+        self.metadata = metadata
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._tensors[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._tensors)
+
+    def __len__(self) -> int:
+        return len(self._tensors)
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the tensors."""
+        return sum(tensor.nbytes for tensor in self._tensors.values())
+
+    def close(self) -> None:
+        """Drop the tensors; the mappings go once no views of them remain."""
+        self._tensors = {}
+
+    def __repr__(self) -> str:
+        return f"MappedWeights(tensors={len(self)}, nbytes={self.nbytes}, paths={len(self.paths)})"
+
+
+def _map_safetensors(path: Path, tensors: Dict[str, np.ndarray], metadata: Dict[str, str]) -> None:
+    """Add the tensors of one safetensors file as views into its mapping."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < 8:
+            raise ModelLoadError("Truncated safetensors file", details={"path": str(path)})
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    (header_size,) = struct.unpack("<Q", buffer[:8])
+    data_start = 8 + header_size
+    if data_start > size:
+        raise ModelLoadError("Truncated safetensors header", details={"path": str(path)})
+    header = json.loads(buffer[8:data_start])
+    metadata.update(header.pop("__metadata__", None) or {})
+
+    for name, entry in header.items():
+        dtype = SAFETENSORS_DTYPES.get(entry["dtype"])
+        if dtype is None:
+            raise ModelLoadError(
+                f"Unsupported tensor dtype: {entry['dtype']}",
+                details={
+                    "path": str(path),
+                    "tensor": name,
+                    "supported": sorted(SAFETENSORS_DTYPES),
+                },
+            )
+        begin, end = entry["data_offsets"]
+        shape = tuple(entry["shape"])
+        count = int(np.prod(shape, dtype=np.int64))
+        if end - begin != count * dtype.itemsize or data_start + end > size:
+            raise ModelLoadError(
+                f"Tensor {name} does not match its data offsets",
+                details={"path": str(path), "tensor": name},
+            )
+        if name in tensors:
+            raise ModelLoadError(f"Duplicate tensor: {name}", details={"path": str(path)})
+        tensors[name] = np.frombuffer(
+            buffer, dtype=dtype, count=count, offset=data_start + begin
+        ).reshape(shape)
+
+
+def _npy_name(path: Path, root: Path) -> str:
+    return path.relative_to(root).with_suffix("").as_posix().replace("/", ".")
+
+
+def load_weights(path: PathLike) -> MappedWeights:
+    """Memory-map a checkpoint read-only.
+
+    Args:
+        path: A ``.safetensors`` or ``.npy`` file, or a directory of
+            ``.safetensors`` shards or of ``.npy`` files
+
+    Returns:
+        Mapping of tensor name to read-only array
+
+    Raises:
+        ModelLoadError: If the path holds no supported weights or a file is malformed
+    """
+    path = Path(path)
+    tensors: Dict[str, np.ndarray] = {}
+    metadata: Dict[str, str] = {}
+
+    if path.is_dir():
+        files = sorted(path.glob("*.safetensors"))
+        if not files:
+            files = sorted(path.rglob("*.npy"))
+    else:
+        files = [path] if path.exists() else []
+    if not files:
+        raise ModelLoadError("No weight files found", details={"path": str(path)})
+
+    for file in files:
+        if file.suffix == ".safetensors":
+            _map_safetensors(file, tensors, metadata)
+        elif file.suffix == ".npy":
+            name = _npy_name(file, path) if path.is_dir() else file.stem
+            tensors[name] = np.load(file, mmap_mode="r")
+        else:
+            raise ModelLoadError(
+                f"Unsupported weight file: {file.name}",
+                details={"path": str(file), "hint": "convert it with convert_checkpoint"},
+            )
+
+    logger.debug(f"Mapped {len(tensors)} tensors from {path}")
+    return MappedWeights(tensors, files, metadata)
+
+
+def save_safetensors(
+    tensors: Mapping[str, np.ndarray], path: PathLike, metadata: Optional[Dict[str, str]] = None
+) -> Path:
+    """Write tensors as a safetensors file.
+
+    Args:
+        tensors: Tensor name to array
+        path: Output file
+        metadata: String metadata stored in the header
+
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    header: Dict[str, Any] = {}
+    if metadata:
+        header["__metadata__"] = {key: str(value) for key, value in metadata.items()}
+    offset = 0
+    arrays = []
+    # Widest dtypes first keeps every tensor aligned without padding, which the format forbids
+    for name in sorted(tensors, key=lambda name: (-tensors[name].dtype.itemsize, name)):
+        # np.ascontiguousarray would turn scalars into shape (1,)
+        array = np.require(tensors[name], requirements="C")
+        dtype = array.dtype.newbyteorder("<") if array.dtype.byteorder == ">" else array.dtype
+        if dtype not in _DTYPE_NAMES:
+            raise ValueError(f"Cannot store tensor {name} of dtype {array.dtype} in safetensors")
+        array = array.astype(dtype, copy=False)
+        header[name] = {
+            "dtype": _DTYPE_NAMES[dtype],
+            "shape": list(array.shape),
+            "data_offsets": [offset, offset + array.nbytes],
+        }
+        offset += array.nbytes
+        arrays.append(array)
+
+    encoded = json.dumps(header, separators=(",", ":")).encode()
+    encoded += b" " * (-(8 + len(encoded)) % HEADER_ALIGNMENT)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(struct.pack("<Q", len(encoded)))
+        f.write(encoded)
+        for array in arrays:
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+def save_npy_dir(tensors: Mapping[str, np.ndarray], path: PathLike) -> Path:
+    """Write each tensor as ``<name>.npy`` in a directory.
+
+    Args:
+        tensors: Tensor name to array
+        path: Output directory
+
+    Returns:
+        Path of the directory
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    for name, array in tensors.items():
+        np.save(path / f"{name}.npy", np.require(array, requirements="C"))
+    return path
+
+
+def _read_torch(path: Path) -> Dict[str, np.ndarray]:
+    import torch
+
+    state = torch.load(path, map_location="cpu", weights_only=True)
+    if isinstance(state, dict) and "state_dict" in state:
+        state = state["state_dict"]
+    tensors = {}
+    for name, tensor in state.items():
+        if not isinstance(tensor, torch.Tensor):
+            continue
+        tensor = tensor.detach().cpu()
+        if tensor.dtype == torch.bfloat16:
+            # numpy has no bfloat16
+            logger.warning(f"Widening bfloat16 tensor {name} to float32")
+            tensor = tensor.float()
+        tensors[name] = tensor.numpy()
+    return tensors
+
+
+def read_checkpoint(path: PathLike) -> Dict[str, np.ndarray]:
+    """Read every tensor of a checkpoint into memory.
+
+    Args:
+        path: ``.npz``, PyTorch state dict, or anything ``load_weights`` maps
+
+    Returns:
+        Tensor name to array
+    """
+    path = Path(path)
+    if path.suffix == ".npz":
+        with np.load(path) as archive:
+            return {name: archive[name] for name in archive.files}
+    if path.suffix in TORCH_SUFFIXES:
+        return _read_torch(path)
+    return {name: np.array(tensor) for name, tensor in load_weights(path).items()}
+
+
+def convert_checkpoint(
+    source: PathLike,
+    target: PathLike,
+    format: str = "safetensors",
+    metadata: Optional[Dict[str, str]] = None,
+) -> Path:
+    """Convert a checkpoint into a layout ``load_weights`` can map.
+
+    Args:
+        source: Existing checkpoint, see ``read_checkpoint``
+        target: Output ``.safetensors`` file or ``.npy`` directory
+        format: "safetensors" or "npy"
+        metadata: Header metadata for safetensors output
+
+    Returns:
+        Path of the converted checkpoint
+    """
+    tensors = read_checkpoint(source)
+    if format == "safetensors":
+        written = save_safetensors(tensors, target, metadata)
+    elif format == "npy":
+        written = save_npy_dir(tensors, target)
+    else:
+        raise ValueError(f"Unknown weight format: {format}")
+    logger.info(f"Converted {len(tensors)} tensors from {source} to {written}")
+    return written
+
+
+__all__ = [
+    "MappedWeights",
+    "convert_checkpoint",
+    "load_weights",
+    "read_checkpoint",
+    "save_npy_dir",
+    "save_safetensors",
+]
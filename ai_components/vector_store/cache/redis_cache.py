@@ -0,0 +1,324 @@
+"""Redis hot cache for ANFL Vector Store with bulk TTL operations."""
+
+import hashlib
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import aioredis
+
+from ..core.base import QueryResult, VectorCacheBase, VectorMetadata, hot_cache_key
+from ..core.config import VectorStoreConfig
+from ..core.db_manager import DatabaseManager, decode_hot_cache_entry, encode_hot_cache_entry
+from ..core.exceptions import HotCacheError, MetadataError
+
+logger = logging.getLogger(__name__)
+
+# Keys per pipeline or script call, bounding request and reply sizes
+TTL_BATCH_SIZE = 5000
+
+# Adds ARGV[1] milliseconds to the TTL of every key that has one. Returns the
+# new TTL in milliseconds per key, -1 for keys without expiry and -2 for
+# missing keys.
+EXTEND_TTL_SCRIPT = """
+local extend = tonumber(ARGV[1])
+local result = {}
+for i, key in ipairs(KEYS) do
+    local ttl = redis.call('PTTL', key)
+    if ttl > 0 then
+        ttl = ttl + extend
+        redis.call('PEXPIRE', key, ttl)
+    end
+    result[i] = ttl
+end
+return result
+"""
+EXTEND_TTL_SHA = hashlib.sha1(EXTEND_TTL_SCRIPT.encode("utf-8")).hexdigest()
+
+
+class RedisVectorCache(VectorCacheBase):
+    """Hot cache tier whose TTL operations run in bulk.
+
+    TTL changes for any number of ids cost one pipeline (or one script call)
+    per Redis node and ``TTL_BATCH_SIZE`` keys, and the resulting expiry
+    times are mirrored into ``cache_tracking`` with a single set-based
+    ``UPDATE``.
+    """
+
+    def __init__(self, config: VectorStoreConfig, db_manager: DatabaseManager):
+        """Initialize Redis cache.
+
+        Args:
+            config: Vector store configuration
+            db_manager: Database manager holding the Redis and PostgreSQL connections
+        """
+        self.config = config
+        self.db_manager = db_manager
+
+    async def initialize(self) -> None:
+        """Initialize the underlying connections."""
+        if not self.db_manager.initialized:
+            await self.db_manager.initialize()
+
+    def _group_by_client(
+        self, vector_ids: List[str], namespace: Optional[str]
+    ) -> Dict[Any, List[str]]:
+        """Group vector IDs by the Redis node that owns them."""
+        groups = defaultdict(list)
+        for vector_id in vector_ids:
+            groups[self.db_manager._hot_cache_client(vector_id, namespace)].append(vector_id)
+        return groups
+
+    async def store_vectors(
+        self,
+        vectors: List[Tuple[str, List[float]]],
+        metadata: Optional[List[VectorMetadata]] = None,
+        namespace: Optional[str] = None,
+    ) -> bool:
+        """Cache vectors and record them in ``cache_tracking``."""
+        metadata = metadata or [None for _ in vectors]
+        entries = [
+            (vector_id, vector, meta.dict() if isinstance(meta, VectorMetadata) else (meta or {}))
+            for (vector_id, vector), meta in zip(vectors, metadata)
+        ]
+        await self.db_manager._store_hot_cache_batch(entries, namespace)
+
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=self.config.redis.ttl)
+        try:
+            async with self.db_manager._pg_pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO cache_tracking (vector_id, cache_layer, cached_at, expires_at)
+                    SELECT vector_id, 'hot', $2, $3
+                    FROM unnest($1::text[]) AS u(vector_id)
+                    JOIN vector_metadata USING (vector_id)
+                    ON CONFLICT (vector_id, cache_layer)
+                    DO UPDATE SET cached_at = EXCLUDED.cached_at,
+                                  expires_at = EXCLUDED.expires_at
+                    """,
+                    [vector_id for vector_id, _, _ in entries],
+                    now,
+                    expires_at,
+                )
+        except Exception as e:
+            raise MetadataError("Failed to track cached vectors", "insert", {"error": str(e)})
+        return True
+
+    async def query_similar(
+        self,
+        query_vector: List[float],
+        top_k: int = 5,
+        namespace: Optional[str] = None,
+        include_vectors: bool = False,
+        include_metadata: bool = True,
+        filter_criteria: Optional[Dict[str, Any]] = None,
+    ) -> List[QueryResult]:
+        """Query similar vectors.
+
+        The hot cache holds no search index, so queries go to cold storage.
+        """
+        return await self.db_manager.query_similar(
+            query_vector, top_k, namespace, include_vectors, include_metadata, filter_criteria
+        )
+
+    async def delete_vectors(self, vector_ids: List[str], namespace: Optional[str] = None) -> bool:
+        """Evict vectors from the hot cache."""
+        try:
+            for client, ids in self._group_by_client(vector_ids, namespace).items():
+                for start in range(0, len(ids), TTL_BATCH_SIZE):
+                    await client.delete(
+                        *(hot_cache_key(i, namespace) for i in ids[start : start + TTL_BATCH_SIZE])
+                    )
+        except Exception as e:
+            raise HotCacheError("Failed to evict from hot cache", "delete", {"error": str(e)})
+
+        async with self.db_manager._pg_pool.acquire() as conn:
+            await conn.execute(
+                """
+                DELETE FROM cache_tracking
+                WHERE vector_id = ANY($1::text[])
+                AND cache_layer = 'hot'
+                """,
+                vector_ids,
+            )
+        return True
+
+    async def update_metadata(
+        self, vector_id: str, metadata: VectorMetadata, namespace: Optional[str] = None
+    ) -> bool:
+        """Replace the metadata of a cached vector, keeping its TTL."""
+        client = self.db_manager._hot_cache_client(vector_id, namespace)
+        key = hot_cache_key(vector_id, namespace)
+        try:
+            pipe = client.pipeline()
+            pipe.get(key)
+            pipe.pttl(key)
+            raw, pttl = await pipe.execute()
+            if raw is None:
+                return False
+            entry = decode_hot_cache_entry(raw)
+            await client.set(
+                key,
+                encode_hot_cache_entry(entry["vector"], metadata.dict()),
+                pexpire=pttl if pttl > 0 else 0,
+            )
+        except Exception as e:
+            raise HotCacheError("Failed to update cached metadata", "set", {"error": str(e)})
+        if self.db_manager.invalidation:
+            self.db_manager.invalidation.publish([vector_id], namespace)
+        return True
+
+    async def get_metadata(
+        self, vector_id: str, namespace: Optional[str] = None
+    ) -> Optional[VectorMetadata]:
+        """Get the metadata of a cached vector.
+
+        Returns:
+            The metadata, or None if the vector is not cached or was stored
+            without complete metadata
+
+        Raises:
+            MetadataError: If the cache entry cannot be decoded
+        """
+        try:
+            raw = await self.db_manager._hot_cache_client(vector_id, namespace).get(
+                hot_cache_key(vector_id, namespace)
+            )
+        except Exception as e:
+            raise HotCacheError("Failed to read from hot cache", "get", {"error": str(e)})
+        if raw is None:
+            return None
+        try:
+            metadata = decode_hot_cache_entry(raw).get("metadata") or {}
+        except (ValueError, SyntaxError, AttributeError) as e:
+            raise MetadataError(
+                "Corrupt hot cache entry",
+                "decode",
+                {"vector_id": vector_id, "namespace": namespace, "error": str(e)},
+            )
+        if not metadata:
+            return None
+        try:
+            return VectorMetadata.parse_obj(
+                {**metadata, "vector_id": vector_id, "namespace": namespace}
+            )
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Cached metadata of {vector_id} is incomplete: {str(e)}")
+            return None
+
+    async def set_ttl(
+        self, vector_ids: List[str], ttl_seconds: int, namespace: Optional[str] = None
+    ) -> bool:
+        """Set the TTL of cached vectors with one pipeline per node.
+
+        Returns:
+            bool: Whether every vector was cached
+        """
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+        updated = []
+        try:
+            for client, ids in self._group_by_client(vector_ids, namespace).items():
+                for start in range(0, len(ids), TTL_BATCH_SIZE):
+                    chunk = ids[start : start + TTL_BATCH_SIZE]
+                    pipe = client.pipeline()
+                    for vector_id in chunk:
+                        pipe.expire(hot_cache_key(vector_id, namespace), ttl_seconds)
+                    results = await pipe.execute()
+                    updated.extend(i for i, ok in zip(chunk, results) if ok)
+        except Exception as e:
+            raise HotCacheError("Failed to set TTL in hot cache", "expire", {"error": str(e)})
+
+        await self._track_expiry(updated, [expires_at] * len(updated))
+        return len(updated) == len(vector_ids)
+
+    async def extend_ttl(
+        self, vector_ids: List[str], extend_seconds: int, namespace: Optional[str] = None
+    ) -> bool:
+        """Extend the TTL of cached vectors with one script call per node.
+
+        Keys without an expiry are left alone.
+
+        Returns:
+            bool: Whether every vector was cached
+        """
+        now = datetime.now(timezone.utc)
+        updated, expiries = [], []
+        found = 0
+        try:
+            for client, ids in self._group_by_client(vector_ids, namespace).items():
+                for start in range(0, len(ids), TTL_BATCH_SIZE):
+                    chunk = ids[start : start + TTL_BATCH_SIZE]
+                    ttls = await self._run_extend_script(
+                        client, [hot_cache_key(i, namespace) for i in chunk], extend_seconds * 1000
+                    )
+                    for vector_id, ttl_ms in zip(chunk, ttls):
+                        if ttl_ms == -2:
+                            continue
+                        found += 1
+                        if ttl_ms > 0:
+                            updated.append(vector_id)
+                            expiries.append(now + timedelta(milliseconds=ttl_ms))
+        except Exception as e:
+            raise HotCacheError("Failed to extend TTL in hot cache", "eval", {"error": str(e)})
+
+        await self._track_expiry(updated, expiries)
+        return found == len(vector_ids)
+
+    async def _run_extend_script(self, client: Any, keys: List[str], extend_ms: int) -> List[int]:
+        """Run the TTL extension script, loading it into the node if needed."""
+        try:
+            return await client.evalsha(EXTEND_TTL_SHA, keys=keys, args=[extend_ms])
+        except aioredis.ReplyError as e:
+            if "NOSCRIPT" not in str(e):
+                raise
+        await client.script_load(EXTEND_TTL_SCRIPT)
+        return await client.evalsha(EXTEND_TTL_SHA, keys=keys, args=[extend_ms])
+
+    async def get_ttl(self, vector_id: str, namespace: Optional[str] = None) -> Optional[int]:
+        """Get the remaining TTL of a cached vector."""
+        return (await self.get_ttls([vector_id], namespace))[vector_id]
+
+    async def get_ttls(
+        self, vector_ids: List[str], namespace: Optional[str] = None
+    ) -> Dict[str, Optional[int]]:
+        """Get remaining TTLs with one pipeline per node.
+
+        Returns:
+            Mapping of vector ID to seconds left, or None when the vector is
+            not cached or has no expiry
+        """
+        ttls: Dict[str, Optional[int]] = {}
+        try:
+            for client, ids in self._group_by_client(vector_ids, namespace).items():
+                for start in range(0, len(ids), TTL_BATCH_SIZE):
+                    chunk = ids[start : start + TTL_BATCH_SIZE]
+                    pipe = client.pipeline()
+                    for vector_id in chunk:
+                        pipe.ttl(hot_cache_key(vector_id, namespace))
+                    for vector_id, ttl in zip(chunk, await pipe.execute()):
+                        ttls[vector_id] = ttl if ttl >= 0 else None
+        except Exception as e:
+            raise HotCacheError("Failed to read TTL from hot cache", "ttl", {"error": str(e)})
+        return ttls
+
+    async def _track_expiry(self, vector_ids: List[str], expires_at: List[datetime]) -> None:
+        """Mirror new expiry times into ``cache_tracking`` in one statement."""
+        if not vector_ids:
+            return
+        try:
+            async with self.db_manager._pg_pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    UPDATE cache_tracking AS ct
+                    SET expires_at = u.expires_at
+                    FROM unnest($1::text[], $2::timestamptz[]) AS u(vector_id, expires_at)
+                    WHERE ct.vector_id = u.vector_id
+                    AND ct.cache_layer = 'hot'
+                    """,
+                    vector_ids,
+                    expires_at,
+                )
+        except Exception as e:
+            raise MetadataError("Failed to update cache expiry", "update", {"error": str(e)})
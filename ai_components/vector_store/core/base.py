@@ -26,6 +26,13 @@ class QueryResult(BaseModel):
     vector: Optional[List[float]] = None
 
 
+def hot_cache_key(vector_id: str, namespace: Optional[str] = None) -> str:
+    """Build the Redis key for a cached vector."""
+    if namespace:
+        return f"vector:{namespace}:{vector_id}"
+    return f"vector:{vector_id}"
+
+
 class VectorStorageBase(ABC):
     """Base interface for vector storage implementations."""
 
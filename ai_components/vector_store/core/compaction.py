@@ -0,0 +1,255 @@
+"""Tombstone compaction for ANFL Vector Store.
+
+The compactor removes tombstoned vectors from Redis, AstraDB and Pinecone
+and from the sparse and reduced indexes in batches, then marks their
+``vector_metadata`` rows purged; the rows themselves are kept. It pauses
+between batches so the work yields to query traffic.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+from cassandra.query import ValueSequence
+
+from .base import hot_cache_key
+from .config import VectorStoreConfig
+from .db_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+# Pinecone accepts at most this many ids per delete request
+PINECONE_DELETE_BATCH = 1000
+
+
+class TombstoneCompactor:
+    """Purges tombstoned vectors from every storage layer in the background."""
+
+    def __init__(self, config: VectorStoreConfig, db_manager: DatabaseManager):
+        """Initialize tombstone compactor.
+
+        Args:
+            config: Vector store configuration
+            db_manager: Database manager instance
+        """
+        self.config = config
+        self.db_manager = db_manager
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {"purged": 0, "passes": 0, "failed_passes": 0}
+
+    async def compact_once(self) -> int:
+        """Purge one batch of tombstones from all layers.
+
+        The batch rows stay locked until they are marked purged, so a vector
+        stored again under the same id waits for the pass instead of having
+        its new copies deleted.
+
+        Returns:
+            int: Number of vectors purged
+        """
+        async with self.db_manager._pg_pool.acquire() as conn:
+            async with conn.transaction():
+                records = await conn.fetch(
+                    """
+                    SELECT vector_id, namespace
+                    FROM vector_metadata
+                    WHERE is_deleted AND purged_at IS NULL
+                    ORDER BY updated_at
+                    LIMIT $1
+                    FOR UPDATE SKIP LOCKED
+                    """,
+                    self.config.compaction.batch_size,
+                )
+                if not records:
+                    return 0
+
+                entries = [(r["vector_id"], r["namespace"]) for r in records]
+                layers = [self._purge_cold_storage(entries)]
+                if self.config.hot_cache_enabled:
+                    layers.append(self._purge_hot_cache(entries))
+                if self.config.warm_cache_enabled:
+                    layers.append(self._purge_warm_cache(entries))
+                await asyncio.gather(*layers)
+
+                ids = [vector_id for vector_id, _ in entries]
+                await conn.execute(
+                    "DELETE FROM cache_tracking WHERE vector_id = ANY($1::text[])", ids
+                )
+                await conn.execute(
+                    """
+                    UPDATE vector_metadata
+                    SET purged_at = NOW()
+                    WHERE vector_id = ANY($1::text[])
+                    """,
+                    ids,
+                )
+
+        if self.db_manager.sparse_index:
+            self.db_manager._sparse_remove(ids)
+        if self.db_manager.reduced_index:
+            ids_by_namespace = defaultdict(list)
+            for vector_id, namespace in entries:
+                ids_by_namespace[namespace].append(vector_id)
+            for namespace, namespace_ids in ids_by_namespace.items():
+                self.db_manager.reduced_index.remove(namespace_ids, namespace)
+        self.db_manager.tombstones.discard(ids)
+        self.stats["purged"] += len(ids)
+        self.stats["passes"] += 1
+        return len(ids)
+
+    async def _purge_hot_cache(self, entries: List[Tuple[str, Optional[str]]]) -> None:
+        """Delete keys from Redis with one DEL per node."""
+        groups = defaultdict(list)
+        for vector_id, namespace in entries:
+            groups[self.db_manager._hot_cache_client(vector_id, namespace)].append(
+                hot_cache_key(vector_id, namespace)
+            )
+        await asyncio.gather(*(client.delete(*keys) for client, keys in groups.items()))
+
+    async def _purge_warm_cache(self, entries: List[Tuple[str, Optional[str]]]) -> None:
+        """Delete rows from AstraDB with one IN statement."""
+        await asyncio.get_running_loop().run_in_executor(
+            None,
+            partial(
+                self.db_manager._get_astra_session().execute,
+                f"""
+                DELETE FROM {self.db_manager._warm_cache_table}
+                WHERE vector_id IN %s
+                """,
+                (ValueSequence([vector_id for vector_id, _ in entries]),),
+            ),
+        )
+
+    async def _purge_cold_storage(self, entries: List[Tuple[str, Optional[str]]]) -> None:
+        """Delete vectors from Pinecone, grouped by index and namespace."""
+        groups: Dict[Tuple[Any, Optional[str]], List[str]] = defaultdict(list)
+        for vector_id, namespace in entries:
+            index = self.db_manager._cold_storage_index(vector_id, namespace)
+            groups[(index, namespace)].append(vector_id)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    None,
+                    partial(
+                        index.delete,
+                        ids=ids[start : start + PINECONE_DELETE_BATCH],
+                        namespace=namespace,
+                    ),
+                )
+                for (index, namespace), ids in groups.items()
+                for start in range(0, len(ids), PINECONE_DELETE_BATCH)
+            )
+        )
+
+    async def purge_namespace(self, namespace: Optional[str]) -> int:
+        """Tombstone every vector of a namespace.
+
+        The namespace is hidden from queries at once. Rows are tombstoned in
+        ``purge_batch_size`` steps with a pause in between, so the update
+        never holds many row locks. Each step is dropped from the sparse and
+        reduced indexes and published as a delete, so other workers hide it
+        too, and the compactor removes the vectors from the storage layers
+        afterwards.
+
+        Args:
+            namespace: Namespace to purge
+
+        Returns:
+            int: Number of vectors tombstoned
+        """
+        tombstones = self.db_manager.tombstones
+        tombstones.add_namespace(namespace)
+        pause = self.config.compaction.pause_ms / 1000
+        total = 0
+        try:
+            while True:
+                async with self.db_manager._pg_pool.acquire() as conn:
+                    records = await conn.fetch(
+                        """
+                        UPDATE vector_metadata
+                        SET is_deleted = TRUE, purged_at = NULL, updated_at = NOW()
+                        WHERE vector_id IN (
+                            SELECT vector_id
+                            FROM vector_metadata
+                            WHERE namespace IS NOT DISTINCT FROM $1
+                            AND NOT is_deleted
+                            LIMIT $2
+                        )
+                        RETURNING vector_id
+                        """,
+                        namespace,
+                        self.config.compaction.purge_batch_size,
+                    )
+                if not records:
+                    break
+                ids = [r["vector_id"] for r in records]
+                tombstones.add(ids)
+                self._hide(ids, namespace)
+                total += len(ids)
+                self._wakeup.set()
+                await asyncio.sleep(pause)
+        finally:
+            tombstones.discard_namespace(namespace)
+
+        logger.info(f"Tombstoned {total} vectors of namespace {namespace}")
+        return total
+
+    def _hide(self, vector_ids: List[str], namespace: Optional[str]) -> None:
+        """Drop freshly tombstoned vectors from the indexes, here and in other workers."""
+        db = self.db_manager
+        if db.sparse_index:
+            db._sparse_remove(vector_ids)
+        if db.reduced_index:
+            db.reduced_index.remove(vector_ids, namespace)
+        db.forget_reads(vector_ids, namespace)
+        if db.invalidation:
+            db.invalidation.publish(vector_ids, namespace, deleted=True)
+
+    def wake(self) -> None:
+        """Start a compaction pass without waiting for the next interval."""
+        self._wakeup.set()
+
+    def start(self) -> None:
+        """Run compaction in the background."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background compaction task."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Compact until the backlog is empty, then wait for new tombstones."""
+        compaction = self.config.compaction
+        while True:
+            try:
+                purged = await self.compact_once()
+            except Exception as e:
+                self.stats["failed_passes"] += 1
+                logger.error(f"Error during tombstone compaction: {str(e)}")
+                purged = 0
+
+            if purged >= compaction.batch_size:
+                await asyncio.sleep(compaction.pause_ms / 1000)
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=compaction.interval)
+            except asyncio.TimeoutError:
+                try:
+                    # Pick up deletes made by other processes
+                    await self.db_manager.refresh_tombstones()
+                except Exception as e:
+                    logger.error(f"Failed to refresh tombstones: {str(e)}")
+            self._wakeup.clear()
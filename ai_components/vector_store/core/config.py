@@ -1,6 +1,6 @@
 """Configuration for ANFL Vector Store."""
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -22,6 +22,7 @@ class RedisConfig(BaseModel):
     db: int = Field(0, description="Redis database number")
     password: Optional[str] = Field(None, description="Redis password")
     ttl: int = Field(3600, description="Default TTL for cached items in seconds")
+    weight: int = Field(1, description="Relative share of keys when sharded")
 
 
 class AstraDBConfig(BaseModel):
@@ -41,6 +42,175 @@ class PineconeConfig(BaseModel):
     index_name: str = Field(..., description="Pinecone index name")
     dimension: int = Field(3072, description="Vector dimension")
     metric: str = Field("cosine", description="Distance metric")
+    weight: int = Field(1, description="Relative share of keys when sharded")
+
+
+class ShardingConfig(BaseModel):
+    """Configuration for consistent-hash sharding of the hot and cold tiers."""
+    redis_shards: List[RedisConfig] = Field(
+        default_factory=list,
+        description="Redis nodes for the hot tier (empty uses the single redis config)"
+    )
+    pinecone_shards: List[PineconeConfig] = Field(
+        default_factory=list,
+        description="Pinecone indexes for cold storage (empty uses the single pinecone config)"
+    )
+    shard_key: str = Field(
+        "namespace",
+        description="Key mapped onto the ring: 'namespace' or 'vector_id'"
+    )
+    virtual_nodes: int = Field(128, description="Ring points per unit of node weight")
+    max_concurrent_shards: int = Field(
+        8,
+        description="Maximum shards queried concurrently by scatter-gather"
+    )
+
+
+class CompactionConfig(BaseModel):
+    """Configuration for tombstone compaction across storage layers."""
+    batch_size: int = Field(500, description="Tombstones removed per compaction pass")
+    purge_batch_size: int = Field(5000, description="Rows tombstoned per namespace purge step")
+    interval: int = Field(30, description="Seconds between idle compaction checks")
+    pause_ms: int = Field(
+        50,
+        description="Pause between batches so compaction yields to query traffic"
+    )
+
+
+class SparseIndexConfig(BaseModel):
+    """Configuration for the local BM25 index and hybrid search."""
+    enabled: bool = Field(False, description="Maintain a BM25 index on store_vectors")
+    text_field: str = Field("text", description="custom_metadata field to index")
+    k1: float = Field(1.2, description="BM25 term frequency saturation")
+    b: float = Field(0.75, description="BM25 document length normalization")
+    fusion: str = Field("rrf", description="Hybrid fusion method: 'rrf' or 'weighted'")
+    rrf_k: int = Field(60, description="RRF rank offset")
+    dense_weight: float = Field(0.5, description="Dense share of the fused score")
+    candidate_multiplier: int = Field(
+        3,
+        description="Candidates fetched per retriever, as a multiple of top_k"
+    )
+    seal_threshold: int = Field(
+        4096,
+        description="Buffered postings before they are delta-encoded"
+    )
+
+
+class ReducedSearchSettings(BaseModel):
+    """Per-namespace overrides for two-stage search."""
+    method: Optional[str] = Field(None, description="'pca' or 'prefix'")
+    target_dimension: Optional[int] = Field(None, description="Dimension of the first stage")
+    candidate_multiplier: Optional[int] = Field(
+        None,
+        description="Candidates reranked at full dimension, as a multiple of top_k"
+    )
+
+
+class ReducedIndexConfig(BaseModel):
+    """Configuration for two-stage search over a dimensionality-reduced index."""
+    enabled: bool = Field(
+        False,
+        description="Maintain a reduced index on writes and search it first"
+    )
+    method: str = Field(
+        "pca",
+        description="'pca' fitted on a sample, or 'prefix' for Matryoshka-style embeddings"
+    )
+    target_dimension: int = Field(256, description="Dimension of the first stage")
+    candidate_multiplier: int = Field(
+        8,
+        description="Candidates reranked at full dimension, as a multiple of top_k"
+    )
+    fit_size: int = Field(4096, description="Vectors collected per namespace before PCA is fitted")
+    rebuild_page_size: int = Field(1000, description="Vectors fetched per call when rebuilding")
+    namespaces: Dict[str, ReducedSearchSettings] = Field(
+        default_factory=dict,
+        description="Per-namespace overrides"
+    )
+
+
+class PrefetchConfig(BaseModel):
+    """Configuration for co-access prefetching into the hot cache."""
+    enabled: bool = Field(False, description="Learn co-access and prefetch neighbours")
+    window_seconds: float = Field(30.0, description="Reads this close together co-occur")
+    window_size: int = Field(64, description="Recent reads per namespace paired with a new read")
+    max_nodes: int = Field(100000, description="Vectors tracked by the co-access graph")
+    max_neighbors: int = Field(32, description="Neighbours kept per vector")
+    half_life_seconds: float = Field(3600.0, description="Half-life of co-access weights")
+    min_weight: float = Field(2.0, description="Weight a neighbour needs to be prefetched")
+    fanout: int = Field(8, description="Neighbours prefetched per cold or warm read")
+    budget_per_second: float = Field(200.0, description="Sustained prefetch rate limit")
+    prefetch_ttl: int = Field(300, description="Hot cache TTL of prefetched vectors")
+    min_accuracy: float = Field(
+        0.2,
+        description="Prefetch accuracy below which the budget is scaled down"
+    )
+    min_samples: int = Field(200, description="Resolved prefetches before accuracy is trusted")
+
+
+class InvalidationConfig(BaseModel):
+    """Configuration for cross-process cache invalidation over LISTEN/NOTIFY."""
+    enabled: bool = Field(False, description="Publish and listen for invalidations")
+    channel: str = Field("anfl_vector_invalidation", description="PostgreSQL NOTIFY channel")
+    coalesce_ms: int = Field(50, description="Window for merging invalidations into one message")
+    namespace_flush_threshold: int = Field(
+        5000,
+        description="Ids per namespace and window above which the whole namespace is invalidated"
+    )
+    reconnect_delay: float = Field(1.0, description="Seconds between listener reconnect attempts")
+    refresh_debounce: float = Field(
+        1.0,
+        description="Seconds to gather missed windows and namespace invalidations into one rebuild"
+    )
+
+
+class SingleFlightConfig(BaseModel):
+    """Configuration for coalescing duplicate concurrent reads."""
+    enabled: bool = Field(False, description="Share in-flight reads between concurrent callers")
+    window_ms: float = Field(
+        0.0,
+        description="Time new ids wait to be batched with other reads (0: within one loop pass)"
+    )
+    max_batch: int = Field(1000, description="Ids per coalesced backend call")
+
+
+class LogWriterConfig(BaseModel):
+    """Configuration for the batched audit log writer."""
+    enabled: bool = Field(True, description="Enable writing to the audit log tables")
+    flush_size: int = Field(500, description="Pending records that trigger a flush")
+    flush_interval_ms: int = Field(1000, description="Maximum time between flushes")
+    max_pending: int = Field(10000, description="Pending records before overload handling")
+    overload_sample_rate: float = Field(
+        0.1,
+        description="Fraction of records kept while overloaded (0 sheds everything)"
+    )
+
+
+class PartitionConfig(BaseModel):
+    """Configuration for partitioned log tables and their maintenance jobs."""
+    enabled: bool = Field(True, description="Run partition maintenance from the database manager")
+    convert_legacy_tables: bool = Field(
+        True,
+        description="Convert unpartitioned log tables from older schemas on startup"
+    )
+    days_ahead: int = Field(7, description="Daily partitions to create ahead of time")
+    retention_days: Dict[str, int] = Field(
+        default_factory=lambda: {
+            "vector_operations": 30,
+            "similarity_queries": 30,
+            "vector_migrations": 90,
+            "cache_metrics": 30,
+        },
+        description="Days of raw log partitions to keep per table"
+    )
+    hourly_rollup_retention_days: int = Field(
+        90,
+        description="Days to keep hourly rollups (daily rollups are kept)"
+    )
+    maintenance_interval: int = Field(
+        3600,
+        description="Seconds between partition maintenance runs"
+    )
 
 
 class VectorStoreConfig(BaseModel):
@@ -63,6 +233,58 @@ class VectorStoreConfig(BaseModel):
     max_retries: int = Field(3, description="Maximum retry attempts")
     retry_delay: int = Field(5, description="Delay between retries in seconds")
 
+    # Sharding
+    sharding: ShardingConfig = Field(
+        default_factory=ShardingConfig,
+        description="Hot and cold tier sharding configuration"
+    )
+
+    # Audit logging
+    log_writer: LogWriterConfig = Field(
+        default_factory=LogWriterConfig,
+        description="Audit log writer configuration"
+    )
+    partitions: PartitionConfig = Field(
+        default_factory=PartitionConfig,
+        description="Log table partitioning configuration"
+    )
+
+    # Hybrid search
+    sparse_index: SparseIndexConfig = Field(
+        default_factory=SparseIndexConfig,
+        description="BM25 index and hybrid search configuration"
+    )
+
+    # Two-stage search
+    reduced_index: ReducedIndexConfig = Field(
+        default_factory=ReducedIndexConfig,
+        description="Dimensionality-reduced first stage configuration"
+    )
+
+    # Prefetching
+    prefetch: PrefetchConfig = Field(
+        default_factory=PrefetchConfig,
+        description="Co-access prefetching configuration"
+    )
+
+    # Invalidation
+    invalidation: InvalidationConfig = Field(
+        default_factory=InvalidationConfig,
+        description="Cross-process cache invalidation configuration"
+    )
+
+    # Read coalescing
+    single_flight: SingleFlightConfig = Field(
+        default_factory=SingleFlightConfig,
+        description="Duplicate read coalescing configuration"
+    )
+
+    # Deletes
+    compaction: CompactionConfig = Field(
+        default_factory=CompactionConfig,
+        description="Tombstone compaction configuration"
+    )
+
     class Config:
         """Pydantic config."""
         env_prefix = "ANFL_VECTOR_"
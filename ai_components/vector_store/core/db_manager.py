@@ -1,17 +1,36 @@
 """Database manager for ANFL Vector Store."""
 
+import ast
 import asyncio
+import json
 import logging
+import time
+from collections import defaultdict
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from functools import partial
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
 
 import aioredis
+import numpy as np
 import pinecone
 from cassandra.cluster import Cluster
 from cassandra.auth import PlainTextAuthProvider
+from cassandra.concurrent import execute_concurrent_with_args
+from cassandra.query import ValueSequence
 from asyncpg import create_pool
 
-from .config import VectorStoreConfig
+from .base import QueryResult, hot_cache_key
+from .config import PineconeConfig, RedisConfig, VectorStoreConfig
+from .invalidation import InvalidationBus, InvalidationSubscriber
+from .log_writer import AuditLogWriter
+from .partitions import PartitionManager
+from .kernels import VectorMatrix
+from .reduced_index import ReducedIndex, select_top
+from .results import QueryResultSet
+from .single_flight import BatchCoalescer, SingleFlight
+from .sharding import ShardManager, query_pinecone_index, to_query_result
+from .sparse_index import SparseIndex, reciprocal_rank_fusion, weighted_score_fusion
+from .tombstones import TombstoneSet
 from .exceptions import (
     HotCacheError,
     WarmCacheError,
@@ -20,8 +39,104 @@ from .exceptions import (
     StorageLayerUnavailableError
 )
 
+if TYPE_CHECKING:
+    from .prefetch import CoAccessPrefetcher
+
 logger = logging.getLogger(__name__)
 
+STORAGE_TIERS = ("metadata", "hot", "warm", "cold")
+
+# Pinecone rejects upsert requests much larger than this
+PINECONE_UPSERT_BATCH = 100
+
+# Pinecone accepts at most this many ids per fetch request
+PINECONE_FETCH_BATCH = 1000
+
+
+def encode_hot_cache_entry(vector: Sequence[float], metadata: Dict[str, Any]) -> str:
+    """Serialize a hot cache entry."""
+    return json.dumps({
+        "vector": list(vector),
+        "metadata": metadata,
+        "cached_at": datetime.utcnow().isoformat()
+    }, default=str)
+
+
+def decode_hot_cache_entry(raw: str) -> Dict[str, Any]:
+    """Deserialize a hot cache entry, including the older repr() format."""
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return ast.literal_eval(raw)
+
+
+class _StoreStateSubscriber(InvalidationSubscriber):
+    """Applies other processes' writes to the manager's tombstones and sparse index."""
+
+    def __init__(self, db_manager: "DatabaseManager"):
+        self.db_manager = db_manager
+        self._tasks: set = set()
+        # Namespaces awaiting a rebuild; _refresh_all covers every namespace
+        self._refresh_scope: Set[Optional[str]] = set()
+        self._refresh_all = False
+        self._refresh: Optional[asyncio.Task] = None
+
+    def _spawn(self, coro: Any) -> None:
+        """Run a refresh in the background."""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def invalidate(self, namespace: Optional[str], vector_ids: List[str], deleted: bool) -> None:
+        db = self.db_manager
+        db.forget_reads(vector_ids, namespace)
+        if deleted:
+            db.tombstones.add(vector_ids)
+            if db.sparse_index:
+                db._sparse_remove(vector_ids)
+            if db.reduced_index:
+                db.reduced_index.remove(vector_ids, namespace)
+        else:
+            db.tombstones.discard(vector_ids)
+            if db.sparse_index:
+                self._spawn(db.index_sparse_documents(vector_ids))
+            if db.reduced_index:
+                self._spawn(db.index_reduced_vectors(vector_ids, namespace))
+
+    def invalidate_namespace(self, namespace: Optional[str]) -> None:
+        self._schedule_refresh(namespace)
+
+    def flush(self) -> None:
+        self._refresh_all = True
+        self._schedule_refresh()
+
+    def _schedule_refresh(self, *namespaces: Optional[str]) -> None:
+        """Queue a debounced rebuild; a burst of requests shares one run."""
+        self._refresh_scope.update(namespaces)
+        if self._refresh is None:
+            self._refresh = asyncio.get_running_loop().create_task(self._run_refreshes())
+
+    async def _run_refreshes(self) -> None:
+        try:
+            while self._refresh_all or self._refresh_scope:
+                await asyncio.sleep(self.db_manager.config.invalidation.refresh_debounce)
+                namespaces = None if self._refresh_all else self._refresh_scope
+                self._refresh_all, self._refresh_scope = False, set()
+                try:
+                    await self.db_manager.refresh_store_state(namespaces)
+                except Exception as e:
+                    logger.error(f"Failed to refresh store state after invalidation: {str(e)}")
+        finally:
+            self._refresh = None
+
+    async def close(self) -> None:
+        """Cancel background refreshes."""
+        tasks = list(self._tasks) + ([self._refresh] if self._refresh else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refresh = None
+
 
 class DatabaseManager:
     """Manages connections and operations across all storage layers."""
@@ -36,7 +151,41 @@ class DatabaseManager:
         self._pg_pool = None
         self._redis = None
         self._astra = None
+        self._astra_session = None
+        self._astra_statements: Dict[str, Any] = {}
         self._pinecone_index = None
+        self.log_writer: Optional[AuditLogWriter] = None
+        self.partitions: Optional[PartitionManager] = None
+        self.shards: Optional[ShardManager] = None
+        self.tombstones = TombstoneSet()
+        self.sparse_index: Optional[SparseIndex] = None
+        # Changes made while a sparse rebuild runs, one journal per rebuild
+        self._sparse_journals: List[List[Tuple[str, Any, Optional[str]]]] = []
+        self.prefetcher: Optional["CoAccessPrefetcher"] = None
+        self.invalidation: Optional[InvalidationBus] = None
+        self._store_state: Optional[_StoreStateSubscriber] = None
+        self.reduced_index: Optional[ReducedIndex] = None
+        self._reduced_rebuild: Optional[asyncio.Task] = None
+        self._single_flight = SingleFlight()
+        self._read_coalescers: Dict[str, BatchCoalescer] = {}
+        if config.single_flight.enabled:
+            readers = {
+                "hot": self._fetch_hot_cache_batch,
+                "warm": self._fetch_warm_cache_batch,
+                "cold": self._fetch_cold_storage_batch,
+            }
+            self._read_coalescers = {
+                tier: BatchCoalescer(
+                    reader,
+                    config.single_flight.window_ms,
+                    config.single_flight.max_batch
+                )
+                for tier, reader in readers.items()
+            }
+        if config.sparse_index.enabled:
+            self.sparse_index = SparseIndex(config.sparse_index)
+        if config.reduced_index.enabled:
+            self.reduced_index = ReducedIndex(config.reduced_index, config.pinecone.metric)
         self.initialized = False
 
     async def initialize(self) -> None:
@@ -52,6 +201,23 @@ class DatabaseManager:
                 min_size=self.config.postgres.min_size,
                 max_size=self.config.postgres.max_size
             )
+            if self.config.partitions.enabled:
+                # Partitions have to exist before the log writer inserts rows
+                self.partitions = PartitionManager(self.config, self)
+                if self.config.partitions.convert_legacy_tables:
+                    await self.partitions.convert_legacy_tables()
+                await self.partitions.ensure_partitions()
+                self.partitions.start()
+            self.log_writer = AuditLogWriter(self._pg_pool, self.config.log_writer)
+            self.log_writer.start()
+            await self.refresh_tombstones()
+            if self.sparse_index:
+                await self.rebuild_sparse_index()
+            if self.config.invalidation.enabled:
+                self.invalidation = InvalidationBus(self.config.invalidation, self._pg_pool)
+                self._store_state = _StoreStateSubscriber(self)
+                self.invalidation.subscribe(self._store_state, local=False)
+                await self.invalidation.start()
             
             # Initialize Redis
             if self.config.hot_cache_enabled:
@@ -81,6 +247,26 @@ class DatabaseManager:
                 environment=self.config.pinecone.environment
             )
             self._pinecone_index = pinecone.Index(self.config.pinecone.index_name)
+
+            # Initialize shards
+            sharding = self.config.sharding
+            if sharding.redis_shards or sharding.pinecone_shards:
+                self.shards = ShardManager(
+                    sharding,
+                    self.config.pinecone.metric,
+                    self.config.pinecone
+                )
+                await self.shards.initialize()
+
+            # Fill the reduced index from cold storage without delaying startup
+            if self.reduced_index:
+                self.start_reduced_index_rebuild()
+
+            if self.config.prefetch.enabled:
+                # prefetch imports this module, so it is loaded on demand
+                from .prefetch import CoAccessPrefetcher
+
+                CoAccessPrefetcher(self.config.prefetch, self).start()
             
             self.initialized = True
             logger.info("Database manager initialized successfully")
@@ -91,6 +277,33 @@ class DatabaseManager:
 
     async def close(self) -> None:
         """Close all database connections."""
+        if self.prefetcher:
+            await self.prefetcher.stop()
+
+        if self._reduced_rebuild:
+            self._reduced_rebuild.cancel()
+            try:
+                await self._reduced_rebuild
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._reduced_rebuild = None
+
+        if self.log_writer:
+            await self.log_writer.close()
+            self.log_writer = None
+
+        if self.partitions:
+            await self.partitions.stop()
+            self.partitions = None
+
+        if self._store_state:
+            await self._store_state.close()
+            self._store_state = None
+
+        if self.invalidation:
+            await self.invalidation.close()
+            self.invalidation = None
+
         if self._pg_pool:
             await self._pg_pool.close()
         
@@ -100,6 +313,10 @@ class DatabaseManager:
             
         if self._astra:
             self._astra.shutdown()
+
+        if self.shards:
+            await self.shards.close()
+            self.shards = None
             
         self.initialized = False
         logger.info("Database connections closed")
@@ -124,11 +341,21 @@ class DatabaseManager:
         """
         try:
             # Store in PostgreSQL
-            await self._store_metadata(vector_id, metadata)
+            await self._store_metadata(vector_id, metadata, namespace)
+            if self.sparse_index:
+                self._sparse_add([(vector_id, vector, metadata)], namespace)
+            if self.reduced_index:
+                # Encoding, and fitting PCA once per namespace, runs off the event loop
+                await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    self.reduced_index.add_vectors,
+                    [(vector_id, vector, metadata)],
+                    namespace
+                )
             
             # Store in Redis (hot cache)
             if self.config.hot_cache_enabled:
-                await self._store_hot_cache(vector_id, vector, metadata)
+                await self._store_hot_cache(vector_id, vector, metadata, namespace)
             
             # Store in AstraDB (warm cache)
             if self.config.warm_cache_enabled:
@@ -136,6 +363,17 @@ class DatabaseManager:
             
             # Store in Pinecone (cold storage)
             await self._store_cold_storage(vector_id, vector, metadata, namespace)
+
+            self.forget_reads([vector_id], namespace)
+            if self.invalidation:
+                self.invalidation.publish([vector_id], namespace)
+            if self.log_writer:
+                self.log_writer.log_operation(
+                    vector_id,
+                    "insert",
+                    "cold",
+                    metadata={"namespace": namespace}
+                )
             
             return True
             
@@ -143,42 +381,57 @@ class DatabaseManager:
             logger.error(f"Failed to store vector {vector_id}: {str(e)}")
             raise
 
-    async def _store_metadata(self, vector_id: str, metadata: Dict[str, Any]) -> None:
+    async def _store_metadata(
+        self,
+        vector_id: str,
+        metadata: Dict[str, Any],
+        namespace: Optional[str] = None
+    ) -> None:
         """Store vector metadata in PostgreSQL."""
         try:
             async with self._pg_pool.acquire() as conn:
                 await conn.execute(
                     """
                     INSERT INTO vector_metadata (
-                        vector_id, metadata, created_at, updated_at
-                    ) VALUES ($1, $2, $3, $3)
+                        vector_id, metadata, created_at, updated_at, namespace
+                    ) VALUES ($1, $2, $3, $3, $4)
                     ON CONFLICT (vector_id) 
-                    DO UPDATE SET metadata = $2, updated_at = $3
+                    DO UPDATE SET metadata = $2, updated_at = $3, namespace = $4,
+                                  is_deleted = FALSE, purged_at = NULL
                     """,
                     vector_id,
                     metadata,
-                    datetime.utcnow()
+                    datetime.utcnow(),
+                    namespace
                 )
         except Exception as e:
             raise MetadataError("Failed to store metadata", "insert", {"error": str(e)})
+        self.tombstones.discard([vector_id])
+
+    def _hot_cache_client(self, vector_id: str, namespace: Optional[str] = None) -> Any:
+        """Redis client that owns a vector."""
+        if self.shards and self.shards.redis.enabled:
+            return self.shards.redis_for(vector_id, namespace)
+        return self._redis
+
+    def _cold_storage_index(self, vector_id: str, namespace: Optional[str] = None) -> Any:
+        """Pinecone index that owns a vector."""
+        if self.shards and self.shards.pinecone.enabled:
+            return self.shards.pinecone_for(vector_id, namespace)
+        return self._pinecone_index
 
     async def _store_hot_cache(
         self,
         vector_id: str,
         vector: List[float],
-        metadata: Dict[str, Any]
+        metadata: Dict[str, Any],
+        namespace: Optional[str] = None
     ) -> None:
         """Store vector in Redis hot cache."""
         try:
-            key = f"vector:{vector_id}"
-            data = {
-                "vector": vector,
-                "metadata": metadata,
-                "cached_at": datetime.utcnow().isoformat()
-            }
-            await self._redis.set(
-                key,
-                str(data),
+            await self._hot_cache_client(vector_id, namespace).set(
+                hot_cache_key(vector_id, namespace),
+                encode_hot_cache_entry(vector, metadata),
                 expire=self.config.redis.ttl
             )
         except Exception as e:
@@ -192,10 +445,9 @@ class DatabaseManager:
     ) -> None:
         """Store vector in AstraDB warm cache."""
         try:
-            session = self._astra.connect()
-            session.execute(
+            self._get_astra_session().execute(
                 f"""
-                INSERT INTO {self.config.astradb.keyspace}.{self.config.astradb.collection_name}
+                INSERT INTO {self._warm_cache_table}
                 (vector_id, vector_data, metadata, cached_at)
                 VALUES (%s, %s, %s, %s)
                 """,
@@ -217,7 +469,7 @@ class DatabaseManager:
     ) -> None:
         """Store vector in Pinecone cold storage."""
         try:
-            self._pinecone_index.upsert(
+            self._cold_storage_index(vector_id, namespace).upsert(
                 vectors=[(vector_id, vector, metadata)],
                 namespace=namespace
             )
@@ -228,6 +480,1012 @@ class DatabaseManager:
                 {"error": str(e)}
             )
 
+    @property
+    def _warm_cache_table(self) -> str:
+        """Fully qualified AstraDB table of the warm cache."""
+        return f"{self.config.astradb.keyspace}.{self.config.astradb.collection_name}"
+
+    def _get_astra_session(self) -> Any:
+        """Get the shared AstraDB session, connecting on first use."""
+        if self._astra_session is None:
+            self._astra_session = self._astra.connect()
+        return self._astra_session
+
+    def _prepare_astra(self, statement: str) -> Any:
+        """Prepare an AstraDB statement once and reuse it."""
+        if statement not in self._astra_statements:
+            self._astra_statements[statement] = self._get_astra_session().prepare(statement)
+        return self._astra_statements[statement]
+
+    def _enabled_tiers(self) -> List[str]:
+        """Storage tiers that writes go to."""
+        tiers = ["metadata"]
+        if self.config.hot_cache_enabled:
+            tiers.append("hot")
+        if self.config.warm_cache_enabled:
+            tiers.append("warm")
+        tiers.append("cold")
+        return tiers
+
+    async def store_vectors(
+        self,
+        vectors: List[Tuple[str, List[float]]],
+        metadata: Optional[List[Dict[str, Any]]] = None,
+        namespace: Optional[str] = None,
+        tiers: Optional[Sequence[str]] = None
+    ) -> bool:
+        """Store a batch of vectors with one bulk call per layer and batch.
+
+        Args:
+            vectors: List of (id, vector) tuples
+            metadata: Optional metadata for each vector
+            namespace: Optional namespace
+            tiers: Layers to write to, defaulting to every enabled layer
+
+        Returns:
+            bool: Success status
+        """
+        metadata = metadata or [{} for _ in vectors]
+        entries = [
+            (vector_id, vector, meta)
+            for (vector_id, vector), meta in zip(vectors, metadata)
+        ]
+        tiers = list(tiers or self._enabled_tiers())
+        writers = {
+            "metadata": self._store_metadata_batch,
+            "hot": self._store_hot_cache_batch,
+            "warm": self._store_warm_cache_batch,
+            "cold": self._store_cold_storage_batch,
+        }
+
+        try:
+            for start in range(0, len(entries), self.config.batch_size):
+                batch = entries[start:start + self.config.batch_size]
+                # Metadata first so cache tracking and logs can reference it
+                if "metadata" in tiers:
+                    await self._store_metadata_batch(batch, namespace)
+                    if self.sparse_index:
+                        self._sparse_add(batch, namespace)
+                    if self.reduced_index:
+                        await asyncio.get_running_loop().run_in_executor(
+                            None,
+                            self.reduced_index.add_vectors,
+                            batch,
+                            namespace
+                        )
+                await asyncio.gather(*(
+                    writers[tier](batch, namespace) for tier in tiers if tier != "metadata"
+                ))
+
+                self.forget_reads([vector_id for vector_id, _, _ in batch], namespace)
+                if self.invalidation:
+                    self.invalidation.publish([vector_id for vector_id, _, _ in batch], namespace)
+                if self.log_writer:
+                    for vector_id, _, _ in batch:
+                        self.log_writer.log_operation(
+                            vector_id,
+                            "insert",
+                            tiers[-1],
+                            metadata={"namespace": namespace, "batch": True}
+                        )
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to store batch of {len(entries)} vectors: {str(e)}")
+            raise
+
+    async def _store_metadata_batch(
+        self,
+        entries: List[Tuple[str, List[float], Dict[str, Any]]],
+        namespace: Optional[str] = None
+    ) -> None:
+        """Upsert metadata for a batch of vectors through COPY."""
+        now = datetime.utcnow()
+        records = [
+            (vector_id, json.dumps(meta, default=str), now, now, namespace)
+            for vector_id, _, meta in entries
+        ]
+        try:
+            async with self._pg_pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(
+                        """
+                        CREATE TEMP TABLE vector_metadata_load
+                        (LIKE vector_metadata INCLUDING DEFAULTS)
+                        ON COMMIT DROP
+                        """
+                    )
+                    await conn.copy_records_to_table(
+                        "vector_metadata_load",
+                        records=records,
+                        columns=["vector_id", "metadata", "created_at", "updated_at", "namespace"]
+                    )
+                    await conn.execute(
+                        """
+                        INSERT INTO vector_metadata (
+                            vector_id, metadata, created_at, updated_at, namespace
+                        )
+                        SELECT vector_id, metadata, created_at, updated_at, namespace
+                        FROM vector_metadata_load
+                        ON CONFLICT (vector_id)
+                        DO UPDATE SET metadata = EXCLUDED.metadata,
+                                      updated_at = EXCLUDED.updated_at,
+                                      namespace = EXCLUDED.namespace,
+                                      is_deleted = FALSE,
+                                      purged_at = NULL
+                        """
+                    )
+        except Exception as e:
+            raise MetadataError("Failed to store metadata batch", "copy", {"error": str(e)})
+        self.tombstones.discard(vector_id for vector_id, _, _ in entries)
+
+    async def _store_hot_cache_batch(
+        self,
+        entries: List[Tuple[str, List[float], Dict[str, Any]]],
+        namespace: Optional[str] = None
+    ) -> None:
+        """Store a batch of vectors in Redis with one pipeline per node."""
+        groups = defaultdict(list)
+        for entry in entries:
+            groups[self._hot_cache_client(entry[0], namespace)].append(entry)
+        try:
+            pipelines = []
+            for client, group in groups.items():
+                pipe = client.pipeline()
+                for vector_id, vector, meta in group:
+                    pipe.set(
+                        hot_cache_key(vector_id, namespace),
+                        encode_hot_cache_entry(vector, meta),
+                        expire=self.config.redis.ttl
+                    )
+                pipelines.append(pipe.execute())
+            await asyncio.gather(*pipelines)
+        except Exception as e:
+            raise HotCacheError("Failed to store batch in hot cache", "pipeline", {"error": str(e)})
+
+    async def _store_warm_cache_batch(
+        self,
+        entries: List[Tuple[str, List[float], Dict[str, Any]]],
+        namespace: Optional[str] = None
+    ) -> None:
+        """Store a batch of vectors in AstraDB with concurrent prepared inserts."""
+        try:
+            statement = self._prepare_astra(
+                f"""
+                INSERT INTO {self._warm_cache_table}
+                (vector_id, vector_data, metadata, cached_at)
+                VALUES (?, ?, ?, ?)
+                """
+            )
+            now = datetime.utcnow()
+            params = [(vector_id, list(vector), meta, now) for vector_id, vector, meta in entries]
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                partial(
+                    execute_concurrent_with_args,
+                    self._get_astra_session(),
+                    statement,
+                    params,
+                    concurrency=50,
+                    raise_on_first_error=True
+                )
+            )
+        except Exception as e:
+            raise WarmCacheError("Failed to store batch in warm cache", "insert", {"error": str(e)})
+
+    async def _store_cold_storage_batch(
+        self,
+        entries: List[Tuple[str, List[float], Dict[str, Any]]],
+        namespace: Optional[str] = None
+    ) -> None:
+        """Upsert a batch of vectors into Pinecone, grouped by index."""
+        groups = defaultdict(list)
+        for vector_id, vector, meta in entries:
+            groups[self._cold_storage_index(vector_id, namespace)].append(
+                (vector_id, list(vector), meta)
+            )
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*(
+                loop.run_in_executor(
+                    None,
+                    partial(
+                        index.upsert,
+                        vectors=group[start:start + PINECONE_UPSERT_BATCH],
+                        namespace=namespace
+                    )
+                )
+                for index, group in groups.items()
+                for start in range(0, len(group), PINECONE_UPSERT_BATCH)
+            ))
+        except Exception as e:
+            raise ColdStorageError(
+                "Failed to store batch in cold storage",
+                "upsert",
+                {"error": str(e)}
+            )
+
+    async def fetch_vectors(
+        self,
+        vector_ids: List[str],
+        tier: str,
+        namespace: Optional[str] = None,
+        record_access: bool = True
+    ) -> Dict[str, Tuple[List[float], Dict[str, Any]]]:
+        """Fetch a batch of vectors from one layer.
+
+        Args:
+            vector_ids: Vector IDs to fetch
+            tier: 'hot', 'warm' or 'cold'
+            namespace: Optional namespace
+            record_access: Feed the reads to the co-access prefetcher; off
+                for internal reads such as reranking and snapshots
+
+        Returns:
+            Mapping of vector ID to (vector, metadata) for the IDs found
+        """
+        readers = {
+            "hot": self._fetch_hot_cache_batch,
+            "warm": self._fetch_warm_cache_batch,
+            "cold": self._fetch_cold_storage_batch,
+        }
+        if tier not in readers:
+            raise StorageLayerUnavailableError(tier, f"Unknown storage tier: {tier}")
+        if self.tombstones:
+            vector_ids = [i for i in vector_ids if not self.tombstones.is_deleted(i, namespace)]
+            if not vector_ids:
+                return {}
+        coalescer = self._read_coalescers.get(tier)
+        if coalescer:
+            found = await coalescer.get_many(vector_ids, namespace)
+        else:
+            found = await readers[tier](vector_ids, namespace)
+        if self.prefetcher and record_access:
+            self.prefetcher.record_reads(list(found), namespace, tier)
+        return found
+
+    async def _fetch_hot_cache_batch(
+        self,
+        vector_ids: List[str],
+        namespace: Optional[str] = None
+    ) -> Dict[str, Tuple[List[float], Dict[str, Any]]]:
+        """Fetch vectors from Redis with one MGET per node."""
+        groups = defaultdict(list)
+        for vector_id in vector_ids:
+            if self.shards and self.shards.redis.enabled:
+                clients = self.shards.redis_read_order(vector_id, namespace)
+            else:
+                clients = [self._redis]
+            groups[tuple(clients)].append(vector_id)
+
+        found = {}
+        try:
+            for clients, ids in groups.items():
+                missing = ids
+                for client in clients:
+                    values = await client.mget(*(hot_cache_key(i, namespace) for i in missing))
+                    retry = []
+                    for vector_id, raw in zip(missing, values):
+                        if raw is None:
+                            retry.append(vector_id)
+                            continue
+                        entry = decode_hot_cache_entry(raw)
+                        found[vector_id] = (entry["vector"], entry.get("metadata") or {})
+                    missing = retry
+                    if not missing:
+                        break
+        except Exception as e:
+            raise HotCacheError("Failed to fetch batch from hot cache", "mget", {"error": str(e)})
+        return found
+
+    async def _fetch_warm_cache_batch(
+        self,
+        vector_ids: List[str],
+        namespace: Optional[str] = None
+    ) -> Dict[str, Tuple[List[float], Dict[str, Any]]]:
+        """Fetch vectors from AstraDB with one IN query."""
+        try:
+            rows = await asyncio.get_running_loop().run_in_executor(
+                None,
+                partial(
+                    self._get_astra_session().execute,
+                    f"""
+                    SELECT vector_id, vector_data, metadata
+                    FROM {self._warm_cache_table}
+                    WHERE vector_id IN %s
+                    """,
+                    (ValueSequence(vector_ids),)
+                )
+            )
+        except Exception as e:
+            raise WarmCacheError(
+                "Failed to fetch batch from warm cache",
+                "select",
+                {"error": str(e)}
+            )
+        return {
+            row.vector_id: (list(row.vector_data), dict(row.metadata or {}))
+            for row in rows
+        }
+
+    async def _fetch_cold_storage_batch(
+        self,
+        vector_ids: List[str],
+        namespace: Optional[str] = None
+    ) -> Dict[str, Tuple[List[float], Dict[str, Any]]]:
+        """Fetch vectors from Pinecone, grouped by index.
+
+        Each index is sent at most ``PINECONE_FETCH_BATCH`` ids per request.
+        During a rebalance, ids the new owner does not hold yet are fetched
+        from their previous owner.
+        """
+        groups = defaultdict(list)
+        for vector_id in vector_ids:
+            if self.shards and self.shards.pinecone.enabled:
+                indexes = self.shards.pinecone_read_order(vector_id, namespace)
+            else:
+                indexes = [self._pinecone_index]
+            groups[tuple(indexes)].append(vector_id)
+        loop = asyncio.get_running_loop()
+
+        async def fetch(index: Any, ids: List[str]) -> Dict[str, Any]:
+            responses = await asyncio.gather(*(
+                loop.run_in_executor(
+                    None,
+                    partial(
+                        index.fetch,
+                        ids=ids[start:start + PINECONE_FETCH_BATCH],
+                        namespace=namespace
+                    )
+                )
+                for start in range(0, len(ids), PINECONE_FETCH_BATCH)
+            ))
+            return {
+                vector_id: vector
+                for response in responses
+                for vector_id, vector in response["vectors"].items()
+            }
+
+        async def fetch_group(indexes: Tuple[Any, ...], ids: List[str]) -> Dict[str, Any]:
+            vectors = {}
+            missing = ids
+            for index in indexes:
+                vectors.update(await fetch(index, missing))
+                missing = [vector_id for vector_id in missing if vector_id not in vectors]
+                if not missing:
+                    break
+            return vectors
+
+        try:
+            responses = await asyncio.gather(*(
+                fetch_group(indexes, ids) for indexes, ids in groups.items()
+            ))
+        except Exception as e:
+            raise ColdStorageError(
+                "Failed to fetch batch from cold storage",
+                "fetch",
+                {"error": str(e)}
+            )
+        return {
+            vector_id: (vector["values"], vector.get("metadata") or {})
+            for vectors in responses
+            for vector_id, vector in vectors.items()
+        }
+
+    async def query_similar(
+        self,
+        query_vector: List[float],
+        top_k: int = 5,
+        namespace: Optional[str] = None,
+        include_vectors: bool = False,
+        include_metadata: bool = True,
+        filter_criteria: Optional[Dict[str, Any]] = None
+    ) -> List[QueryResult]:
+        """Query similar vectors from cold storage.
+
+        Builds a pydantic model per result; ``query_similar_results`` skips
+        that and is preferred on hot paths.
+
+        Args:
+            query_vector: Vector to find similarities for
+            top_k: Number of results to return
+            namespace: Optional namespace to search in
+            include_vectors: Whether to include vector values in results
+            include_metadata: Whether to include metadata in results
+            filter_criteria: Optional filtering criteria
+
+        Returns:
+            List of query results
+        """
+        results = await self.query_similar_results(
+            query_vector,
+            top_k,
+            namespace,
+            include_vectors,
+            include_metadata,
+            filter_criteria
+        )
+        return results.to_models()
+
+    async def query_similar_results(
+        self,
+        query_vector: List[float],
+        top_k: int = 5,
+        namespace: Optional[str] = None,
+        include_vectors: bool = False,
+        include_metadata: bool = True,
+        filter_criteria: Optional[Dict[str, Any]] = None
+    ) -> QueryResultSet:
+        """Query similar vectors from cold storage into an array-backed result set.
+
+        Takes the same arguments as ``query_similar``. Metadata models are
+        only parsed for rows whose ``metadata`` is read.
+        """
+        started = time.perf_counter()
+        if self.tombstones.is_namespace_deleted(namespace):
+            return QueryResultSet.empty(namespace)
+
+        # Over-fetch so results hidden by tombstones still leave top_k rows
+        fetch_k = top_k + min(len(self.tombstones), top_k) if self.tombstones else top_k
+        tier = "cold"
+        candidates = None
+        if self.reduced_index and filter_criteria is None:
+            candidates = await asyncio.get_running_loop().run_in_executor(
+                None,
+                self.reduced_index.candidates,
+                query_vector,
+                fetch_k,
+                namespace
+            )
+        if candidates is not None:
+            tier = "reduced"
+            results = await self._rerank_candidates(
+                query_vector,
+                candidates,
+                fetch_k,
+                namespace,
+                include_vectors,
+                include_metadata
+            )
+        elif self.shards and self.shards.pinecone.enabled:
+            results = await self.shards.query_similar(
+                query_vector,
+                fetch_k,
+                namespace,
+                include_vectors,
+                include_metadata,
+                filter_criteria
+            )
+        else:
+            results = await query_pinecone_index(
+                self._pinecone_index,
+                query_vector,
+                fetch_k,
+                namespace,
+                include_vectors,
+                include_metadata,
+                filter_criteria
+            )
+        if self.tombstones:
+            results = results.filter_ids(
+                lambda vector_id: not self.tombstones.is_deleted(vector_id, namespace)
+            )
+        results = results[:top_k]
+
+        if self.log_writer:
+            self.log_writer.log_query(
+                top_k,
+                len(query_vector),
+                namespace=namespace,
+                filter_criteria=filter_criteria,
+                execution_time_ms=int((time.perf_counter() - started) * 1000),
+                cache_hits={tier: len(results)},
+                num_results=len(results)
+            )
+        return results
+
+    async def _rerank_candidates(
+        self,
+        query_vector: List[float],
+        candidates: List[str],
+        top_k: int,
+        namespace: Optional[str],
+        include_vectors: bool,
+        include_metadata: bool
+    ) -> QueryResultSet:
+        """Score first-stage candidates exactly at full dimension."""
+        # Candidates are not reads the caller made, so keep them out of the co-access graph
+        found = await self._fetch_nearest_tier(candidates, namespace, record_access=False)
+        ids = [vector_id for vector_id in candidates if vector_id in found]
+        if not ids:
+            return QueryResultSet.empty(namespace)
+
+        metric = self.config.pinecone.metric
+        vectors = np.asarray([found[vector_id][0] for vector_id in ids], dtype=np.float32)
+        scores = VectorMatrix(vectors).scores(query_vector, metric)[0]
+        best = select_top(scores, top_k, largest=metric != "euclidean")
+        return QueryResultSet(
+            [ids[row] for row in best],
+            scores[best],
+            vectors[best] if include_vectors else None,
+            [found[ids[row]][1] or None for row in best] if include_metadata else None,
+            namespace
+        )
+
+    async def _fetch_nearest_tier(
+        self,
+        vector_ids: List[str],
+        namespace: Optional[str] = None,
+        record_access: bool = True
+    ) -> Dict[str, Tuple[List[float], Dict[str, Any]]]:
+        """Fetch vectors from the fastest enabled tier that holds them."""
+        tiers = ["cold"]
+        if self.config.warm_cache_enabled:
+            tiers.insert(0, "warm")
+        if self.config.hot_cache_enabled:
+            tiers.insert(0, "hot")
+
+        found: Dict[str, Tuple[List[float], Dict[str, Any]]] = {}
+        missing = list(vector_ids)
+        for tier in tiers:
+            found.update(await self.fetch_vectors(missing, tier, namespace, record_access))
+            missing = [vector_id for vector_id in missing if vector_id not in found]
+            if not missing:
+                break
+        return found
+
+    async def query_hybrid(
+        self,
+        query_vector: List[float],
+        query_text: str,
+        top_k: int = 5,
+        namespace: Optional[str] = None,
+        include_vectors: bool = False,
+        include_metadata: bool = True,
+        filter_criteria: Optional[Dict[str, Any]] = None,
+        fusion: Optional[str] = None
+    ) -> List[QueryResult]:
+        """Query with dense and BM25 retrieval run concurrently and fused.
+
+        Both retrievers return ``candidate_multiplier * top_k`` candidates,
+        which are fused with reciprocal rank fusion or a weighted sum of
+        normalized scores. ``filter_criteria`` only applies to the dense
+        side. The score of each result is its fused score.
+
+        Args:
+            query_vector: Vector to find similarities for
+            query_text: Keyword query for the BM25 index
+            top_k: Number of results to return
+            namespace: Optional namespace to search in
+            include_vectors: Whether to include vector values in results
+            include_metadata: Whether to include metadata in results
+            filter_criteria: Optional filtering criteria for dense retrieval
+            fusion: 'rrf' or 'weighted', defaulting to the configured method
+
+        Returns:
+            List of query results
+        """
+        if not self.sparse_index:
+            raise StorageLayerUnavailableError("sparse_index", "Sparse index is not enabled")
+
+        settings = self.config.sparse_index
+        fusion = fusion or settings.fusion
+        candidates = top_k * settings.candidate_multiplier
+        dense, sparse = await asyncio.gather(
+            self.query_similar_results(
+                query_vector,
+                candidates,
+                namespace,
+                include_vectors,
+                include_metadata,
+                filter_criteria
+            ),
+            asyncio.get_running_loop().run_in_executor(
+                None,
+                self.sparse_index.search,
+                query_text,
+                candidates,
+                namespace
+            )
+        )
+        if self.tombstones:
+            sparse = [(i, s) for i, s in sparse if not self.tombstones.is_deleted(i, namespace)]
+
+        weights = (settings.dense_weight, 1 - settings.dense_weight)
+        if fusion == "rrf":
+            fused = reciprocal_rank_fusion(
+                [dense.ids, [vector_id for vector_id, _ in sparse]],
+                k=settings.rrf_k,
+                weights=weights
+            )
+        elif fusion == "weighted":
+            sign = -1 if self.config.pinecone.metric == "euclidean" else 1
+            fused = weighted_score_fusion(
+                [list(zip(dense.ids, (sign * dense.scores).tolist())), sparse],
+                weights
+            )
+        else:
+            raise ValueError(f"Unknown fusion method: {fusion}")
+        fused = fused[:top_k]
+
+        by_id: Dict[str, Any] = {row.vector_id: row for row in dense}
+        sparse_only = [vector_id for vector_id, _ in fused if vector_id not in by_id]
+        if sparse_only and (include_vectors or include_metadata):
+            fetched = await self._fetch_nearest_tier(sparse_only, namespace, record_access=False)
+            for vector_id, (vector, metadata) in fetched.items():
+                by_id[vector_id] = to_query_result(
+                    {"id": vector_id, "score": 0.0, "values": vector, "metadata": metadata},
+                    namespace,
+                    include_vectors,
+                    include_metadata
+                )
+
+        results = []
+        for vector_id, score in fused:
+            result = by_id.get(vector_id)
+            if result is None:
+                result = QueryResult(vector_id=vector_id, score=score)
+            elif isinstance(result, QueryResult):
+                result = result.copy(update={"score": score})
+            else:
+                result = result.to_model()
+                result.score = score
+            results.append(result)
+        return results
+
+    def _sparse_add(
+        self,
+        entries: List[Tuple[str, Any, Optional[Dict[str, Any]]]],
+        namespace: Optional[str]
+    ) -> int:
+        """Index documents, and journal them for any running rebuild."""
+        if self._sparse_journals:
+            # Vectors are not needed to re-index text
+            documents = [(vector_id, None, metadata) for vector_id, _, metadata in entries]
+            change = ("add", documents, namespace)
+            for journal in self._sparse_journals:
+                journal.append(change)
+        return self.sparse_index.add_documents(entries, namespace)
+
+    def _sparse_remove(self, vector_ids: List[str]) -> None:
+        """Drop documents, and journal the removal for any running rebuild."""
+        for journal in self._sparse_journals:
+            journal.append(("remove", list(vector_ids), None))
+        self.sparse_index.remove(vector_ids)
+
+    async def rebuild_sparse_index(self, namespaces: Optional[Set[Optional[str]]] = None) -> int:
+        """Rebuild the BM25 index from live metadata rows.
+
+        The new index is built aside while queries keep using the current
+        one. Writes made meanwhile are replayed onto it before it replaces
+        the current index.
+
+        Args:
+            namespaces: Namespaces to rebuild, leaving the others as they
+                are; every namespace when None
+
+        Returns:
+            int: Number of documents indexed
+        """
+        index = SparseIndex(self.config.sparse_index)
+        journal: List[Tuple[str, Any, Optional[str]]] = []
+        self._sparse_journals.append(journal)
+        field = self.config.sparse_index.text_field
+        args: List[Any] = [field]
+        scope = ""
+        if namespaces is not None:
+            scope = "AND (namespace = ANY($2::text[]) OR ($3 AND namespace IS NULL))"
+            args += [[ns for ns in namespaces if ns is not None], None in namespaces]
+        indexed = 0
+        try:
+            async with self._pg_pool.acquire() as conn:
+                async with conn.transaction():
+                    async for record in conn.cursor(
+                        f"""
+                        SELECT vector_id, namespace,
+                               COALESCE(metadata->'custom_metadata'->>$1, metadata->>$1) AS text
+                        FROM vector_metadata
+                        WHERE NOT is_deleted
+                        AND COALESCE(metadata->'custom_metadata'->>$1, metadata->>$1) IS NOT NULL
+                        {scope}
+                        ORDER BY vector_id
+                        """,
+                        *args,
+                        prefetch=self.config.batch_size
+                    ):
+                        indexed += index.add_documents(
+                            [(record["vector_id"], None, {field: record["text"]})],
+                            record["namespace"]
+                        )
+        finally:
+            self._sparse_journals.remove(journal)
+
+        # No awaits from here on, so no write slips between replay and swap
+        for operation, payload, namespace in journal:
+            if operation == "add":
+                if namespaces is None or namespace in namespaces:
+                    index.add_documents(payload, namespace)
+            else:
+                index.remove(payload)
+        if namespaces is None or self.sparse_index is None:
+            self.sparse_index = index
+        else:
+            for namespace in namespaces:
+                self.sparse_index.replace_namespace(namespace, index)
+        logger.info(
+            f"Rebuilt sparse index with {indexed} documents, replayed {len(journal)} changes"
+        )
+        return indexed
+
+    async def index_sparse_documents(self, vector_ids: List[str]) -> int:
+        """Index or re-index the text of stored vectors in the BM25 index.
+
+        Returns:
+            int: Number of documents indexed
+        """
+        field = self.config.sparse_index.text_field
+        async with self._pg_pool.acquire() as conn:
+            records = await conn.fetch(
+                """
+                SELECT vector_id, namespace,
+                       COALESCE(metadata->'custom_metadata'->>$2, metadata->>$2) AS text
+                FROM vector_metadata
+                WHERE vector_id = ANY($1::text[])
+                AND NOT is_deleted
+                """,
+                list(vector_ids),
+                field
+            )
+        by_namespace = defaultdict(list)
+        for record in records:
+            if record["text"] is not None:
+                by_namespace[record["namespace"]].append(
+                    (record["vector_id"], None, {field: record["text"]})
+                )
+        return sum(
+            self._sparse_add(entries, namespace)
+            for namespace, entries in by_namespace.items()
+        )
+
+    def start_reduced_index_rebuild(self) -> None:
+        """Rebuild the reduced index in the background, replacing any running rebuild."""
+        if self._reduced_rebuild and not self._reduced_rebuild.done():
+            self._reduced_rebuild.cancel()
+        self._reduced_rebuild = asyncio.get_running_loop().create_task(
+            self.rebuild_reduced_index()
+        )
+
+    async def rebuild_reduced_index(
+        self,
+        namespace: Optional[str] = None,
+        refit: bool = False
+    ) -> int:
+        """Re-index one namespace, or all, from cold storage.
+
+        Vectors are fetched ``rebuild_page_size`` at a time and upserted into
+        the current codes. With ``refit`` each namespace is emptied first, so
+        its PCA is fitted again on the first ``fit_size`` vectors. Queries
+        fall back to cold storage for a namespace until its PCA is fitted.
+
+        Args:
+            namespace: Namespace to rebuild, or None for all
+            refit: Discard the namespace's codes and projection first
+
+        Returns:
+            int: Number of vectors indexed
+        """
+        page_size = self.config.reduced_index.rebuild_page_size
+        indexed = 0
+        page: List[str] = []
+        page_namespace: Optional[str] = None
+        seen = set()
+
+        async def flush_page() -> int:
+            fetched = await self._fetch_cold_storage_batch(page, page_namespace)
+            return await asyncio.get_running_loop().run_in_executor(
+                None,
+                self.reduced_index.add_vectors,
+                [(vector_id, vector, None) for vector_id, (vector, _) in fetched.items()],
+                page_namespace
+            )
+
+        async for vector_id, vector_namespace in self._iter_vector_keys():
+            if namespace is not None and vector_namespace != namespace:
+                continue
+            if vector_namespace not in seen:
+                if page:
+                    indexed += await flush_page()
+                    page = []
+                seen.add(vector_namespace)
+                if refit:
+                    self.reduced_index.reset(vector_namespace)
+                page_namespace = vector_namespace
+            page.append(vector_id)
+            if len(page) >= page_size:
+                indexed += await flush_page()
+                page = []
+        if page:
+            indexed += await flush_page()
+
+        logger.info(f"Rebuilt reduced index with {indexed} vectors")
+        return indexed
+
+    async def index_reduced_vectors(
+        self,
+        vector_ids: List[str],
+        namespace: Optional[str] = None
+    ) -> int:
+        """Index or re-index stored vectors in the reduced index.
+
+        Returns:
+            int: Number of vectors indexed
+        """
+        fetched = await self._fetch_cold_storage_batch(list(vector_ids), namespace)
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            self.reduced_index.add_vectors,
+            [(vector_id, vector, None) for vector_id, (vector, _) in fetched.items()],
+            namespace
+        )
+
+    async def delete_vectors(
+        self,
+        vector_ids: List[str],
+        namespace: Optional[str] = None
+    ) -> bool:
+        """Delete vectors by ID.
+
+        The vectors are tombstoned in PostgreSQL with one bulk update and
+        hidden from reads straight away. Removing them from the storage
+        layers is left to ``TombstoneCompactor``.
+
+        Args:
+            vector_ids: List of vector IDs to delete
+            namespace: Optional namespace
+
+        Returns:
+            bool: Success status
+        """
+        try:
+            async with self._pg_pool.acquire() as conn:
+                deleted = await conn.fetch(
+                    """
+                    UPDATE vector_metadata
+                    SET is_deleted = TRUE, purged_at = NULL, updated_at = NOW()
+                    WHERE vector_id = ANY($1::text[])
+                    AND NOT is_deleted
+                    RETURNING vector_id
+                    """,
+                    list(vector_ids)
+                )
+        except Exception as e:
+            raise MetadataError("Failed to mark vectors deleted", "delete", {"error": str(e)})
+
+        deleted_ids = [r["vector_id"] for r in deleted]
+        self.tombstones.add(deleted_ids)
+        if self.sparse_index:
+            self._sparse_remove(deleted_ids)
+        if self.reduced_index:
+            self.reduced_index.remove(deleted_ids, namespace)
+        self.forget_reads(deleted_ids, namespace)
+        if self.invalidation:
+            self.invalidation.publish(deleted_ids, namespace, deleted=True)
+        if self.log_writer:
+            for vector_id in deleted_ids:
+                self.log_writer.log_operation(
+                    vector_id,
+                    "delete",
+                    "metadata",
+                    metadata={"namespace": namespace, "tombstone": True}
+                )
+        return True
+
+    def forget_reads(self, vector_ids: List[str], namespace: Optional[str] = None) -> None:
+        """Keep reads that started before a write from being shared after it."""
+        for coalescer in self._read_coalescers.values():
+            coalescer.forget(vector_ids, namespace)
+
+    def read_coalescing_stats(self) -> Dict[str, Dict[str, int]]:
+        """Deduplication counters per tier, plus shared tombstone refreshes."""
+        stats = {tier: dict(c.stats) for tier, c in self._read_coalescers.items()}
+        stats["tombstones"] = dict(self._single_flight.stats)
+        return stats
+
+    async def refresh_store_state(self, namespaces: Optional[Set[Optional[str]]] = None) -> None:
+        """Catch up on invalidations this process missed.
+
+        Tombstones are reloaded in full, which is a single query; the sparse
+        and reduced indexes are rebuilt only for the given namespaces.
+
+        Args:
+            namespaces: Namespaces whose changes were missed; all when None
+        """
+        await self.refresh_tombstones()
+        if self.sparse_index:
+            await self.rebuild_sparse_index(namespaces)
+        if self.reduced_index:
+            # The reduced index cannot rebuild the default namespace on its own
+            if namespaces is None or None in namespaces:
+                await self.rebuild_reduced_index()
+            else:
+                for namespace in sorted(namespaces):
+                    await self.rebuild_reduced_index(namespace)
+
+    async def refresh_tombstones(self) -> int:
+        """Reload the tombstones that compaction has not purged yet.
+
+        Concurrent refreshes share one query.
+
+        Returns:
+            int: Number of pending tombstones
+        """
+        return await self._single_flight.do("tombstones", self._load_tombstones)
+
+    async def _load_tombstones(self) -> int:
+        """Query the pending tombstones and replace the in-memory set."""
+        async with self._pg_pool.acquire() as conn:
+            records = await conn.fetch(
+                """
+                SELECT vector_id
+                FROM vector_metadata
+                WHERE is_deleted AND purged_at IS NULL
+                """
+            )
+        self.tombstones.replace(r["vector_id"] for r in records)
+        return len(self.tombstones)
+
+    async def rebalance_shards(
+        self,
+        redis_shards: Optional[List[RedisConfig]] = None,
+        pinecone_shards: Optional[List[PineconeConfig]] = None
+    ) -> Dict[str, int]:
+        """Move to a new shard layout, migrating only vectors whose owner changed.
+
+        Args:
+            redis_shards: New Redis node list, if it changes
+            pinecone_shards: New Pinecone index list, if it changes
+
+        Returns:
+            Number of vectors moved per tier
+        """
+        if not self.shards:
+            raise StorageLayerUnavailableError("shard_ring", "Sharding is not configured")
+        return await self.shards.rebalance(
+            self._iter_vector_keys(),
+            redis_shards=redis_shards,
+            pinecone_shards=pinecone_shards,
+            batch_size=self.config.batch_size
+        )
+
+    async def finish_shard_rebalance(self, abort: bool = False) -> Dict[str, int]:
+        """Complete a shard rebalance that failed part way through.
+
+        Args:
+            abort: Move vectors back and restore the previous layout instead
+
+        Returns:
+            Number of vectors moved per tier
+        """
+        if not self.shards:
+            raise StorageLayerUnavailableError("shard_ring", "Sharding is not configured")
+        finish = self.shards.abort_rebalance if abort else self.shards.resume_rebalance
+        return await finish(self._iter_vector_keys(), batch_size=self.config.batch_size)
+
+    async def _iter_vector_keys(self) -> AsyncIterator[Tuple[str, Optional[str]]]:
+        """Stream (vector_id, namespace) for every live vector."""
+        async with self._pg_pool.acquire() as conn:
+            async with conn.transaction():
+                async for record in conn.cursor(
+                    """
+                    SELECT vector_id, namespace
+                    FROM vector_metadata
+                    WHERE NOT is_deleted
+                    ORDER BY namespace, vector_id
+                    """,
+                    prefetch=self.config.batch_size
+                ):
+                    yield record["vector_id"], record["namespace"]
+
     async def __aenter__(self):
         """Async context manager entry."""
         await self.initialize()
@@ -1,6 +1,6 @@
 """Exceptions for ANFL Vector Store."""
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from ...core.exceptions import ANFLException
 
@@ -168,4 +168,23 @@ class VectorStorageFullError(VectorStoreError):
                 "max_size": max_size,
                 **(details or {})
             }
-        )
\ No newline at end of file
+        )
+
+
+class SnapshotIntegrityError(VectorStoreError):
+    """Raised when a vector snapshot is incomplete or fails checksum validation."""
+
+    def __init__(
+        self,
+        message: str,
+        path: str,
+        details: Optional[Dict[str, Any]] = None
+    ):
+        super().__init__(
+            message,
+            code="SNAPSHOT_INTEGRITY",
+            details={
+                "path": path,
+                **(details or {})
+            }
+        )
@@ -0,0 +1,281 @@
+"""Cross-process cache invalidation for ANFL Vector Store.
+
+Writers publish changed ``(namespace, vector_id)`` sets on a PostgreSQL
+``NOTIFY`` channel and every process listens on the same channel and evicts
+the ids from its in-process caches. Publications are coalesced over
+``coalesce_ms`` and packed into as few notifications as fit the payload
+limit. A namespace with more than ``namespace_flush_threshold`` changed ids
+in one window is sent as a single namespace-wide invalidation.
+
+Every message carries the sender id and a per-sender sequence number. A
+listener that sees a sequence gap, or loses its connection, can no longer
+trust its caches and flushes them completely.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads must stay below 8000 bytes
+MAX_PAYLOAD_BYTES = 7500
+
+_SEPARATORS = (",", ":")
+
+OP_UPSERT = "upsert"
+OP_DELETE = "delete"
+
+
+class InvalidationSubscriber:
+    """In-process cache that receives invalidations.
+
+    Subclasses override the hooks that apply to them. Hooks run on the event
+    loop and must not block.
+    """
+
+    def invalidate(self, namespace: Optional[str], vector_ids: List[str], deleted: bool) -> None:
+        """Evict changed vectors."""
+
+    def invalidate_namespace(self, namespace: Optional[str]) -> None:
+        """Evict everything cached for a namespace."""
+        self.flush()
+
+    def flush(self) -> None:
+        """Evict everything."""
+
+
+class InvalidationBus:
+    """Publishes and receives cache invalidations over LISTEN/NOTIFY."""
+
+    def __init__(self, config: Any, pool: Any):
+        """Initialize invalidation bus.
+
+        Args:
+            config: Invalidation configuration
+            pool: asyncpg connection pool
+        """
+        self.config = config
+        self._pool = pool
+        self.sender_id = uuid.uuid4().hex
+        self._seq = 0
+        self._subscribers: List[Tuple[InvalidationSubscriber, bool]] = []
+        self._pending: Dict[Optional[str], Dict[str, str]] = defaultdict(dict)
+        self._wakeup = asyncio.Event()
+        self._last_seq: Dict[str, int] = {}
+        self._listen_conn: Any = None
+        self._connection_lost = asyncio.Event()
+        self._terminated = False
+        self._tasks: List[asyncio.Task] = []
+        self._closed = False
+        self.stats: Dict[str, int] = {
+            "published_ids": 0,
+            "messages_sent": 0,
+            "messages_received": 0,
+            "namespace_invalidations": 0,
+            "gaps": 0,
+            "flushes": 0,
+            "send_failures": 0,
+        }
+
+    def subscribe(self, subscriber: InvalidationSubscriber, local: bool = True) -> None:
+        """Register an in-process cache.
+
+        Args:
+            subscriber: Cache to invalidate
+            local: Also deliver this process's own publications
+        """
+        self._subscribers.append((subscriber, local))
+
+    async def start(self) -> None:
+        """Start listening and publishing."""
+        await self._listen()
+        loop = asyncio.get_running_loop()
+        self._tasks = [
+            loop.create_task(self._publish_loop()),
+            loop.create_task(self._watch_connection()),
+        ]
+
+    async def close(self) -> None:
+        """Send what is buffered and stop listening."""
+        self._closed = True
+        self._wakeup.set()
+        self._connection_lost.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._send_pending()
+        await self._unlisten()
+
+    def publish(
+        self, vector_ids: List[str], namespace: Optional[str] = None, deleted: bool = False
+    ) -> None:
+        """Invalidate vectors here at once and in other processes shortly.
+
+        Later publications of the same id within a window replace earlier
+        ones, so only its latest state is sent.
+        """
+        if not vector_ids:
+            return
+        for subscriber, local in self._subscribers:
+            if local:
+                subscriber.invalidate(namespace, list(vector_ids), deleted)
+
+        op = OP_DELETE if deleted else OP_UPSERT
+        pending = self._pending[namespace]
+        for vector_id in vector_ids:
+            pending[vector_id] = op
+        self.stats["published_ids"] += len(vector_ids)
+        self._wakeup.set()
+
+    async def _publish_loop(self) -> None:
+        """Send coalesced invalidations once per window."""
+        while not self._closed:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.config.coalesce_ms / 1000)
+            self._wakeup.clear()
+            await self._send_pending()
+
+    def _build_messages(self) -> List[str]:
+        """Turn buffered invalidations into payloads below the size limit."""
+        pending, self._pending = self._pending, defaultdict(dict)
+        messages = []
+        for namespace, changes in pending.items():
+            if len(changes) > self.config.namespace_flush_threshold:
+                messages.append({"ns": namespace, "all": True})
+                continue
+            by_op = defaultdict(list)
+            for vector_id, op in changes.items():
+                by_op[op].append(vector_id)
+            for op, ids in by_op.items():
+                # Room for the sender and a sequence number of up to 20 digits
+                base = len(self._encode({"ns": namespace, "op": op, "ids": [], "q": 0})) + 20
+                chunk, size = [], base
+                for vector_id in ids:
+                    id_size = len(json.dumps(vector_id).encode("utf-8")) + 1
+                    if chunk and size + id_size > MAX_PAYLOAD_BYTES:
+                        messages.append({"ns": namespace, "op": op, "ids": chunk})
+                        chunk, size = [], base
+                    chunk.append(vector_id)
+                    size += id_size
+                if chunk:
+                    messages.append({"ns": namespace, "op": op, "ids": chunk})
+
+        payloads = []
+        for message in messages:
+            self._seq += 1
+            payloads.append(self._encode({**message, "q": self._seq}))
+        return payloads
+
+    def _encode(self, message: Dict[str, Any]) -> str:
+        """Serialize a message with this sender's id."""
+        return json.dumps({**message, "s": self.sender_id}, separators=_SEPARATORS)
+
+    async def _send_pending(self) -> None:
+        """Send all buffered invalidations in one round trip."""
+        payloads = self._build_messages()
+        if not payloads:
+            return
+        try:
+            async with self._pool.acquire() as conn:
+                await conn.execute(
+                    "SELECT pg_notify($1, payload) FROM unnest($2::text[]) AS payload",
+                    self.config.channel,
+                    payloads,
+                )
+            self.stats["messages_sent"] += len(payloads)
+        except Exception as e:
+            # The sequence numbers are used up, so listeners will see a gap
+            # and flush instead of keeping stale entries.
+            self.stats["send_failures"] += len(payloads)
+            logger.error(f"Failed to send {len(payloads)} invalidations: {str(e)}")
+
+    async def _listen(self) -> None:
+        """Open the listening connection."""
+        self._listen_conn = await self._pool.acquire()
+        self._listen_conn.add_termination_listener(self._on_termination)
+        await self._listen_conn.add_listener(self.config.channel, self._on_notification)
+        self._terminated = False
+        self._connection_lost.clear()
+
+    async def _unlisten(self) -> None:
+        """Close the listening connection."""
+        conn, self._listen_conn = self._listen_conn, None
+        if conn is None or self._terminated:
+            # The pool has already discarded a terminated connection
+            return
+        try:
+            conn.remove_termination_listener(self._on_termination)
+            await conn.remove_listener(self.config.channel, self._on_notification)
+            await self._pool.release(conn)
+        except Exception as e:
+            logger.warning(f"Failed to stop listening for invalidations: {str(e)}")
+
+    def _on_termination(self, conn: Any) -> None:
+        """Mark the listening connection as lost."""
+        self._terminated = True
+        self._connection_lost.set()
+
+    async def _watch_connection(self) -> None:
+        """Reconnect the listener, flushing caches for the missed window."""
+        while True:
+            await self._connection_lost.wait()
+            if self._closed:
+                return
+            logger.warning("Invalidation listener lost its connection")
+            self._flush_all()
+            await self._unlisten()
+            while not self._closed:
+                try:
+                    await self._listen()
+                    break
+                except Exception as e:
+                    logger.error(f"Failed to reconnect invalidation listener: {str(e)}")
+                    await asyncio.sleep(self.config.reconnect_delay)
+            # Anything published while reconnecting is lost
+            self._last_seq.clear()
+            self._flush_all()
+
+    def _on_notification(self, conn: Any, pid: int, channel: str, payload: str) -> None:
+        """Apply an invalidation from another process."""
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed invalidation: {payload[:200]}")
+            return
+
+        sender, seq = message.get("s"), message.get("q")
+        if sender == self.sender_id:
+            return
+        self.stats["messages_received"] += 1
+
+        last = self._last_seq.get(sender)
+        self._last_seq[sender] = seq
+        if last is not None and seq != last + 1:
+            self.stats["gaps"] += 1
+            logger.warning(f"Invalidation gap from {sender}: expected {last + 1}, got {seq}")
+            self._flush_all()
+            return
+
+        namespace = message.get("ns")
+        if message.get("all"):
+            self.stats["namespace_invalidations"] += 1
+            for subscriber, _ in self._subscribers:
+                subscriber.invalidate_namespace(namespace)
+            return
+        deleted = message.get("op") == OP_DELETE
+        for subscriber, _ in self._subscribers:
+            subscriber.invalidate(namespace, message.get("ids") or [], deleted)
+
+    def _flush_all(self) -> None:
+        """Flush every subscriber."""
+        self.stats["flushes"] += 1
+        for subscriber, _ in self._subscribers:
+            try:
+                subscriber.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush {subscriber!r}: {str(e)}")
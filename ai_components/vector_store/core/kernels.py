@@ -0,0 +1,293 @@
+"""Vectorized distance kernels for ANFL Vector Store.
+
+Every comparison of vectors inside the store (reranking, local search,
+deduplication, cache verification) goes through this module instead of
+looping over Python lists. Stored matrices may be float32, float16 or int8;
+other inputs are converted to float32. Scores are computed block by block
+over the stored rows: each block is cast to float32 in a reused scratch
+buffer and multiplied against all queries at once, so half-precision and
+quantized matrices are never expanded in full.
+
+Conventions shared by all kernels:
+
+* cosine similarity involving a zero vector is 0.0;
+* NaNs in either operand propagate to the affected scores;
+* ``l2`` is the squared Euclidean distance unless ``squared=False``; the
+  batched form uses the norm expansion, so identical vectors may score a
+  float32 rounding error above 0;
+* int8 rows are compared as their integer values, so callers apply any
+  quantization scale themselves.
+"""
+
+from typing import Any, Iterator, Optional, Tuple
+
+import numpy as np
+
+SUPPORTED_DTYPES = (np.dtype(np.float32), np.dtype(np.float16), np.dtype(np.int8))
+METRICS = ("cosine", "dotproduct", "euclidean")
+
+# Rows cast and multiplied per step; 2048 x 3072 float32 is 24MB
+DEFAULT_BLOCK_ROWS = 2048
+
+
+def as_matrix(vectors: Any) -> np.ndarray:
+    """View input as a 2-D array, keeping supported storage dtypes."""
+    matrix = np.asarray(vectors)
+    if matrix.dtype not in SUPPORTED_DTYPES:
+        matrix = matrix.astype(np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected vectors or a matrix, got {matrix.ndim} dimensions")
+    return matrix
+
+
+def as_queries(queries: Any) -> np.ndarray:
+    """Queries as a C-contiguous float32 matrix."""
+    return np.ascontiguousarray(as_matrix(queries), dtype=np.float32)
+
+
+def _row_norms(matrix: np.ndarray) -> np.ndarray:
+    """L2 norms of float32 rows."""
+    return np.sqrt(np.einsum("ij,ij->i", matrix, matrix))
+
+
+def normalize(vectors: Any) -> np.ndarray:
+    """L2-normalize rows to float32, leaving zero rows at zero."""
+    matrix = as_queries(vectors)
+    norms = _row_norms(matrix)
+    norms[norms == 0] = 1.0
+    return matrix / norms[:, None]
+
+
+def _divide_norms(scores: np.ndarray, query_norms: np.ndarray, norms: np.ndarray) -> None:
+    """Turn dot products into cosines in place; pairs with a zero norm score 0."""
+    denom = query_norms[:, None] * norms[None, :]
+    zero = denom == 0
+    np.divide(scores, denom, out=scores, where=~zero)
+    scores[zero] = 0.0
+
+
+class VectorMatrix:
+    """A stored matrix of vectors with cached norms and reusable buffers.
+
+    Norms are computed once on first use and kept current by
+    ``update_rows`` and ``append``. Score methods accept an ``out`` buffer of
+    shape (queries, rows) so repeated searches allocate nothing.
+    """
+
+    def __init__(self, vectors: Any, block_rows: int = DEFAULT_BLOCK_ROWS):
+        """Wrap a matrix without copying it when its dtype is supported.
+
+        Args:
+            vectors: (rows, dimension) float32, float16 or int8 matrix
+            block_rows: Rows processed per block
+        """
+        self.data = as_matrix(vectors)
+        self.block_rows = block_rows
+        self._norms: Optional[np.ndarray] = None
+        self._scratch: Optional[np.ndarray] = None
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.data.shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.data.dtype
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def norms(self) -> np.ndarray:
+        """Cached float32 L2 norm of every row."""
+        if self._norms is None or len(self._norms) != len(self.data):
+            norms = np.empty(len(self.data), dtype=np.float32)
+            for start, stop, block in self._blocks():
+                norms[start:stop] = _row_norms(block)
+            self._norms = norms
+        return self._norms
+
+    def update_rows(self, rows: Any, vectors: Any) -> None:
+        """Overwrite rows in place and refresh their norms."""
+        rows = np.asarray(rows, dtype=np.intp)
+        values = as_matrix(vectors)
+        self.data[rows] = values.astype(self.data.dtype, copy=False)
+        if self._norms is not None:
+            self._norms[rows] = _row_norms(self.data[rows].astype(np.float32))
+
+    def append(self, vectors: Any) -> None:
+        """Add rows at the end, extending the cached norms."""
+        values = as_matrix(vectors).astype(self.data.dtype, copy=False)
+        self.data = np.concatenate([self.data, values])
+        if self._norms is not None:
+            self._norms = np.concatenate([self._norms, _row_norms(values.astype(np.float32))])
+
+    def _blocks(self) -> Iterator[Tuple[int, int, np.ndarray]]:
+        """Yield (start, stop, float32 block) over the rows."""
+        total = len(self.data)
+        for start in range(0, total, self.block_rows):
+            end = min(start + self.block_rows, total)
+            block = self.data[start:end]
+            if block.dtype != np.float32:
+                if self._scratch is None or self._scratch.shape[1] != self.data.shape[1]:
+                    self._scratch = np.empty(
+                        (self.block_rows, self.data.shape[1]), dtype=np.float32
+                    )
+                scratch = self._scratch[: end - start]
+                np.copyto(scratch, block, casting="unsafe")
+                block = scratch
+            yield start, end, block
+
+    def _output(self, queries: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+        """Validate or allocate a (queries, rows) float32 output buffer."""
+        shape = (len(queries), len(self.data))
+        if out is None:
+            # Rows-major storage, so each block writes one contiguous slab
+            return np.empty(shape[::-1], dtype=np.float32).T
+        if out.shape != shape or out.dtype != np.float32:
+            raise ValueError(f"out must be float32 with shape {shape}")
+        return out
+
+    def dot(self, queries: Any, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Inner products of every query with every row."""
+        queries = as_queries(queries)
+        self._check_dimension(queries)
+        out = self._output(queries, out)
+        target = out.T
+        queries_t = queries.T
+        for start, stop, block in self._blocks():
+            np.matmul(block, queries_t, out=target[start:stop])
+        return out
+
+    def cosine(self, queries: Any, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Cosine similarities of every query with every row."""
+        queries = as_queries(queries)
+        out = self.dot(queries, out)
+        _divide_norms(out, _row_norms(queries), self.norms)
+        return out
+
+    def l2(
+        self, queries: Any, squared: bool = True, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Euclidean distances of every query to every row."""
+        queries = as_queries(queries)
+        out = self.dot(queries, out)
+        query_norms = _row_norms(queries)
+        out *= -2.0
+        out += (query_norms**2)[:, None]
+        out += (self.norms**2)[None, :]
+        # Cancellation can leave tiny negatives for identical vectors
+        np.maximum(out, 0.0, out=out)
+        if not squared:
+            np.sqrt(out, out=out)
+        return out
+
+    def scores(self, queries: Any, metric: str, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Scores in Pinecone's convention for ``metric``."""
+        if metric == "cosine":
+            return self.cosine(queries, out)
+        if metric == "dotproduct":
+            return self.dot(queries, out)
+        if metric == "euclidean":
+            return self.l2(queries, squared=True, out=out)
+        raise ValueError(f"Unknown metric: {metric}")
+
+    def top_k(self, queries: Any, k: int, metric: str = "cosine") -> Tuple[np.ndarray, np.ndarray]:
+        """Best ``k`` rows per query, computed block by block.
+
+        Only (queries, k) candidates are kept between blocks, so memory does
+        not grow with the number of rows. NaN scores rank last.
+
+        Returns:
+            (indices, scores), each of shape (queries, min(k, rows)), best first
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        queries = as_queries(queries)
+        self._check_dimension(queries)
+        k = min(k, len(self.data))
+        largest = metric != "euclidean"
+        best_index = np.empty((len(queries), 0), dtype=np.intp)
+        best_score = np.empty((len(queries), 0), dtype=np.float32)
+        if not k:
+            return best_index, best_score
+
+        query_norms = _row_norms(queries)
+        queries_t = queries.T
+        buffer = np.empty((self.block_rows, len(queries)), dtype=np.float32)
+        for start, stop, block in self._blocks():
+            scores = np.matmul(block, queries_t, out=buffer[: stop - start]).T
+            norms = self.norms[start:stop]
+            if metric == "cosine":
+                _divide_norms(scores, query_norms, norms)
+            elif metric == "euclidean":
+                scores *= -2.0
+                scores += (query_norms**2)[:, None]
+                scores += (norms**2)[None, :]
+                np.maximum(scores, 0.0, out=scores)
+
+            indices = np.broadcast_to(np.arange(start, stop), scores.shape)
+            merged_score = np.concatenate([best_score, scores], axis=1)
+            merged_index = np.concatenate([best_index, indices], axis=1)
+            keep = _best_columns(merged_score, k, largest)
+            best_score = np.take_along_axis(merged_score, keep, axis=1)
+            best_index = np.take_along_axis(merged_index, keep, axis=1)
+        return best_index, best_score
+
+    def _check_dimension(self, queries: np.ndarray) -> None:
+        if queries.shape[1] != self.data.shape[1]:
+            raise ValueError(
+                f"Query dimension {queries.shape[1]} does not match {self.data.shape[1]}"
+            )
+
+
+def _best_columns(scores: np.ndarray, k: int, largest: bool) -> np.ndarray:
+    """Column indices of the best ``k`` scores per row, best first, NaNs last."""
+    keys = -scores if largest else scores.copy()
+    keys[np.isnan(keys)] = np.inf
+    if k < keys.shape[1]:
+        part = np.argpartition(keys, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(keys.shape[1]), keys.shape)
+    order = np.argsort(np.take_along_axis(keys, part, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1)
+
+
+def dot(a: Any, b: Any) -> float:
+    """Inner product of two vectors."""
+    return float(VectorMatrix(b).dot(a)[0, 0])
+
+
+def cosine(a: Any, b: Any) -> float:
+    """Cosine similarity of two vectors."""
+    return float(VectorMatrix(b).cosine(a)[0, 0])
+
+
+def l2(a: Any, b: Any, squared: bool = False) -> float:
+    """Euclidean distance between two vectors.
+
+    Computed from the difference rather than the norm expansion used by the
+    batched kernels, so identical vectors are exactly 0.
+    """
+    diff = as_queries(a)[0] - as_queries(b)[0]
+    distance = float(diff @ diff)
+    return distance if squared else distance**0.5
+
+
+def dot_batch(queries: Any, vectors: Any, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Inner products of every query with every vector."""
+    return VectorMatrix(vectors).dot(queries, out)
+
+
+def cosine_batch(queries: Any, vectors: Any, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Cosine similarities of every query with every vector."""
+    return VectorMatrix(vectors).cosine(queries, out)
+
+
+def l2_batch(
+    queries: Any, vectors: Any, squared: bool = True, out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Euclidean distances of every query to every vector."""
+    return VectorMatrix(vectors).l2(queries, squared, out)
@@ -0,0 +1,241 @@
+"""Batched audit log writer for ANFL Vector Store."""
+
+import asyncio
+import json
+import logging
+import random
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import LogWriterConfig
+
+logger = logging.getLogger(__name__)
+
+
+QUERY_LOG_TABLE = "similarity_queries"
+OPERATION_LOG_TABLE = "vector_operations"
+
+QUERY_LOG_COLUMNS = (
+    "query_time",
+    "namespace",
+    "top_k",
+    "query_vector_dimension",
+    "filter_criteria",
+    "execution_time_ms",
+    "cache_hits",
+    "num_results",
+    "metadata",
+)
+
+OPERATION_LOG_COLUMNS = (
+    "vector_id",
+    "operation_type",
+    "operation_time",
+    "cache_layer",
+    "status",
+    "error_message",
+    "metadata",
+)
+
+
+def _jsonb(value: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Encode a JSONB column value for COPY."""
+    if value is None:
+        return None
+    return json.dumps(value, default=str)
+
+
+class AuditLogWriter:
+    """Writes audit log records to PostgreSQL in the background.
+
+    Records are buffered in memory and written with ``COPY`` once
+    ``flush_size`` records are pending or ``flush_interval_ms`` has elapsed,
+    so logging never adds a round trip to the caller. When more than
+    ``max_pending`` records are waiting, new records are kept with
+    probability ``overload_sample_rate`` (and tagged with that rate) and the
+    rest are shed. The buffer never grows past twice ``max_pending``.
+    """
+
+    def __init__(self, pool: Any, config: LogWriterConfig):
+        """Initialize the log writer.
+
+        Args:
+            pool: asyncpg connection pool
+            config: Log writer configuration
+        """
+        self._pool = pool
+        self.config = config
+        self._buffers: Dict[str, List[Tuple[Any, ...]]] = {
+            QUERY_LOG_TABLE: [],
+            OPERATION_LOG_TABLE: [],
+        }
+        self._columns = {
+            QUERY_LOG_TABLE: QUERY_LOG_COLUMNS,
+            OPERATION_LOG_TABLE: OPERATION_LOG_COLUMNS,
+        }
+        self._pending = 0
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.stats: Dict[str, int] = {
+            "enqueued": 0,
+            "written": 0,
+            "sampled": 0,
+            "shed": 0,
+            "failed": 0,
+            "flushes": 0,
+        }
+
+    @property
+    def pending(self) -> int:
+        """Number of records waiting to be written."""
+        return self._pending
+
+    def start(self) -> None:
+        """Start the background flush task."""
+        if self._task is None and self.config.enabled:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def log_query(
+        self,
+        top_k: int,
+        query_vector_dimension: int,
+        namespace: Optional[str] = None,
+        filter_criteria: Optional[Dict[str, Any]] = None,
+        execution_time_ms: Optional[int] = None,
+        cache_hits: Optional[Dict[str, Any]] = None,
+        num_results: Optional[int] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Enqueue a ``similarity_queries`` record.
+
+        Returns:
+            bool: Whether the record was accepted
+        """
+        accepted, metadata = self._admit(metadata)
+        if not accepted:
+            return False
+        return self._enqueue(
+            QUERY_LOG_TABLE,
+            (
+                datetime.now(timezone.utc),
+                namespace,
+                top_k,
+                query_vector_dimension,
+                _jsonb(filter_criteria),
+                execution_time_ms,
+                _jsonb(cache_hits),
+                num_results,
+                _jsonb(metadata),
+            ),
+        )
+
+    def log_operation(
+        self,
+        vector_id: str,
+        operation_type: str,
+        cache_layer: str,
+        status: str = "success",
+        error_message: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Enqueue a ``vector_operations`` record.
+
+        Returns:
+            bool: Whether the record was accepted
+        """
+        accepted, metadata = self._admit(metadata)
+        if not accepted:
+            return False
+        return self._enqueue(
+            OPERATION_LOG_TABLE,
+            (
+                vector_id,
+                operation_type,
+                datetime.now(timezone.utc),
+                cache_layer,
+                status,
+                error_message,
+                _jsonb(metadata),
+            ),
+        )
+
+    def _admit(self, metadata: Optional[Dict[str, Any]]) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Apply overload sampling to a new record.
+
+        Returns:
+            Tuple of (accepted, metadata to store with the record)
+        """
+        if self._closed or not self.config.enabled:
+            return False, None
+        if self._pending < self.config.max_pending:
+            return True, metadata
+
+        rate = self.config.overload_sample_rate
+        if self._pending >= 2 * self.config.max_pending or random.random() >= rate:
+            self.stats["shed"] += 1
+            return False, None
+
+        self.stats["sampled"] += 1
+        return True, {**(metadata or {}), "sample_rate": rate}
+
+    def _enqueue(self, table: str, record: Tuple[Any, ...]) -> bool:
+        """Buffer a record and wake the flusher if the batch is full."""
+        self._buffers[table].append(record)
+        self._pending += 1
+        self.stats["enqueued"] += 1
+        if self._pending >= self.config.flush_size:
+            self._wakeup.set()
+        return True
+
+    async def _run(self) -> None:
+        """Flush on size or time triggers until closed."""
+        interval = self.config.flush_interval_ms / 1000
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write all buffered records.
+
+        Returns:
+            int: Number of records written
+        """
+        async with self._flush_lock:
+            batches = {table: records for table, records in self._buffers.items() if records}
+            if not batches:
+                return 0
+            for table in batches:
+                self._buffers[table] = []
+            self._pending = 0
+
+            written = 0
+            for table, records in batches.items():
+                try:
+                    async with self._pool.acquire() as conn:
+                        await conn.copy_records_to_table(
+                            table, records=records, columns=self._columns[table]
+                        )
+                    written += len(records)
+                except Exception as e:
+                    self.stats["failed"] += len(records)
+                    logger.error(f"Failed to write {len(records)} records to {table}: {str(e)}")
+
+            self.stats["written"] += written
+            self.stats["flushes"] += 1
+            return written
+
+    async def close(self) -> None:
+        """Stop the flusher and write everything still buffered."""
+        self._closed = True
+        self._wakeup.set()
+        if self._task:
+            await self._task
+            self._task = None
+        await self.flush()
+        logger.info(f"Audit log writer closed: {self.stats}")
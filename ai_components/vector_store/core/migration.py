@@ -92,13 +92,36 @@ class MigrationManager:
             return [r['vector_id'] for r in results]
 
     async def _get_access_patterns(self) -> Dict[str, Dict[str, int]]:
-        """Get vector access patterns from the last monitoring period."""
+        """Get vector access patterns from the last monitoring period.
+
+        Complete hours come from the hourly rollup; only rows newer than the
+        rollup watermark are read from the raw operations log.
+        """
         async with self.db_manager._pg_pool.acquire() as conn:
             results = await conn.fetch(
                 """
-                SELECT vector_id, cache_layer, access_count
-                FROM cache_tracking
-                WHERE last_accessed > NOW() - INTERVAL '24 hours'
+                SELECT vector_id, cache_layer, SUM(access_count)::BIGINT AS access_count
+                FROM (
+                    SELECT vector_id, cache_layer, operation_count AS access_count
+                    FROM vector_operations_hourly
+                    WHERE operation_type = 'query'
+                    AND bucket_start >= date_trunc('hour', NOW() - INTERVAL '24 hours')
+                    UNION ALL
+                    SELECT vector_id, cache_layer, COUNT(*)
+                    FROM vector_operations
+                    WHERE operation_type = 'query'
+                    AND vector_id IS NOT NULL
+                    AND operation_time >= GREATEST(
+                        (
+                            SELECT rolled_up_to
+                            FROM log_rollup_state
+                            WHERE rollup_name = 'vector_operations_hourly'
+                        ),
+                        NOW() - INTERVAL '24 hours'
+                    )
+                    GROUP BY vector_id, cache_layer
+                ) recent
+                GROUP BY vector_id, cache_layer
                 """
             )
             
@@ -0,0 +1,398 @@
+"""Partition, rollup and retention maintenance for ANFL Vector Store log tables."""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .config import VectorStoreConfig
+
+if TYPE_CHECKING:
+    from .db_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA_PATH = Path(__file__).parent / "schema.sql"
+
+# Partitioned log tables and their partition key
+PARTITIONED_TABLES: Dict[str, str] = {
+    "vector_operations": "operation_time",
+    "similarity_queries": "query_time",
+    "vector_migrations": "migration_time",
+    "cache_metrics": "timestamp",
+}
+
+# Hourly rollups from the raw log tables for [$1, $2). Each bucket is
+# recomputed in full, so re-running a window is idempotent.
+HOURLY_ROLLUPS: Dict[str, str] = {
+    "vector_operations": """
+        INSERT INTO vector_operations_hourly (
+            bucket_start, vector_id, cache_layer, operation_type, status,
+            operation_count
+        )
+        SELECT date_trunc('hour', operation_time), COALESCE(vector_id, ''),
+               cache_layer, operation_type, status, COUNT(*)
+        FROM vector_operations
+        WHERE operation_time >= $1 AND operation_time < $2
+        GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT (bucket_start, vector_id, cache_layer, operation_type, status)
+        DO UPDATE SET operation_count = EXCLUDED.operation_count
+    """,
+    "similarity_queries": """
+        INSERT INTO similarity_queries_hourly (
+            bucket_start, namespace, query_count, total_execution_time_ms,
+            max_execution_time_ms, total_results
+        )
+        SELECT date_trunc('hour', query_time), COALESCE(namespace, ''),
+               COUNT(*), COALESCE(SUM(execution_time_ms), 0),
+               MAX(execution_time_ms), COALESCE(SUM(num_results), 0)
+        FROM similarity_queries
+        WHERE query_time >= $1 AND query_time < $2
+        GROUP BY 1, 2
+        ON CONFLICT (bucket_start, namespace)
+        DO UPDATE SET query_count = EXCLUDED.query_count,
+                      total_execution_time_ms = EXCLUDED.total_execution_time_ms,
+                      max_execution_time_ms = EXCLUDED.max_execution_time_ms,
+                      total_results = EXCLUDED.total_results
+    """,
+    "cache_metrics": """
+        INSERT INTO cache_metrics_hourly (
+            bucket_start, cache_layer, hit_count, miss_count, eviction_count,
+            max_total_vectors, max_total_size_bytes, total_query_time_ms, samples
+        )
+        SELECT date_trunc('hour', timestamp), cache_layer,
+               COALESCE(SUM(hit_count), 0), COALESCE(SUM(miss_count), 0),
+               COALESCE(SUM(eviction_count), 0), MAX(total_vectors),
+               MAX(total_size_bytes), COALESCE(SUM(avg_query_time_ms), 0),
+               COUNT(*)
+        FROM cache_metrics
+        WHERE timestamp >= $1 AND timestamp < $2
+        GROUP BY 1, 2
+        ON CONFLICT (bucket_start, cache_layer)
+        DO UPDATE SET hit_count = EXCLUDED.hit_count,
+                      miss_count = EXCLUDED.miss_count,
+                      eviction_count = EXCLUDED.eviction_count,
+                      max_total_vectors = EXCLUDED.max_total_vectors,
+                      max_total_size_bytes = EXCLUDED.max_total_size_bytes,
+                      total_query_time_ms = EXCLUDED.total_query_time_ms,
+                      samples = EXCLUDED.samples
+    """,
+    "vector_migrations": """
+        INSERT INTO vector_migrations_hourly (
+            bucket_start, source_layer, target_layer, reason, status,
+            migration_count
+        )
+        SELECT date_trunc('hour', migration_time), source_layer, target_layer,
+               reason, status, COUNT(*)
+        FROM vector_migrations
+        WHERE migration_time >= $1 AND migration_time < $2
+        GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT (bucket_start, source_layer, target_layer, reason, status)
+        DO UPDATE SET migration_count = EXCLUDED.migration_count
+    """,
+}
+
+# Daily rollups from the hourly tables for whole UTC days in [$1, $2)
+_UTC_DAY = "date_trunc('day', bucket_start AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'"
+
+DAILY_ROLLUPS: Dict[str, str] = {
+    "vector_operations": f"""
+        INSERT INTO vector_operations_daily
+        SELECT {_UTC_DAY}, vector_id, cache_layer, operation_type, status,
+               SUM(operation_count)
+        FROM vector_operations_hourly
+        WHERE bucket_start >= $1 AND bucket_start < $2
+        GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT (bucket_start, vector_id, cache_layer, operation_type, status)
+        DO UPDATE SET operation_count = EXCLUDED.operation_count
+    """,
+    "similarity_queries": f"""
+        INSERT INTO similarity_queries_daily
+        SELECT {_UTC_DAY}, namespace, SUM(query_count),
+               SUM(total_execution_time_ms), MAX(max_execution_time_ms),
+               SUM(total_results)
+        FROM similarity_queries_hourly
+        WHERE bucket_start >= $1 AND bucket_start < $2
+        GROUP BY 1, 2
+        ON CONFLICT (bucket_start, namespace)
+        DO UPDATE SET query_count = EXCLUDED.query_count,
+                      total_execution_time_ms = EXCLUDED.total_execution_time_ms,
+                      max_execution_time_ms = EXCLUDED.max_execution_time_ms,
+                      total_results = EXCLUDED.total_results
+    """,
+    "cache_metrics": f"""
+        INSERT INTO cache_metrics_daily
+        SELECT {_UTC_DAY}, cache_layer, SUM(hit_count), SUM(miss_count),
+               SUM(eviction_count), MAX(max_total_vectors),
+               MAX(max_total_size_bytes), SUM(total_query_time_ms), SUM(samples)
+        FROM cache_metrics_hourly
+        WHERE bucket_start >= $1 AND bucket_start < $2
+        GROUP BY 1, 2
+        ON CONFLICT (bucket_start, cache_layer)
+        DO UPDATE SET hit_count = EXCLUDED.hit_count,
+                      miss_count = EXCLUDED.miss_count,
+                      eviction_count = EXCLUDED.eviction_count,
+                      max_total_vectors = EXCLUDED.max_total_vectors,
+                      max_total_size_bytes = EXCLUDED.max_total_size_bytes,
+                      total_query_time_ms = EXCLUDED.total_query_time_ms,
+                      samples = EXCLUDED.samples
+    """,
+    "vector_migrations": f"""
+        INSERT INTO vector_migrations_daily
+        SELECT {_UTC_DAY}, source_layer, target_layer, reason, status,
+               SUM(migration_count)
+        FROM vector_migrations_hourly
+        WHERE bucket_start >= $1 AND bucket_start < $2
+        GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT (bucket_start, source_layer, target_layer, reason, status)
+        DO UPDATE SET migration_count = EXCLUDED.migration_count
+    """,
+}
+
+
+def _utc_now() -> datetime:
+    """Current time as an aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
+class PartitionManager:
+    """Maintains daily partitions, rollups and retention of the log tables."""
+
+    def __init__(self, config: VectorStoreConfig, db_manager: "DatabaseManager"):
+        """Initialize partition manager.
+
+        Args:
+            config: Vector store configuration
+            db_manager: Database manager instance
+        """
+        self.config = config
+        self.db_manager = db_manager
+        self._maintenance_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def ensure_partitions(self) -> Dict[str, int]:
+        """Create daily partitions from today through ``days_ahead``.
+
+        Returns:
+            Number of partitions created per table
+        """
+        today = _utc_now().date()
+        until = today + timedelta(days=self.config.partitions.days_ahead)
+        created = {}
+        async with self.db_manager._pg_pool.acquire() as conn:
+            for table in PARTITIONED_TABLES:
+                created[table] = await conn.fetchval(
+                    "SELECT create_daily_partitions($1, $2, $3)", table, today, until
+                )
+        return created
+
+    async def apply_retention(self) -> Dict[str, int]:
+        """Drop raw partitions past retention and prune hourly rollups.
+
+        Partitions are only dropped once their rows have been rolled up.
+
+        Returns:
+            Number of partitions dropped per table
+        """
+        dropped = {}
+        async with self.db_manager._pg_pool.acquire() as conn:
+            for table in PARTITIONED_TABLES:
+                days = self.config.partitions.retention_days.get(table)
+                if not days:
+                    continue
+                cutoff = (_utc_now() - timedelta(days=days)).date()
+                watermark = await self._get_watermark(conn, f"{table}_hourly")
+                if watermark is None:
+                    continue
+                cutoff = min(cutoff, watermark.date())
+                dropped[table] = await conn.fetchval(
+                    "SELECT drop_expired_partitions($1, $2)", table, cutoff
+                )
+
+            hourly_cutoff = _utc_now() - timedelta(
+                days=self.config.partitions.hourly_rollup_retention_days
+            )
+            for table in PARTITIONED_TABLES:
+                await conn.execute(
+                    f"DELETE FROM {table}_hourly WHERE bucket_start < $1", hourly_cutoff
+                )
+        return dropped
+
+    async def rollup_hourly(self) -> Dict[str, int]:
+        """Roll raw log rows up into the hourly tables.
+
+        Returns:
+            Number of hours rolled up per table
+        """
+        until = _utc_now().replace(minute=0, second=0, microsecond=0)
+        sources = {table: (table, column) for table, column in PARTITIONED_TABLES.items()}
+        return await self._rollup(HOURLY_ROLLUPS, sources, "hourly", until, timedelta(hours=1))
+
+    async def rollup_daily(self) -> Dict[str, int]:
+        """Roll hourly rows up into the daily tables for completed days.
+
+        Returns:
+            Number of days rolled up per table
+        """
+        until = _utc_now().replace(hour=0, minute=0, second=0, microsecond=0)
+        sources = {table: (f"{table}_hourly", "bucket_start") for table in PARTITIONED_TABLES}
+        return await self._rollup(DAILY_ROLLUPS, sources, "daily", until, timedelta(days=1))
+
+    async def _rollup(
+        self,
+        statements: Dict[str, str],
+        sources: Dict[str, Tuple[str, str]],
+        granularity: str,
+        until: datetime,
+        bucket: timedelta,
+    ) -> Dict[str, int]:
+        """Run rollup statements from each table's watermark up to ``until``.
+
+        Without a watermark, a rollup starts at the oldest source row so
+        converted or restored tables are aggregated in full.
+        """
+        rolled = {}
+        async with self.db_manager._pg_pool.acquire() as conn:
+            for table, statement in statements.items():
+                name = f"{table}_{granularity}"
+                since = await self._get_watermark(conn, name)
+                if since is None:
+                    source, column = sources[table]
+                    oldest = await conn.fetchval(f"SELECT MIN({column}) FROM {source}")
+                    if oldest is None:
+                        since = until - bucket
+                    else:
+                        since = until - bucket * -(-(until - oldest) // bucket)
+                if since >= until:
+                    rolled[table] = 0
+                    continue
+
+                async with conn.transaction():
+                    await conn.execute(statement, since, until)
+                    await conn.execute(
+                        """
+                        INSERT INTO log_rollup_state (rollup_name, rolled_up_to)
+                        VALUES ($1, $2)
+                        ON CONFLICT (rollup_name)
+                        DO UPDATE SET rolled_up_to = EXCLUDED.rolled_up_to
+                        """,
+                        name,
+                        until,
+                    )
+                rolled[table] = int((until - since) / bucket)
+        return rolled
+
+    @staticmethod
+    async def _get_watermark(conn, rollup_name: str) -> Optional[datetime]:
+        """Get the time up to which a rollup is complete."""
+        return await conn.fetchval(
+            "SELECT rolled_up_to FROM log_rollup_state WHERE rollup_name = $1", rollup_name
+        )
+
+    async def run_maintenance(self) -> None:
+        """Create upcoming partitions, refresh rollups and apply retention."""
+        async with self._maintenance_lock:
+            try:
+                created = await self.ensure_partitions()
+                await self.rollup_hourly()
+                await self.rollup_daily()
+                dropped = await self.apply_retention()
+                logger.info(f"Partition maintenance done: created={created} dropped={dropped}")
+            except Exception as e:
+                logger.error(f"Error during partition maintenance: {str(e)}")
+                raise
+
+    def start(self) -> None:
+        """Run maintenance every ``maintenance_interval`` seconds."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background maintenance task."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Background maintenance loop."""
+        while True:
+            try:
+                await self.run_maintenance()
+            except Exception:
+                pass  # Already logged; retry on the next interval
+            await asyncio.sleep(self.config.partitions.maintenance_interval)
+
+    async def convert_legacy_tables(self) -> List[str]:
+        """Convert unpartitioned log tables from older schemas in place.
+
+        Each legacy table is renamed, the partitioned table is created from
+        ``schema.sql``, partitions are created for the legacy date range and
+        the rows are copied over. Runs in one transaction.
+
+        Returns:
+            Names of the converted tables
+        """
+        async with self.db_manager._pg_pool.acquire() as conn:
+            async with conn.transaction():
+                legacy = await self._rename_legacy_tables(conn)
+                if not legacy:
+                    return []
+
+                await conn.execute(SCHEMA_PATH.read_text())
+                today = _utc_now().date()
+                until = today + timedelta(days=self.config.partitions.days_ahead)
+
+                for table in legacy:
+                    column = PARTITIONED_TABLES[table]
+                    first_day = await conn.fetchval(
+                        f"SELECT MIN({column} AT TIME ZONE 'UTC')::date FROM {table}_legacy"
+                    )
+                    await conn.fetchval(
+                        "SELECT create_daily_partitions($1, $2, $3)",
+                        table,
+                        min(first_day or today, today),
+                        until,
+                    )
+                    # Rows were already counted by the access trigger once
+                    await conn.execute(f"ALTER TABLE {table} DISABLE TRIGGER USER")
+                    await conn.execute(f"INSERT INTO {table} SELECT * FROM {table}_legacy")
+                    await conn.execute(f"ALTER TABLE {table} ENABLE TRIGGER USER")
+                    await conn.execute(f"DROP TABLE {table}_legacy")
+
+                logger.info(f"Converted log tables to partitioned tables: {legacy}")
+                return legacy
+
+    async def _rename_legacy_tables(self, conn) -> List[str]:
+        """Move unpartitioned log tables and their indexes out of the way."""
+        legacy = []
+        for table in PARTITIONED_TABLES:
+            kind = await conn.fetchval(
+                "SELECT relkind::text FROM pg_class WHERE oid = to_regclass($1)", table
+            )
+            if kind != "r":
+                continue
+
+            await conn.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+            await conn.execute(
+                f"ALTER TABLE {table}_legacy "
+                f"RENAME CONSTRAINT {table}_pkey TO {table}_legacy_pkey"
+            )
+            indexes = await conn.fetch(
+                """
+                SELECT indexname
+                FROM pg_indexes
+                WHERE tablename = $1
+                AND indexname LIKE 'idx_%'
+                """,
+                f"{table}_legacy",
+            )
+            for index in indexes:
+                await conn.execute(f"DROP INDEX {index['indexname']}")
+            legacy.append(table)
+        return legacy
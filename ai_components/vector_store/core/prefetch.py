@@ -0,0 +1,306 @@
+"""Co-access prefetching into the ANFL Vector Store hot cache.
+
+Reads that happen close together in one namespace are linked in a bounded
+co-occurrence graph whose weights decay exponentially. When a vector has to
+be read from warm or cold storage, its strongest neighbours are copied into
+Redis in the background under a rate budget. Every prefetch is tracked
+until it is either read (a hit) or its TTL runs out (wasted), and the
+budget shrinks while accuracy stays below ``min_accuracy``.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict, defaultdict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from .base import hot_cache_key
+from .config import PrefetchConfig
+from .db_manager import DatabaseManager, encode_hot_cache_entry
+
+logger = logging.getLogger(__name__)
+
+# Prefetch tasks allowed to run at once
+MAX_INFLIGHT_PREFETCHES = 4
+
+Key = Tuple[Optional[str], str]
+
+
+class CoAccessGraph:
+    """Bounded sparse co-occurrence graph with exponentially decaying weights.
+
+    Weights are decayed lazily: each edge stores its weight and the time it
+    was last updated. The least recently touched vectors are evicted past
+    ``max_nodes`` and the weakest neighbours past ``max_neighbors``.
+    """
+
+    def __init__(self, max_nodes: int, max_neighbors: int, half_life_seconds: float):
+        """Initialize an empty graph.
+
+        Args:
+            max_nodes: Vectors tracked
+            max_neighbors: Neighbours kept per vector
+            half_life_seconds: Half-life of edge weights
+        """
+        self.max_nodes = max_nodes
+        self.max_neighbors = max_neighbors
+        self._decay = math.log(2) / half_life_seconds
+        self._edges: "OrderedDict[Key, Dict[Key, Tuple[float, float]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        """Number of tracked vectors."""
+        return len(self._edges)
+
+    def _weight(self, edge: Tuple[float, float], now: float) -> float:
+        """Decayed weight of an edge."""
+        weight, updated = edge
+        return weight * math.exp(-self._decay * max(now - updated, 0.0))
+
+    def link(self, a: Key, b: Key, now: float) -> None:
+        """Record one co-access of two vectors."""
+        self._bump(a, b, now)
+        self._bump(b, a, now)
+
+    def _bump(self, source: Key, target: Key, now: float) -> None:
+        """Strengthen the directed edge source -> target."""
+        neighbors = self._edges.get(source)
+        if neighbors is None:
+            neighbors = self._edges[source] = {}
+            if len(self._edges) > self.max_nodes:
+                self._edges.popitem(last=False)
+        else:
+            self._edges.move_to_end(source)
+
+        edge = neighbors.get(target)
+        neighbors[target] = (1.0 + (self._weight(edge, now) if edge else 0.0), now)
+        if len(neighbors) > self.max_neighbors:
+            weakest = min(neighbors, key=lambda key: self._weight(neighbors[key], now))
+            del neighbors[weakest]
+
+    def neighbors(self, key: Key, limit: int, min_weight: float, now: float) -> List[Key]:
+        """Strongest neighbours of a vector."""
+        edges = self._edges.get(key)
+        if not edges:
+            return []
+        scored = [
+            (weight, neighbor)
+            for neighbor, edge in edges.items()
+            for weight in (self._weight(edge, now),)
+            if weight >= min_weight
+        ]
+        scored.sort(reverse=True)
+        return [neighbor for _, neighbor in scored[:limit]]
+
+
+class CoAccessPrefetcher:
+    """Learns co-access from reads and prefetches neighbours into Redis."""
+
+    def __init__(self, config: PrefetchConfig, db_manager: DatabaseManager):
+        """Initialize prefetcher.
+
+        Args:
+            config: Prefetch configuration
+            db_manager: Database manager instance
+        """
+        self.config = config
+        self.db_manager = db_manager
+        self.graph = CoAccessGraph(config.max_nodes, config.max_neighbors, config.half_life_seconds)
+        self._recent: Dict[Optional[str], Deque[Tuple[float, str]]] = defaultdict(
+            lambda: deque(maxlen=config.window_size)
+        )
+        self._outstanding: "OrderedDict[Key, float]" = OrderedDict()
+        self._tokens = config.budget_per_second
+        self._refilled_at = time.monotonic()
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats: Dict[str, int] = {
+            "reads": 0,
+            "scheduled": 0,
+            "prefetched": 0,
+            "hits": 0,
+            "wasted": 0,
+            "skipped_budget": 0,
+            "failed": 0,
+        }
+
+    @property
+    def accuracy(self) -> Optional[float]:
+        """Share of resolved prefetches that were read, once enough are resolved."""
+        resolved = self.stats["hits"] + self.stats["wasted"]
+        if resolved < self.config.min_samples:
+            return None
+        return self.stats["hits"] / resolved
+
+    def start(self) -> None:
+        """Attach to the database manager so reads are observed."""
+        self.db_manager.prefetcher = self
+
+    async def stop(self) -> None:
+        """Detach and wait for running prefetches."""
+        if self.db_manager.prefetcher is self:
+            self.db_manager.prefetcher = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def observe(self, vector_id: str, namespace: Optional[str], at: float) -> None:
+        """Link a read to the recent reads of its namespace."""
+        recent = self._recent[namespace]
+        key = (namespace, vector_id)
+        for seen_at, other in recent:
+            if other != vector_id and at - seen_at <= self.config.window_seconds:
+                self.graph.link(key, (namespace, other), at)
+        recent.append((at, vector_id))
+
+    def record_reads(self, vector_ids: List[str], namespace: Optional[str], tier: str) -> None:
+        """Observe a batch of reads and prefetch for the ones that missed Redis.
+
+        Called by ``DatabaseManager.fetch_vectors``; never blocks on I/O.
+        """
+        now = time.time()
+        self._expire_outstanding(now)
+        log_writer = self.db_manager.log_writer
+        for vector_id in vector_ids:
+            self.stats["reads"] += 1
+            if self._outstanding.pop((namespace, vector_id), None) is not None:
+                self.stats["hits"] += 1
+            self.observe(vector_id, namespace, now)
+            if log_writer:
+                log_writer.log_operation(vector_id, "read", tier, metadata={"namespace": namespace})
+
+        if tier in ("warm", "cold") and self.db_manager.config.hot_cache_enabled:
+            self._schedule(vector_ids, namespace, now)
+
+    def _expire_outstanding(self, now: float) -> None:
+        """Count prefetches whose TTL ran out unread as wasted."""
+        while self._outstanding:
+            key, expires_at = next(iter(self._outstanding.items()))
+            if expires_at > now:
+                break
+            self._outstanding.popitem(last=False)
+            self.stats["wasted"] += 1
+
+    def _take_budget(self, wanted: int) -> int:
+        """Take up to ``wanted`` tokens from the prefetch budget."""
+        rate = self.config.budget_per_second
+        accuracy = self.accuracy
+        if accuracy is not None and accuracy < self.config.min_accuracy:
+            # Keep a trickle so accuracy can recover
+            rate *= max(accuracy / self.config.min_accuracy, 0.05)
+
+        now = time.monotonic()
+        self._tokens = min(rate, self._tokens + (now - self._refilled_at) * rate)
+        self._refilled_at = now
+        granted = min(wanted, int(self._tokens))
+        self._tokens -= granted
+        return granted
+
+    def _schedule(self, vector_ids: List[str], namespace: Optional[str], now: float) -> None:
+        """Pick neighbours of missed reads and prefetch them in the background."""
+        if len(self._tasks) >= MAX_INFLIGHT_PREFETCHES:
+            self.stats["skipped_budget"] += 1
+            return
+
+        reading = set(vector_ids)
+        candidates: Dict[str, None] = {}
+        for vector_id in vector_ids:
+            for ns, neighbor in self.graph.neighbors(
+                (namespace, vector_id), self.config.fanout, self.config.min_weight, now
+            ):
+                if (
+                    neighbor not in reading
+                    and (ns, neighbor) not in self._outstanding
+                    and not self.db_manager.tombstones.is_deleted(neighbor, ns)
+                ):
+                    candidates[neighbor] = None
+        if not candidates:
+            return
+
+        granted = self._take_budget(len(candidates))
+        if granted < len(candidates):
+            self.stats["skipped_budget"] += len(candidates) - granted
+        if not granted:
+            return
+
+        ids = list(candidates)[:granted]
+        self.stats["scheduled"] += len(ids)
+        task = asyncio.get_running_loop().create_task(self._prefetch(ids, namespace))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _prefetch(self, vector_ids: List[str], namespace: Optional[str]) -> None:
+        """Copy vectors from warm or cold storage into Redis if not cached."""
+        db = self.db_manager
+        try:
+            found = {}
+            if db.config.warm_cache_enabled:
+                found = await db._fetch_warm_cache_batch(vector_ids, namespace)
+            missing = [vector_id for vector_id in vector_ids if vector_id not in found]
+            if missing:
+                found.update(await db._fetch_cold_storage_batch(missing, namespace))
+
+            groups = defaultdict(list)
+            for vector_id in found:
+                groups[db._hot_cache_client(vector_id, namespace)].append(vector_id)
+            for client, ids in groups.items():
+                pipe = client.pipeline()
+                for vector_id in ids:
+                    vector, metadata = found[vector_id]
+                    pipe.set(
+                        hot_cache_key(vector_id, namespace),
+                        encode_hot_cache_entry(vector, metadata),
+                        expire=self.config.prefetch_ttl,
+                        exist=client.SET_IF_NOT_EXIST,
+                    )
+                written = await pipe.execute()
+
+                expires_at = time.time() + self.config.prefetch_ttl
+                for vector_id, ok in zip(ids, written):
+                    # Keys that were already cached are not counted as prefetches
+                    if ok:
+                        self._outstanding[(namespace, vector_id)] = expires_at
+                        self.stats["prefetched"] += 1
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.warning(f"Prefetch of {len(vector_ids)} vectors failed: {str(e)}")
+
+    async def train_from_operations(self, since: datetime) -> int:
+        """Warm the co-access graph from reads logged in ``vector_operations``.
+
+        Args:
+            since: Oldest operation to replay
+
+        Returns:
+            int: Number of reads replayed
+        """
+        replayed = 0
+        async with self.db_manager._pg_pool.acquire() as conn:
+            async with conn.transaction():
+                async for record in conn.cursor(
+                    """
+                    SELECT vector_id, metadata->>'namespace' AS namespace, operation_time
+                    FROM vector_operations
+                    WHERE operation_type = 'read'
+                    AND operation_time >= $1
+                    ORDER BY operation_time
+                    """,
+                    since,
+                    prefetch=self.db_manager.config.batch_size,
+                ):
+                    self.observe(
+                        record["vector_id"],
+                        record["namespace"],
+                        record["operation_time"].timestamp(),
+                    )
+                    replayed += 1
+        logger.info(f"Replayed {replayed} reads into the co-access graph")
+        return replayed
+
+    def report(self) -> Dict[str, Any]:
+        """Prefetch counters, accuracy and graph size."""
+        return {
+            **self.stats,
+            "accuracy": self.accuracy,
+            "outstanding": len(self._outstanding),
+            "graph_nodes": len(self.graph),
+        }
@@ -0,0 +1,443 @@
+"""Dimensionality-reduced first-stage search for ANFL Vector Store.
+
+Each namespace keeps a compact float32 matrix of reduced codes in memory.
+Codes come either from a PCA fitted on the first ``fit_size`` vectors of the
+namespace or from the leading components of Matryoshka-style embeddings
+(prefix truncation). A query scores every code at the reduced dimension and
+the best ``candidate_multiplier * top_k`` candidates are reranked exactly at
+full dimension.
+
+For PCA the inner product is approximated as
+``q.x ~= P(q - m).P(x - m) + m.x + m.q - m.m``, where ``m`` is the sample
+mean. ``m.x`` is stored per row, so the mean direction is scored exactly and
+only the residual is truncated.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import ReducedIndexConfig, ReducedSearchSettings
+from .kernels import VectorMatrix, as_queries, dot_batch, normalize
+
+METHODS = ("pca", "prefix")
+
+# Rows kept dead before the code matrix is compacted
+_COMPACT_MIN_DEAD = 1024
+
+
+def prepare_vectors(vectors: Any, metric: str) -> np.ndarray:
+    """Convert vectors to a float32 matrix, L2-normalized for cosine."""
+    if metric == "cosine":
+        return normalize(vectors)
+    return as_queries(vectors)
+
+
+def exact_scores(query: np.ndarray, vectors: np.ndarray, metric: str) -> np.ndarray:
+    """Full-dimension scores of one query, in Pinecone's convention.
+
+    Cosine and dot product are similarities; euclidean is the squared
+    distance, where smaller is better.
+    """
+    return VectorMatrix(vectors).scores(query, metric)[0]
+
+
+def select_top(scores: np.ndarray, k: int, largest: bool = True) -> np.ndarray:
+    """Indices of the best ``k`` scores, best first."""
+    keys = -scores if largest else scores
+    if k < len(keys):
+        best = np.argpartition(keys, k)[:k]
+    else:
+        best = np.arange(len(keys))
+    return best[np.argsort(keys[best], kind="stable")]
+
+
+class PrefixProjection:
+    """Keeps the leading components of each vector."""
+
+    def __init__(self, dimension: int, metric: str):
+        self.dimension = dimension
+        self.metric = metric
+
+    def encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Codes and per-row score offsets of prepared vectors."""
+        codes = np.ascontiguousarray(vectors[:, : self.dimension])
+        if self.metric == "cosine":
+            # Matryoshka prefixes are meant to be used renormalized
+            codes = prepare_vectors(codes, "cosine")
+        return codes, np.zeros(len(vectors), dtype=np.float32)
+
+    def encode_query(self, query: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Code and score constant of a prepared query."""
+        codes, _ = self.encode(query.reshape(1, -1))
+        return codes[0], 0.0
+
+
+class PCAProjection:
+    """Projects centered vectors onto their leading principal components."""
+
+    def __init__(self, dimension: int, metric: str):
+        self.dimension = dimension
+        self.metric = metric
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        self.explained_variance = 0.0
+
+    def fit(self, sample: np.ndarray) -> "PCAProjection":
+        """Fit the projection on prepared sample vectors."""
+        from sklearn.decomposition import PCA
+
+        components = min(self.dimension, sample.shape[0], sample.shape[1])
+        pca = PCA(n_components=components, svd_solver="randomized", random_state=0)
+        pca.fit(sample)
+        self.dimension = components
+        self.mean = pca.mean_.astype(np.float32)
+        self.components = np.ascontiguousarray(pca.components_.astype(np.float32))
+        self.explained_variance = float(pca.explained_variance_ratio_.sum())
+        return self
+
+    def encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Codes and per-row score offsets of prepared vectors."""
+        codes = (vectors - self.mean) @ self.components.T
+        return codes, vectors @ self.mean
+
+    def encode_query(self, query: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Code and score constant of a prepared query."""
+        code = (query - self.mean) @ self.components.T
+        return code, float(query @ self.mean - self.mean @ self.mean)
+
+
+class NamespaceReducedIndex:
+    """Reduced codes of one namespace, updated in place on writes."""
+
+    def __init__(self, method: str, dimension: int, metric: str, fit_size: int):
+        """Initialize an empty index.
+
+        Args:
+            method: 'pca' or 'prefix'
+            dimension: Target dimension
+            metric: 'cosine', 'dotproduct' or 'euclidean'
+            fit_size: Vectors collected before PCA is fitted
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown reduction method: {method}")
+        self.method = method
+        self.metric = metric
+        self.fit_size = fit_size
+        self.projection: Any = PrefixProjection(dimension, metric) if method == "prefix" else None
+        self._target_dimension = dimension
+        self._pending: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._codes = np.empty((0, 0), dtype=np.float32)
+        self._offsets = np.empty(0, dtype=np.float32)
+        self._norms = np.empty(0, dtype=np.float32)
+        self._alive = np.empty(0, dtype=bool)
+        self._size = 0
+
+    @property
+    def ready(self) -> bool:
+        """Whether the projection exists and queries can be served."""
+        return self.projection is not None
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._pending)
+
+    def fit(self, sample: np.ndarray) -> None:
+        """Fit PCA on prepared vectors and encode everything collected so far."""
+        with self._lock:
+            self._fit(sample)
+
+    def _fit(self, sample: np.ndarray) -> None:
+        self.projection = PCAProjection(self._target_dimension, self.metric).fit(sample)
+        pending, self._pending = self._pending, {}
+        if pending:
+            self._add_encoded(list(pending), np.stack(list(pending.values())))
+
+    def add(self, vector_ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Insert or replace prepared vectors."""
+        with self._lock:
+            if self.projection is None:
+                for vector_id, vector in zip(vector_ids, vectors):
+                    self._pending[vector_id] = vector
+                if len(self._pending) >= self.fit_size:
+                    self._fit(np.stack(list(self._pending.values())))
+                return
+            self._add_encoded(vector_ids, vectors)
+
+    def _add_encoded(self, vector_ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Encode vectors and write them to their rows."""
+        codes, offsets = self.projection.encode(vectors)
+        if not self._size and self._codes.shape[1] != codes.shape[1]:
+            self._codes = np.empty((0, codes.shape[1]), dtype=np.float32)
+            self._offsets = np.empty(0, dtype=np.float32)
+            self._norms = np.empty(0, dtype=np.float32)
+            self._alive = np.empty(0, dtype=bool)
+        rows = np.empty(len(vector_ids), dtype=np.intp)
+        for position, vector_id in enumerate(vector_ids):
+            row = self._rows.get(vector_id)
+            if row is None:
+                row = self._append_row(vector_id)
+            rows[position] = row
+        self._codes[rows] = codes
+        self._offsets[rows] = offsets
+        self._norms[rows] = np.einsum("ij,ij->i", codes, codes)
+        self._alive[rows] = True
+
+    def _append_row(self, vector_id: str) -> int:
+        """Reserve a row, growing the arrays geometrically."""
+        if self._size == len(self._alive):
+            capacity = max(1024, 2 * len(self._alive))
+            extra = capacity - len(self._alive)
+            self._codes = np.concatenate(
+                [self._codes, np.zeros((extra, self._codes.shape[1]), dtype=np.float32)]
+            )
+            self._offsets = np.concatenate([self._offsets, np.zeros(extra, dtype=np.float32)])
+            self._norms = np.concatenate([self._norms, np.zeros(extra, dtype=np.float32)])
+            self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+        row = self._size
+        self._size += 1
+        self._ids.append(vector_id)
+        self._rows[vector_id] = row
+        return row
+
+    def remove(self, vector_ids: Iterable[str]) -> None:
+        """Drop vectors."""
+        with self._lock:
+            for vector_id in vector_ids:
+                self._pending.pop(vector_id, None)
+                row = self._rows.pop(vector_id, None)
+                if row is not None:
+                    self._alive[row] = False
+                    self._ids[row] = None
+            dead = self._size - len(self._rows)
+            if dead >= _COMPACT_MIN_DEAD and dead * 4 >= self._size:
+                self._compact()
+
+    def _compact(self) -> None:
+        """Move live rows to the front."""
+        live = np.flatnonzero(self._alive[: self._size])
+        self._codes = self._codes[live]
+        self._offsets = self._offsets[live]
+        self._norms = self._norms[live]
+        self._alive = np.ones(len(live), dtype=bool)
+        self._ids = [self._ids[row] for row in live]
+        self._rows = {vector_id: row for row, vector_id in enumerate(self._ids)}
+        self._size = len(live)
+
+    def search(self, query: np.ndarray, k: int) -> Optional[List[str]]:
+        """Best ``k`` candidates for a prepared query at reduced dimension.
+
+        Returns:
+            Candidate IDs, best first, or None while PCA is not fitted yet
+        """
+        with self._lock:
+            if self.projection is None:
+                return None
+            if not self._rows:
+                return []
+            code, constant = self.projection.encode_query(query)
+            size = self._size
+            codes = self._codes[:size]
+            if self.metric == "euclidean":
+                scores = self._norms[:size] - 2 * dot_batch(code, codes)[0]
+                scores[~self._alive[:size]] = np.inf
+                best = select_top(scores, min(k, len(self._rows)), largest=False)
+            else:
+                scores = dot_batch(code, codes)[0] + self._offsets[:size] + constant
+                scores[~self._alive[:size]] = -np.inf
+                best = select_top(scores, min(k, len(self._rows)))
+            return [self._ids[row] for row in best]
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and projection details."""
+        return {
+            "method": self.method,
+            "ready": self.ready,
+            "dimension": self.projection.dimension if self.projection else self._target_dimension,
+            "vectors": len(self._rows),
+            "pending_fit": len(self._pending),
+            "dead_rows": self._size - len(self._rows),
+            "code_bytes": int(self._codes.nbytes),
+            "explained_variance": getattr(self.projection, "explained_variance", None),
+        }
+
+
+class ReducedIndex:
+    """Reduced first-stage indexes for every namespace."""
+
+    def __init__(self, config: ReducedIndexConfig, metric: str = "cosine"):
+        """Initialize reduced index.
+
+        Args:
+            config: Reduced index configuration
+            metric: Distance metric of the vector store
+        """
+        self.config = config
+        self.metric = metric
+        self._indexes: Dict[Optional[str], NamespaceReducedIndex] = {}
+        self._lock = threading.Lock()
+
+    def settings_for(self, namespace: Optional[str]) -> ReducedSearchSettings:
+        """Method, dimension and multiplier for a namespace, with overrides applied."""
+        override = self.config.namespaces.get(namespace or "")
+        return ReducedSearchSettings(
+            method=(override and override.method) or self.config.method,
+            target_dimension=(override and override.target_dimension)
+            or self.config.target_dimension,
+            candidate_multiplier=(
+                (override and override.candidate_multiplier) or self.config.candidate_multiplier
+            ),
+        )
+
+    def _index_for(self, namespace: Optional[str]) -> NamespaceReducedIndex:
+        with self._lock:
+            index = self._indexes.get(namespace)
+            if index is None:
+                settings = self.settings_for(namespace)
+                index = self._indexes[namespace] = NamespaceReducedIndex(
+                    settings.method, settings.target_dimension, self.metric, self.config.fit_size
+                )
+            return index
+
+    def add_vectors(
+        self, entries: Iterable[Tuple[str, Any, Any]], namespace: Optional[str] = None
+    ) -> int:
+        """Index the vectors of (vector_id, vector, metadata) entries.
+
+        Returns:
+            int: Number of vectors indexed
+        """
+        entries = [(vector_id, vector) for vector_id, vector, _ in entries if vector is not None]
+        if not entries:
+            return 0
+        vectors = prepare_vectors([vector for _, vector in entries], self.metric)
+        self._index_for(namespace).add([vector_id for vector_id, _ in entries], vectors)
+        return len(entries)
+
+    def remove(self, vector_ids: Iterable[str], namespace: Optional[str] = None) -> None:
+        """Drop vectors from one namespace, or from all when none is given."""
+        vector_ids = list(vector_ids)
+        if namespace is not None:
+            if namespace in self._indexes:
+                self._indexes[namespace].remove(vector_ids)
+            return
+        for index in self._indexes.values():
+            index.remove(vector_ids)
+
+    def reset(self, namespace: Optional[str]) -> None:
+        """Forget a namespace so it is rebuilt from scratch."""
+        self._indexes.pop(namespace, None)
+
+    def is_ready(self, namespace: Optional[str]) -> bool:
+        """Whether queries in a namespace can use the first stage."""
+        index = self._indexes.get(namespace)
+        return index is not None and index.ready
+
+    def candidates(
+        self, query_vector: Sequence[float], top_k: int, namespace: Optional[str] = None
+    ) -> Optional[List[str]]:
+        """First-stage candidates to rerank for a top-k query.
+
+        Returns:
+            Candidate IDs, or None when the namespace cannot be served
+        """
+        index = self._indexes.get(namespace)
+        if index is None or not index.ready:
+            return None
+        multiplier = self.settings_for(namespace).candidate_multiplier
+        query = prepare_vectors(query_vector, self.metric)[0]
+        return index.search(query, top_k * multiplier)
+
+    def stats(self) -> Dict[Optional[str], Dict[str, Any]]:
+        """Per-namespace index statistics."""
+        return {namespace: index.stats() for namespace, index in self._indexes.items()}
+
+
+def sweep_reduced_search(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    top_k: int = 10,
+    dimensions: Sequence[int] = (64, 128, 256, 512),
+    multipliers: Sequence[int] = (2, 4, 8, 16),
+    method: str = "pca",
+    metric: str = "cosine",
+    fit_size: int = 4096,
+) -> List[Dict[str, Any]]:
+    """Measure recall and latency of two-stage search against exact search.
+
+    Every combination of target dimension and candidate multiplier is run
+    over all queries, with reranking against the in-memory full vectors.
+    The first row is the exact full-dimension baseline.
+
+    Returns:
+        One row per setting with recall@top_k and mean latencies in ms
+    """
+    base = prepare_vectors(vectors, metric)
+    prepared_queries = prepare_vectors(queries, metric)
+    largest = metric != "euclidean"
+    ids = [str(i) for i in range(len(base))]
+    full = VectorMatrix(base)
+    # Cache the norms before anything is timed
+    full.norms
+
+    started = time.perf_counter()
+    truth = [
+        set(select_top(full.scores(query, metric)[0], top_k, largest).tolist())
+        for query in prepared_queries
+    ]
+    exact_ms = (time.perf_counter() - started) * 1000 / len(prepared_queries)
+    report = [
+        {
+            "method": "exact",
+            "dimension": base.shape[1],
+            "candidate_multiplier": None,
+            "recall": 1.0,
+            "first_stage_ms": exact_ms,
+            "rerank_ms": 0.0,
+            "total_ms": exact_ms,
+            "speedup": 1.0,
+        }
+    ]
+
+    for dimension in dimensions:
+        if dimension >= base.shape[1]:
+            continue
+        index = NamespaceReducedIndex(method, dimension, metric, fit_size=len(base) + 1)
+        if method == "pca":
+            sample = base[np.random.default_rng(0).permutation(len(base))[:fit_size]]
+            index.fit(sample)
+        index.add(ids, base)
+
+        for multiplier in multipliers:
+            hits = 0
+            first_stage = rerank = 0.0
+            for query, expected in zip(prepared_queries, truth):
+                started = time.perf_counter()
+                candidates = index.search(query, top_k * multiplier)
+                checkpoint = time.perf_counter()
+                rows = np.array([int(c) for c in candidates], dtype=np.intp)
+                best = rows[select_top(exact_scores(query, base[rows], metric), top_k, largest)]
+                finished = time.perf_counter()
+                first_stage += checkpoint - started
+                rerank += finished - checkpoint
+                hits += len(expected.intersection(best.tolist()))
+
+            count = len(prepared_queries)
+            total_ms = (first_stage + rerank) * 1000 / count
+            report.append(
+                {
+                    "method": method,
+                    "dimension": index.stats()["dimension"],
+                    "candidate_multiplier": multiplier,
+                    "recall": hits / (count * top_k),
+                    "first_stage_ms": first_stage * 1000 / count,
+                    "rerank_ms": rerank * 1000 / count,
+                    "total_ms": total_ms,
+                    "speedup": exact_ms / total_ms if total_ms else None,
+                }
+            )
+    return report
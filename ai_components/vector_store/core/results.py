@@ -0,0 +1,353 @@
+"""Array-backed query results for ANFL Vector Store.
+
+A ``QueryResultSet`` keeps ids, scores and vectors of a result page in numpy
+arrays and the metadata as the raw dicts returned by the backend. Rows are
+light ``__slots__`` views; ``VectorMetadata`` and ``QueryResult`` models are
+only built when a caller asks for them. ``to_json`` and ``to_bytes``
+serialize straight from the arrays.
+"""
+
+import base64
+import json
+import math
+import struct
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .base import QueryResult, VectorMetadata
+
+# Magic, version, flags, row count, dimension
+_HEADER = struct.Struct("<4sBBII")
+_MAGIC = b"ANQR"
+_VERSION = 1
+_FLAG_VECTORS = 1
+_FLAG_METADATA = 2
+
+
+@lru_cache(maxsize=16)
+def _number_format(count: int) -> str:
+    """Format string for ``count`` comma-separated float32 values."""
+    # Nine significant digits round-trip any float32
+    return ",".join(["%.9g"] * count)
+
+
+def _format_numbers(values: np.ndarray) -> str:
+    """Format a float array as comma-separated JSON numbers in one pass.
+
+    NaN and infinities have no JSON form and are written as null.
+    """
+    if np.isfinite(values).all():
+        return _number_format(values.size) % tuple(values.ravel().tolist())
+    return ",".join(
+        "%.9g" % value if math.isfinite(value) else "null" for value in values.ravel().tolist()
+    )
+
+
+class ResultRow:
+    """View of one row of a ``QueryResultSet``."""
+
+    __slots__ = ("_results", "_index")
+
+    def __init__(self, results: "QueryResultSet", index: int):
+        self._results = results
+        self._index = index
+
+    @property
+    def vector_id(self) -> str:
+        return self._results.ids[self._index]
+
+    @property
+    def score(self) -> float:
+        return float(self._results.scores[self._index])
+
+    @property
+    def vector(self) -> Optional[np.ndarray]:
+        """Row of the vector block, without copying."""
+        if self._results.vectors is None:
+            return None
+        return self._results.vectors[self._index]
+
+    @property
+    def raw_metadata(self) -> Optional[Dict[str, Any]]:
+        if self._results.raw_metadata is None:
+            return None
+        return self._results.raw_metadata[self._index]
+
+    @property
+    def metadata(self) -> Optional[VectorMetadata]:
+        """Metadata model, parsed on first access."""
+        return self._results.metadata_at(self._index)
+
+    def to_model(self) -> QueryResult:
+        """Build the pydantic result for this row."""
+        vector = self.vector
+        return QueryResult(
+            vector_id=self.vector_id,
+            score=self.score,
+            metadata=self.metadata,
+            vector=vector.tolist() if vector is not None else None,
+        )
+
+    def __repr__(self) -> str:
+        return f"ResultRow(vector_id={self.vector_id!r}, score={self.score:.6g})"
+
+
+class QueryResultSet:
+    """Query results stored column-wise in numpy arrays."""
+
+    __slots__ = ("ids", "scores", "vectors", "raw_metadata", "namespace", "_metadata")
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        scores: Union[Sequence[float], np.ndarray],
+        vectors: Optional[np.ndarray] = None,
+        raw_metadata: Optional[List[Optional[Dict[str, Any]]]] = None,
+        namespace: Optional[str] = None,
+    ):
+        """Initialize a result set.
+
+        Args:
+            ids: Vector IDs in rank order
+            scores: Score per row
+            vectors: Optional (rows, dimension) vector block
+            raw_metadata: Optional backend metadata dict per row
+            namespace: Namespace the results came from
+        """
+        self.ids = list(ids)
+        self.scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+        self.vectors = vectors
+        self.raw_metadata = raw_metadata
+        self.namespace = namespace
+        self._metadata: Dict[int, Optional[VectorMetadata]] = {}
+        if len(self.scores) != len(self.ids):
+            raise ValueError("ids and scores must have the same length")
+        if vectors is not None and len(vectors) != len(self.ids):
+            raise ValueError("vectors must have one row per id")
+
+    @classmethod
+    def empty(cls, namespace: Optional[str] = None) -> "QueryResultSet":
+        """Result set without rows."""
+        return cls([], np.empty(0, dtype=np.float32), namespace=namespace)
+
+    @classmethod
+    def from_matches(
+        cls,
+        matches: Iterable[Dict[str, Any]],
+        namespace: Optional[str],
+        include_vectors: bool,
+        include_metadata: bool,
+    ) -> "QueryResultSet":
+        """Build a result set from Pinecone matches."""
+        matches = list(matches)
+        ids = [match["id"] for match in matches]
+        scores = np.fromiter((match["score"] for match in matches), np.float32, len(matches))
+        vectors = None
+        if include_vectors:
+            values = [match.get("values") for match in matches]
+            if all(v is not None for v in values):
+                vectors = np.asarray(values, dtype=np.float32)
+                if not len(matches):
+                    vectors = vectors.reshape(0, 0)
+        raw_metadata = None
+        if include_metadata:
+            raw_metadata = [match.get("metadata") or None for match in matches]
+        return cls(ids, scores, vectors, raw_metadata, namespace)
+
+    @classmethod
+    def concat(cls, result_sets: Sequence["QueryResultSet"]) -> "QueryResultSet":
+        """Join result sets row-wise, e.g. the pages of several shards."""
+        if not result_sets:
+            return cls.empty()
+        if len(result_sets) == 1:
+            return result_sets[0]
+        vectors = None
+        if all(r.vectors is not None for r in result_sets):
+            blocks = [r.vectors for r in result_sets if len(r)]
+            if blocks:
+                vectors = np.concatenate(blocks)
+        raw_metadata = None
+        if all(r.raw_metadata is not None for r in result_sets):
+            raw_metadata = [m for r in result_sets for m in r.raw_metadata]
+        return cls(
+            [vector_id for r in result_sets for vector_id in r.ids],
+            np.concatenate([r.scores for r in result_sets]),
+            vectors,
+            raw_metadata,
+            result_sets[0].namespace,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __bool__(self) -> bool:
+        return bool(self.ids)
+
+    def __iter__(self) -> Iterator[ResultRow]:
+        for index in range(len(self.ids)):
+            yield ResultRow(self, index)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[ResultRow, "QueryResultSet"]:
+        if isinstance(key, slice):
+            # Basic slicing keeps the vector block a view
+            return QueryResultSet(
+                self.ids[key],
+                self.scores[key],
+                self.vectors[key] if self.vectors is not None else None,
+                self.raw_metadata[key] if self.raw_metadata is not None else None,
+                self.namespace,
+            )
+        if key < 0:
+            key += len(self.ids)
+        if not 0 <= key < len(self.ids):
+            raise IndexError("result index out of range")
+        return ResultRow(self, key)
+
+    def __repr__(self) -> str:
+        return f"QueryResultSet(rows={len(self)}, namespace={self.namespace!r})"
+
+    def take(self, indices: Union[Sequence[int], np.ndarray]) -> "QueryResultSet":
+        """New result set with the given rows, in the given order."""
+        indices = np.asarray(indices, dtype=np.intp)
+        taken = QueryResultSet(
+            [self.ids[i] for i in indices],
+            self.scores[indices],
+            self.vectors[indices] if self.vectors is not None else None,
+            [self.raw_metadata[i] for i in indices] if self.raw_metadata is not None else None,
+            self.namespace,
+        )
+        for new_index, old_index in enumerate(indices.tolist()):
+            if old_index in self._metadata:
+                taken._metadata[new_index] = self._metadata[old_index]
+        return taken
+
+    def filter_ids(self, predicate: Any) -> "QueryResultSet":
+        """Keep the rows whose vector ID satisfies ``predicate``."""
+        keep = [index for index, vector_id in enumerate(self.ids) if predicate(vector_id)]
+        if len(keep) == len(self.ids):
+            return self
+        return self.take(keep)
+
+    def top(self, k: int, largest: bool = True) -> "QueryResultSet":
+        """Best ``k`` rows by score, best first."""
+        if k >= len(self.ids):
+            order = np.argsort(-self.scores if largest else self.scores, kind="stable")
+            return self.take(order)
+        keys = -self.scores if largest else self.scores
+        best = np.argpartition(keys, k)[:k]
+        return self.take(best[np.argsort(keys[best], kind="stable")])
+
+    def with_scores(self, scores: Union[Sequence[float], np.ndarray]) -> "QueryResultSet":
+        """Same rows with different scores."""
+        replaced = QueryResultSet(self.ids, scores, self.vectors, self.raw_metadata, self.namespace)
+        replaced._metadata = self._metadata
+        return replaced
+
+    def metadata_at(self, index: int) -> Optional[VectorMetadata]:
+        """Metadata model of a row, parsed once and cached."""
+        if index in self._metadata:
+            return self._metadata[index]
+        metadata = None
+        raw = self.raw_metadata[index] if self.raw_metadata is not None else None
+        if raw:
+            try:
+                metadata = VectorMetadata.parse_obj(
+                    {**raw, "vector_id": self.ids[index], "namespace": self.namespace}
+                )
+            except Exception:
+                metadata = None
+        self._metadata[index] = metadata
+        return metadata
+
+    def to_models(self) -> List[QueryResult]:
+        """Build pydantic results for every row."""
+        return [row.to_model() for row in self]
+
+    def to_json(self, include_vectors: bool = True, vector_encoding: str = "list") -> bytes:
+        """Serialize as a JSON array of results.
+
+        Scores and vectors are formatted from the arrays directly, with NaN
+        and infinities as null. With ``vector_encoding="base64"`` vectors are
+        sent as base64 little-endian float32 instead of number lists.
+        """
+        if vector_encoding not in ("list", "base64"):
+            raise ValueError(f"Unknown vector encoding: {vector_encoding}")
+        scores = _format_numbers(self.scores).split(",")
+        vectors = self.vectors if include_vectors else None
+        if vectors is not None:
+            vectors = vectors.astype("<f4", copy=False)
+
+        rows = []
+        for index, vector_id in enumerate(self.ids):
+            parts = [f'"vector_id":{json.dumps(vector_id)}', f'"score":{scores[index]}']
+            if self.raw_metadata is not None:
+                parts.append(f'"metadata":{json.dumps(self.raw_metadata[index], default=str)}')
+            if vectors is not None:
+                if vector_encoding == "base64":
+                    encoded = base64.b64encode(vectors[index].tobytes()).decode("ascii")
+                    parts.append(f'"vector":"{encoded}"')
+                else:
+                    parts.append(f'"vector":[{_format_numbers(vectors[index])}]')
+            rows.append("{" + ",".join(parts) + "}")
+        return ("[" + ",".join(rows) + "]").encode("utf-8")
+
+    def to_bytes(self) -> bytes:
+        """Serialize into a compact binary frame.
+
+        Layout: header, float32 scores, float32 vector block (if any),
+        length-prefixed UTF-8 ids, then length-prefixed JSON metadata (if
+        any). All integers and floats are little-endian.
+        """
+        flags = 0
+        dimension = 0
+        if self.vectors is not None:
+            flags |= _FLAG_VECTORS
+            dimension = self.vectors.shape[1] if self.vectors.ndim == 2 else 0
+        if self.raw_metadata is not None:
+            flags |= _FLAG_METADATA
+
+        parts = [
+            _HEADER.pack(_MAGIC, _VERSION, flags, len(self.ids), dimension),
+            self.scores.astype("<f4", copy=False).tobytes(),
+        ]
+        if self.vectors is not None:
+            parts.append(self.vectors.astype("<f4", copy=False).tobytes())
+        for vector_id in self.ids:
+            encoded = vector_id.encode("utf-8")
+            parts.append(struct.pack("<I", len(encoded)))
+            parts.append(encoded)
+        if self.raw_metadata is not None:
+            encoded = json.dumps(self.raw_metadata, default=str).encode("utf-8")
+            parts.append(struct.pack("<I", len(encoded)))
+            parts.append(encoded)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, namespace: Optional[str] = None) -> "QueryResultSet":
+        """Parse a frame written by ``to_bytes``."""
+        magic, version, flags, count, dimension = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a query result frame")
+        offset = _HEADER.size
+        scores = np.frombuffer(data, "<f4", count, offset)
+        offset += 4 * count
+        vectors = None
+        if flags & _FLAG_VECTORS:
+            vectors = np.frombuffer(data, "<f4", count * dimension, offset).reshape(
+                count, dimension
+            )
+            offset += 4 * count * dimension
+        ids = []
+        for _ in range(count):
+            (length,) = struct.unpack_from("<I", data, offset)
+            offset += 4
+            ids.append(data[offset : offset + length].decode("utf-8"))
+            offset += length
+        raw_metadata = None
+        if flags & _FLAG_METADATA:
+            (length,) = struct.unpack_from("<I", data, offset)
+            offset += 4
+            raw_metadata = json.loads(data[offset : offset + length])
+        return cls(ids, scores, vectors, raw_metadata, namespace)
@@ -12,13 +12,20 @@ CREATE TABLE IF NOT EXISTS vector_metadata (
     embedding_model TEXT,
     dimension INTEGER,
     namespace TEXT,
-    is_deleted BOOLEAN DEFAULT FALSE
+    is_deleted BOOLEAN DEFAULT FALSE,
+    purged_at TIMESTAMP WITH TIME ZONE -- set once a tombstone is removed from every layer
 );
 
+ALTER TABLE vector_metadata ADD COLUMN IF NOT EXISTS purged_at TIMESTAMP WITH TIME ZONE;
+
 -- Create index on namespace for faster queries
 CREATE INDEX IF NOT EXISTS idx_vector_metadata_namespace ON vector_metadata(namespace);
 CREATE INDEX IF NOT EXISTS idx_vector_metadata_updated ON vector_metadata(updated_at);
 
+-- Tombstones still waiting for compaction
+CREATE INDEX IF NOT EXISTS idx_vector_metadata_tombstones ON vector_metadata(updated_at)
+    WHERE is_deleted AND purged_at IS NULL;
+
 -- Cache tracking table
 CREATE TABLE IF NOT EXISTS cache_tracking (
     vector_id TEXT REFERENCES vector_metadata(vector_id),
@@ -33,17 +40,30 @@ CREATE TABLE IF NOT EXISTS cache_tracking (
 -- Create index for cache expiration queries
 CREATE INDEX IF NOT EXISTS idx_cache_tracking_expires ON cache_tracking(expires_at);
 
+-- Log tables below are range partitioned by day on their time column.
+-- Partitions are created ahead of time and dropped for retention by
+-- create_daily_partitions() / drop_expired_partitions(); the DEFAULT
+-- partition only catches rows outside the prepared range, and
+-- create_daily_partitions() moves them out when their day is created.
+--
+-- Upgrading a database whose log tables predate partitioning: this file
+-- keeps the existing unpartitioned tables (CREATE TABLE IF NOT EXISTS) and
+-- skips their DEFAULT partitions. PartitionManager.convert_legacy_tables(),
+-- run by DatabaseManager.initialize() unless
+-- partitions.convert_legacy_tables is off, converts them in place.
+
 -- Vector operations log
 CREATE TABLE IF NOT EXISTS vector_operations (
-    operation_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    operation_id UUID NOT NULL DEFAULT uuid_generate_v4(),
     vector_id TEXT REFERENCES vector_metadata(vector_id),
     operation_type TEXT NOT NULL, -- 'insert', 'update', 'delete', 'query'
     operation_time TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
     cache_layer TEXT NOT NULL,
     status TEXT NOT NULL, -- 'success', 'failure'
     error_message TEXT,
-    metadata JSONB
-);
+    metadata JSONB,
+    PRIMARY KEY (operation_id, operation_time)
+) PARTITION BY RANGE (operation_time);
 
 -- Create index for operation tracking
 CREATE INDEX IF NOT EXISTS idx_vector_operations_time ON vector_operations(operation_time);
@@ -51,7 +71,7 @@ CREATE INDEX IF NOT EXISTS idx_vector_operations_type ON vector_operations(opera
 
 -- Vector similarity queries log
 CREATE TABLE IF NOT EXISTS similarity_queries (
-    query_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    query_id UUID NOT NULL DEFAULT uuid_generate_v4(),
     query_time TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
     namespace TEXT,
     top_k INTEGER NOT NULL,
@@ -60,8 +80,9 @@ CREATE TABLE IF NOT EXISTS similarity_queries (
     execution_time_ms INTEGER,
     cache_hits JSONB, -- Track which cache layers were hit
     num_results INTEGER,
-    metadata JSONB
-);
+    metadata JSONB,
+    PRIMARY KEY (query_id, query_time)
+) PARTITION BY RANGE (query_time);
 
 -- Create index for query analysis
 CREATE INDEX IF NOT EXISTS idx_similarity_queries_time ON similarity_queries(query_time);
@@ -69,7 +90,7 @@ CREATE INDEX IF NOT EXISTS idx_similarity_queries_namespace ON similarity_querie
 
 -- Cache performance metrics
 CREATE TABLE IF NOT EXISTS cache_metrics (
-    metric_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    metric_id UUID NOT NULL DEFAULT uuid_generate_v4(),
     timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
     cache_layer TEXT NOT NULL,
     hit_count INTEGER DEFAULT 0,
@@ -78,15 +99,16 @@ CREATE TABLE IF NOT EXISTS cache_metrics (
     total_vectors INTEGER DEFAULT 0,
     total_size_bytes BIGINT DEFAULT 0,
     avg_query_time_ms FLOAT,
-    metadata JSONB
-);
+    metadata JSONB,
+    PRIMARY KEY (metric_id, timestamp)
+) PARTITION BY RANGE (timestamp);
 
 -- Create index for metrics analysis
 CREATE INDEX IF NOT EXISTS idx_cache_metrics_time ON cache_metrics(timestamp, cache_layer);
 
 -- Vector migrations log
 CREATE TABLE IF NOT EXISTS vector_migrations (
-    migration_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    migration_id UUID NOT NULL DEFAULT uuid_generate_v4(),
     vector_id TEXT REFERENCES vector_metadata(vector_id),
     source_layer TEXT NOT NULL,
     target_layer TEXT NOT NULL,
@@ -94,14 +116,182 @@ CREATE TABLE IF NOT EXISTS vector_migrations (
     reason TEXT NOT NULL, -- 'ttl_expired', 'manual', 'policy'
     status TEXT NOT NULL, -- 'success', 'failure'
     error_message TEXT,
-    metadata JSONB
-);
+    metadata JSONB,
+    PRIMARY KEY (migration_id, migration_time)
+) PARTITION BY RANGE (migration_time);
 
 -- Create index for migration tracking
 CREATE INDEX IF NOT EXISTS idx_vector_migrations_time ON vector_migrations(migration_time);
 
+-- DEFAULT partitions, only for log tables that are already partitioned
+DO $$
+DECLARE
+    parent TEXT;
+BEGIN
+    FOREACH parent IN ARRAY ARRAY[
+        'vector_operations', 'similarity_queries', 'cache_metrics', 'vector_migrations'
+    ] LOOP
+        IF (SELECT relkind FROM pg_class WHERE oid = parent::regclass) = 'p' THEN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I DEFAULT',
+                parent || '_default',
+                parent
+            );
+        END IF;
+    END LOOP;
+END;
+$$;
+
+-- Hourly and daily rollups of the log tables. Daily rollups are built from
+-- the hourly ones, so both survive retention of the raw partitions.
+CREATE TABLE IF NOT EXISTS vector_operations_hourly (
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    vector_id TEXT NOT NULL,
+    cache_layer TEXT NOT NULL,
+    operation_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    operation_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_start, vector_id, cache_layer, operation_type, status)
+);
+
+CREATE TABLE IF NOT EXISTS similarity_queries_hourly (
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    namespace TEXT NOT NULL DEFAULT '',
+    query_count BIGINT NOT NULL DEFAULT 0,
+    total_execution_time_ms BIGINT NOT NULL DEFAULT 0,
+    max_execution_time_ms INTEGER,
+    total_results BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_start, namespace)
+);
+
+CREATE TABLE IF NOT EXISTS cache_metrics_hourly (
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    cache_layer TEXT NOT NULL,
+    hit_count BIGINT NOT NULL DEFAULT 0,
+    miss_count BIGINT NOT NULL DEFAULT 0,
+    eviction_count BIGINT NOT NULL DEFAULT 0,
+    max_total_vectors INTEGER,
+    max_total_size_bytes BIGINT,
+    total_query_time_ms FLOAT NOT NULL DEFAULT 0,
+    samples BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_start, cache_layer)
+);
+
+CREATE TABLE IF NOT EXISTS vector_migrations_hourly (
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    source_layer TEXT NOT NULL,
+    target_layer TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    status TEXT NOT NULL,
+    migration_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_start, source_layer, target_layer, reason, status)
+);
+
+CREATE TABLE IF NOT EXISTS vector_operations_daily (LIKE vector_operations_hourly INCLUDING ALL);
+CREATE TABLE IF NOT EXISTS similarity_queries_daily (LIKE similarity_queries_hourly INCLUDING ALL);
+CREATE TABLE IF NOT EXISTS cache_metrics_daily (LIKE cache_metrics_hourly INCLUDING ALL);
+CREATE TABLE IF NOT EXISTS vector_migrations_daily (LIKE vector_migrations_hourly INCLUDING ALL);
+
+-- Rollup watermarks: everything before rolled_up_to has been aggregated
+CREATE TABLE IF NOT EXISTS log_rollup_state (
+    rollup_name TEXT PRIMARY KEY,
+    rolled_up_to TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
 -- Functions
 
+-- Create one partition per UTC day in [from_day, to_day] for a log table.
+-- Rows already caught by the DEFAULT partition for a new day are moved
+-- into it: PostgreSQL refuses to add a partition whose range the DEFAULT
+-- partition holds rows for, so DEFAULT is detached for the move and
+-- attached again. DETACH locks the parent until the transaction ends, so
+-- concurrent inserts wait rather than fail.
+CREATE OR REPLACE FUNCTION create_daily_partitions(
+    parent TEXT,
+    from_day DATE,
+    to_day DATE
+)
+RETURNS INTEGER AS $$
+DECLARE
+    day DATE := from_day;
+    partition_name TEXT;
+    default_name TEXT := parent || '_default';
+    key_column TEXT;
+    day_start TIMESTAMP WITH TIME ZONE;
+    day_end TIMESTAMP WITH TIME ZONE;
+    has_rows BOOLEAN;
+    created INTEGER := 0;
+BEGIN
+    -- Already quoted by pg_get_partkeydef, hence %s rather than %I below
+    key_column := substring(pg_get_partkeydef(parent::regclass) from '\((.*)\)');
+    WHILE day <= to_day LOOP
+        partition_name := parent || '_p' || to_char(day, 'YYYYMMDD');
+        IF to_regclass(partition_name) IS NULL THEN
+            day_start := day::timestamp AT TIME ZONE 'UTC';
+            day_end := (day + 1)::timestamp AT TIME ZONE 'UTC';
+            has_rows := FALSE;
+            IF to_regclass(default_name) IS NOT NULL THEN
+                EXECUTE format(
+                    'SELECT EXISTS (SELECT 1 FROM %I WHERE %s >= %L AND %s < %L)',
+                    default_name, key_column, day_start, key_column, day_end
+                ) INTO has_rows;
+            END IF;
+
+            IF has_rows THEN
+                EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', parent, default_name);
+            END IF;
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                parent,
+                day_start,
+                day_end
+            );
+            IF has_rows THEN
+                -- The rows were counted by the access trigger when first inserted
+                EXECUTE format('ALTER TABLE %I DISABLE TRIGGER USER', partition_name);
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM %I WHERE %s >= %L AND %s < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    default_name, key_column, day_start, key_column, day_end, partition_name
+                );
+                EXECUTE format('ALTER TABLE %I ENABLE TRIGGER USER', partition_name);
+                EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I DEFAULT', parent, default_name);
+            END IF;
+            created := created + 1;
+        END IF;
+        day := day + 1;
+    END LOOP;
+    RETURN created;
+END;
+$$ language 'plpgsql';
+
+-- Drop whole daily partitions of a log table that ended before cutoff_day
+CREATE OR REPLACE FUNCTION drop_expired_partitions(
+    parent TEXT,
+    cutoff_day DATE
+)
+RETURNS INTEGER AS $$
+DECLARE
+    child RECORD;
+    dropped INTEGER := 0;
+BEGIN
+    FOR child IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = parent::regclass
+        AND c.relname ~ ('^' || parent || '_p[0-9]{8}$')
+    LOOP
+        IF to_date(right(child.relname, 8), 'YYYYMMDD') < cutoff_day THEN
+            EXECUTE format('DROP TABLE IF EXISTS %I', child.relname);
+            dropped := dropped + 1;
+        END IF;
+    END LOOP;
+    RETURN dropped;
+END;
+$$ language 'plpgsql';
+
 -- Update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -112,7 +302,7 @@ END;
 $$ language 'plpgsql';
 
 -- Create trigger for vector_metadata
-CREATE TRIGGER update_vector_metadata_modtime
+CREATE OR REPLACE TRIGGER update_vector_metadata_modtime
     BEFORE UPDATE ON vector_metadata
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
@@ -131,7 +321,7 @@ END;
 $$ language 'plpgsql';
 
 -- Create trigger for cache tracking
-CREATE TRIGGER update_cache_access_trigger
+CREATE OR REPLACE TRIGGER update_cache_access_trigger
     AFTER INSERT ON vector_operations
     FOR EACH ROW
     WHEN (NEW.operation_type = 'query')
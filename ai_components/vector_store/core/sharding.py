@@ -0,0 +1,542 @@
+"""Consistent-hash sharding for the ANFL Vector Store hot and cold tiers."""
+
+import asyncio
+import bisect
+import hashlib
+import logging
+from functools import partial
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import aioredis
+import pinecone
+
+from .base import QueryResult, VectorMetadata, hot_cache_key
+from .config import PineconeConfig, RedisConfig, ShardingConfig
+from .exceptions import ColdStorageError, HotCacheError, StorageLayerUnavailableError
+from .results import QueryResultSet
+
+logger = logging.getLogger(__name__)
+
+
+def ring_hash(key: str) -> int:
+    """Hash a key onto the 64-bit ring."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def redis_node_name(config: RedisConfig) -> str:
+    """Stable ring name for a Redis node."""
+    return f"{config.host}:{config.port}/{config.db}"
+
+
+def pinecone_node_name(config: PineconeConfig) -> str:
+    """Stable ring name for a Pinecone index."""
+    return config.index_name
+
+
+class HashRing:
+    """Consistent hash ring with weighted virtual nodes.
+
+    Each node gets ``virtual_nodes * weight`` points on the ring, so adding
+    or removing a node only moves the keys adjacent to its points.
+    """
+
+    def __init__(self, nodes: Optional[Dict[str, int]] = None, virtual_nodes: int = 128):
+        """Initialize the ring.
+
+        Args:
+            nodes: Mapping of node name to weight
+            virtual_nodes: Ring points per unit of weight
+        """
+        self.virtual_nodes = virtual_nodes
+        self._weights: Dict[str, int] = dict(nodes or {})
+        self._hashes: List[int] = []
+        self._owners: List[str] = []
+        self._rebuild()
+
+    @property
+    def nodes(self) -> Dict[str, int]:
+        """Node names and weights on the ring."""
+        return dict(self._weights)
+
+    def add_node(self, name: str, weight: int = 1) -> None:
+        """Add or reweight a node."""
+        self._weights[name] = weight
+        self._rebuild()
+
+    def remove_node(self, name: str) -> None:
+        """Remove a node from the ring."""
+        self._weights.pop(name, None)
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        """Recompute the sorted ring points."""
+        points = sorted(
+            (ring_hash(f"{name}#{i}"), name)
+            for name, weight in self._weights.items()
+            for i in range(self.virtual_nodes * max(weight, 0))
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [name for _, name in points]
+
+    def get_node(self, key: str) -> str:
+        """Get the node that owns a key."""
+        if not self._hashes:
+            raise StorageLayerUnavailableError("shard_ring", "No shards on the hash ring")
+        index = bisect.bisect(self._hashes, ring_hash(key))
+        if index == len(self._hashes):
+            index = 0
+        return self._owners[index]
+
+
+class ShardedTier:
+    """Clients of one storage tier placed on a hash ring.
+
+    While a rebalance is running, ``previous_ring`` holds the old layout so
+    reads can fall back to the old owner of keys that have not moved yet.
+    """
+
+    def __init__(self, name: str, virtual_nodes: int):
+        """Initialize the tier.
+
+        Args:
+            name: Tier name used in errors
+            virtual_nodes: Ring points per unit of weight
+        """
+        self.name = name
+        self.ring = HashRing(virtual_nodes=virtual_nodes)
+        self.previous_ring: Optional[HashRing] = None
+        # Nodes of previous_ring to disconnect once a rebalance completes
+        self.retiring: List[str] = []
+        self.clients: Dict[str, Any] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any shards are configured."""
+        return bool(self.clients)
+
+    def client_for(self, key: str) -> Any:
+        """Client that owns a key for writes."""
+        return self.clients[self.ring.get_node(key)]
+
+    def read_clients(self, key: str) -> List[Any]:
+        """Clients to read a key from, current owner first."""
+        owner = self.ring.get_node(key)
+        clients = [self.clients[owner]]
+        if self.previous_ring is not None:
+            previous = self.previous_ring.get_node(key)
+            if previous != owner:
+                clients.append(self.clients[previous])
+        return clients
+
+
+def to_query_result(
+    match: Dict[str, Any], namespace: Optional[str], include_vectors: bool, include_metadata: bool
+) -> QueryResult:
+    """Convert a Pinecone match into a query result."""
+    metadata = None
+    raw = match.get("metadata")
+    if include_metadata and raw:
+        try:
+            metadata = VectorMetadata.parse_obj(
+                {**raw, "vector_id": match["id"], "namespace": namespace}
+            )
+        except Exception:
+            metadata = None
+    return QueryResult(
+        vector_id=match["id"],
+        score=match["score"],
+        metadata=metadata,
+        vector=match.get("values") if include_vectors else None,
+    )
+
+
+async def query_pinecone_index(
+    index: Any,
+    query_vector: List[float],
+    top_k: int,
+    namespace: Optional[str] = None,
+    include_vectors: bool = False,
+    include_metadata: bool = True,
+    filter_criteria: Optional[Dict[str, Any]] = None,
+) -> QueryResultSet:
+    """Query one Pinecone index without blocking the event loop."""
+    try:
+        response = await asyncio.get_running_loop().run_in_executor(
+            None,
+            partial(
+                index.query,
+                vector=query_vector,
+                top_k=top_k,
+                namespace=namespace,
+                include_values=include_vectors,
+                include_metadata=include_metadata,
+                filter=filter_criteria,
+            ),
+        )
+    except Exception as e:
+        raise ColdStorageError("Failed to query cold storage", "query", {"error": str(e)})
+
+    return QueryResultSet.from_matches(
+        response["matches"], namespace, include_vectors, include_metadata
+    )
+
+
+def merge_top_k(
+    result_sets: List[QueryResultSet], top_k: int, metric: str = "cosine"
+) -> QueryResultSet:
+    """Merge per-shard results into a global top-k."""
+    return QueryResultSet.concat(result_sets).top(top_k, largest=metric != "euclidean")
+
+
+class ShardManager:
+    """Maps namespaces or vector ids onto sharded Redis and Pinecone targets."""
+
+    def __init__(
+        self,
+        config: ShardingConfig,
+        metric: str = "cosine",
+        pinecone_config: Optional[PineconeConfig] = None,
+    ):
+        """Initialize shard manager.
+
+        Args:
+            config: Sharding configuration
+            metric: Distance metric of the Pinecone indexes
+            pinecone_config: Configuration ``pinecone.init`` was called with;
+                Pinecone shards must use the same API key and environment
+        """
+        self.config = config
+        self.metric = metric
+        self.pinecone_config = pinecone_config
+        self.redis = ShardedTier("hot_cache", config.virtual_nodes)
+        self.pinecone = ShardedTier("cold_storage", config.virtual_nodes)
+        self._query_slots = asyncio.Semaphore(config.max_concurrent_shards)
+
+    async def initialize(self) -> None:
+        """Connect to every configured shard."""
+        for redis_config in self.config.redis_shards:
+            name = await self._connect_redis(redis_config)
+            self.redis.ring.add_node(name, redis_config.weight)
+        for pinecone_config in self.config.pinecone_shards:
+            name = await self._connect_pinecone(pinecone_config)
+            self.pinecone.ring.add_node(name, pinecone_config.weight)
+        logger.info(
+            f"Shard manager initialized: {len(self.redis.clients)} redis, "
+            f"{len(self.pinecone.clients)} pinecone shards"
+        )
+
+    async def close(self) -> None:
+        """Close all shard connections."""
+        for client in self.redis.clients.values():
+            client.close()
+            await client.wait_closed()
+        self.redis.clients.clear()
+        self.pinecone.clients.clear()
+
+    async def _connect_redis(self, redis_config: RedisConfig) -> str:
+        """Connect a Redis node if needed and return its ring name."""
+        name = redis_node_name(redis_config)
+        if name not in self.redis.clients:
+            self.redis.clients[name] = await aioredis.create_redis_pool(
+                f"redis://{redis_config.host}:{redis_config.port}",
+                db=redis_config.db,
+                password=redis_config.password,
+                encoding="utf-8",
+            )
+        return name
+
+    async def _connect_pinecone(self, pinecone_config: PineconeConfig) -> str:
+        """Open a Pinecone index if needed and return its ring name.
+
+        The Pinecone client holds one API key and environment per process,
+        so shards configured with different ones are rejected rather than
+        silently opened with the global credentials.
+        """
+        name = pinecone_node_name(pinecone_config)
+        primary = self.pinecone_config
+        if primary is not None and (
+            pinecone_config.api_key != primary.api_key
+            or pinecone_config.environment != primary.environment
+        ):
+            raise StorageLayerUnavailableError(
+                self.pinecone.name,
+                f"Pinecone shard {name} must use the API key and environment of the main index",
+                {"shard": name, "environment": pinecone_config.environment},
+            )
+        if name not in self.pinecone.clients:
+            self.pinecone.clients[name] = pinecone.Index(pinecone_config.index_name)
+        return name
+
+    def shard_key(self, vector_id: str, namespace: Optional[str] = None) -> str:
+        """Key hashed onto the ring for a vector."""
+        if self.config.shard_key == "vector_id":
+            return vector_id
+        return namespace or ""
+
+    def redis_for(self, vector_id: str, namespace: Optional[str] = None) -> Any:
+        """Redis client that owns a vector."""
+        return self.redis.client_for(self.shard_key(vector_id, namespace))
+
+    def redis_read_order(self, vector_id: str, namespace: Optional[str] = None) -> List[Any]:
+        """Redis clients to read a vector from, current owner first."""
+        return self.redis.read_clients(self.shard_key(vector_id, namespace))
+
+    def pinecone_for(self, vector_id: str, namespace: Optional[str] = None) -> Any:
+        """Pinecone index that owns a vector."""
+        return self.pinecone.client_for(self.shard_key(vector_id, namespace))
+
+    def pinecone_read_order(self, vector_id: str, namespace: Optional[str] = None) -> List[Any]:
+        """Pinecone indexes to read a vector from, current owner first."""
+        return self.pinecone.read_clients(self.shard_key(vector_id, namespace))
+
+    async def query_similar(
+        self,
+        query_vector: List[float],
+        top_k: int = 5,
+        namespace: Optional[str] = None,
+        include_vectors: bool = False,
+        include_metadata: bool = True,
+        filter_criteria: Optional[Dict[str, Any]] = None,
+    ) -> QueryResultSet:
+        """Query the shards that may hold matches and merge a global top-k.
+
+        With namespace sharding only the owning index is queried (plus its
+        previous owner during a rebalance); otherwise every index is queried
+        concurrently and each returns its local top-k.
+        """
+        if self.config.shard_key == "namespace":
+            indexes = self.pinecone.read_clients(namespace or "")
+        else:
+            indexes = list(self.pinecone.clients.values())
+
+        async def query_shard(index: Any) -> QueryResultSet:
+            async with self._query_slots:
+                return await query_pinecone_index(
+                    index,
+                    query_vector,
+                    top_k,
+                    namespace,
+                    include_vectors,
+                    include_metadata,
+                    filter_criteria,
+                )
+
+        result_sets = await asyncio.gather(*(query_shard(index) for index in indexes))
+        return merge_top_k(list(result_sets), top_k, self.metric)
+
+    async def rebalance(
+        self,
+        keys: AsyncIterator[Tuple[str, Optional[str]]],
+        redis_shards: Optional[List[RedisConfig]] = None,
+        pinecone_shards: Optional[List[PineconeConfig]] = None,
+        batch_size: int = 100,
+    ) -> Dict[str, int]:
+        """Switch to a new shard layout and move only the affected keys.
+
+        Writes go to the new owners as soon as this starts; reads fall back
+        to the previous owner until the key has been moved. If moving fails,
+        reads keep falling back until ``resume_rebalance`` finishes the move
+        or ``abort_rebalance`` restores the previous layout.
+
+        Args:
+            keys: Async iterator of (vector_id, namespace) for stored vectors
+            redis_shards: New Redis node list, if it changes
+            pinecone_shards: New Pinecone index list, if it changes
+            batch_size: Vectors moved per backend call
+
+        Returns:
+            Number of vectors moved per tier
+        """
+        swapped: List[ShardedTier] = []
+        try:
+            if redis_shards is not None:
+                await self._swap_ring(self.redis, redis_shards, self._connect_redis)
+                swapped.append(self.redis)
+            if pinecone_shards is not None:
+                await self._swap_ring(self.pinecone, pinecone_shards, self._connect_pinecone)
+                swapped.append(self.pinecone)
+        except Exception:
+            # Nothing has moved yet, so the previous layout is still complete
+            for tier in swapped:
+                added = [name for name in tier.ring.nodes if name not in tier.previous_ring.nodes]
+                tier.ring, tier.previous_ring, tier.retiring = tier.previous_ring, None, []
+                await self._disconnect(tier, added)
+            raise
+        return await self._move_keys(keys, batch_size)
+
+    async def resume_rebalance(
+        self, keys: AsyncIterator[Tuple[str, Optional[str]]], batch_size: int = 100
+    ) -> Dict[str, int]:
+        """Finish a rebalance that failed part way through.
+
+        Args:
+            keys: Async iterator of (vector_id, namespace) for stored vectors
+            batch_size: Vectors moved per backend call
+
+        Returns:
+            Number of vectors moved per tier
+        """
+        return await self._move_keys(keys, batch_size)
+
+    async def abort_rebalance(
+        self, keys: AsyncIterator[Tuple[str, Optional[str]]], batch_size: int = 100
+    ) -> Dict[str, int]:
+        """Return to the layout before a failed rebalance.
+
+        Keys already moved, and keys written since the rebalance started,
+        are moved back to their previous owners.
+
+        Args:
+            keys: Async iterator of (vector_id, namespace) for stored vectors
+            batch_size: Vectors moved per backend call
+
+        Returns:
+            Number of vectors moved back per tier
+        """
+        for tier in (self.redis, self.pinecone):
+            if tier.previous_ring is not None:
+                added = [name for name in tier.ring.nodes if name not in tier.previous_ring.nodes]
+                tier.ring, tier.previous_ring, tier.retiring = tier.previous_ring, tier.ring, added
+        return await self._move_keys(keys, batch_size)
+
+    async def _move_keys(
+        self, keys: AsyncIterator[Tuple[str, Optional[str]]], batch_size: int
+    ) -> Dict[str, int]:
+        """Move keys from the previous owners to the current ones, then drop the previous rings."""
+        moved = {"hot_cache": 0, "cold_storage": 0}
+        pending: Dict[Tuple[str, str, str, Optional[str]], List[str]] = {}
+        try:
+            async for vector_id, namespace in keys:
+                key = self.shard_key(vector_id, namespace)
+                for tier in (self.redis, self.pinecone):
+                    if tier.previous_ring is None:
+                        continue
+                    source = tier.previous_ring.get_node(key)
+                    target = tier.ring.get_node(key)
+                    if source == target:
+                        continue
+                    batch = pending.setdefault((tier.name, source, target, namespace), [])
+                    batch.append(vector_id)
+                    if len(batch) >= batch_size:
+                        moved[tier.name] += await self._move(
+                            tier.name, source, target, namespace, batch
+                        )
+                        pending.pop((tier.name, source, target, namespace))
+
+            for (tier_name, source, target, namespace), batch in pending.items():
+                moved[tier_name] += await self._move(tier_name, source, target, namespace, batch)
+        except Exception as e:
+            logger.error(
+                f"Shard rebalance failed, previous layout kept for reads until "
+                f"resume_rebalance or abort_rebalance: {str(e)}"
+            )
+            raise
+
+        for tier in (self.redis, self.pinecone):
+            tier.previous_ring = None
+            retiring, tier.retiring = tier.retiring, []
+            await self._disconnect(tier, retiring)
+
+        logger.info(f"Shard rebalance complete: {moved}")
+        return moved
+
+    async def _disconnect(self, tier: ShardedTier, names: List[str]) -> None:
+        """Close and forget the clients of nodes no longer on the ring."""
+        for name in names:
+            client = tier.clients.pop(name)
+            if tier is self.redis:
+                client.close()
+                await client.wait_closed()
+
+    async def _swap_ring(self, tier: ShardedTier, shards: List[Any], connect) -> None:
+        """Install a new ring for a tier, keeping the old one for reads."""
+        if tier.previous_ring is not None:
+            raise StorageLayerUnavailableError(
+                tier.name,
+                f"Rebalance already in progress for {tier.name}; " "resume or abort it first",
+            )
+        if not tier.ring.nodes:
+            raise StorageLayerUnavailableError(
+                tier.name, f"No current shards for {tier.name}; configure the initial layout first"
+            )
+        weights = {}
+        for shard in shards:
+            weights[await connect(shard)] = shard.weight
+
+        tier.previous_ring = tier.ring
+        tier.ring = HashRing(weights, self.config.virtual_nodes)
+        tier.retiring = [name for name in tier.previous_ring.nodes if name not in weights]
+
+    async def _move(
+        self,
+        tier_name: str,
+        source: str,
+        target: str,
+        namespace: Optional[str],
+        vector_ids: List[str],
+    ) -> int:
+        """Move a batch of vectors between two shards of a tier."""
+        if tier_name == "hot_cache":
+            return await self._move_redis(source, target, namespace, vector_ids)
+        return await self._move_pinecone(source, target, namespace, vector_ids)
+
+    async def _move_redis(
+        self, source: str, target: str, namespace: Optional[str], vector_ids: List[str]
+    ) -> int:
+        """Copy cached vectors with their TTL to the new node, then drop them."""
+        src = self.redis.clients[source]
+        dst = self.redis.clients[target]
+        keys = [hot_cache_key(vector_id, namespace) for vector_id in vector_ids]
+        try:
+            dumps = await asyncio.gather(
+                *(src.execute(b"DUMP", key, encoding=None) for key in keys)
+            )
+            ttls = await asyncio.gather(*(src.pttl(key) for key in keys))
+            present = [
+                (key, dump, max(ttl, 0))
+                for key, dump, ttl in zip(keys, dumps, ttls)
+                if dump is not None
+            ]
+            await asyncio.gather(
+                *(dst.execute(b"RESTORE", key, ttl, dump, b"REPLACE") for key, dump, ttl in present)
+            )
+            if present:
+                await src.delete(*(key for key, _, _ in present))
+            return len(present)
+        except Exception as e:
+            raise HotCacheError(
+                "Failed to move vectors between shards",
+                "rebalance",
+                {"source": source, "target": target, "error": str(e)},
+            )
+
+    async def _move_pinecone(
+        self, source: str, target: str, namespace: Optional[str], vector_ids: List[str]
+    ) -> int:
+        """Fetch vectors from the old index, upsert into the new one, then delete."""
+        src = self.pinecone.clients[source]
+        dst = self.pinecone.clients[target]
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(
+                None, partial(src.fetch, ids=vector_ids, namespace=namespace)
+            )
+            vectors = [
+                (vector["id"], vector["values"], vector.get("metadata") or {})
+                for vector in response["vectors"].values()
+            ]
+            if vectors:
+                await loop.run_in_executor(
+                    None, partial(dst.upsert, vectors=vectors, namespace=namespace)
+                )
+                await loop.run_in_executor(
+                    None, partial(src.delete, ids=[v[0] for v in vectors], namespace=namespace)
+                )
+            return len(vectors)
+        except Exception as e:
+            raise ColdStorageError(
+                "Failed to move vectors between shards",
+                "rebalance",
+                {"source": source, "target": target, "error": str(e)},
+            )
@@ -0,0 +1,188 @@
+"""Request coalescing for ANFL Vector Store reads.
+
+``SingleFlight`` runs one call per key at a time and hands its result, or
+its exception, to every coroutine that asked for the same key meanwhile.
+``BatchCoalescer`` does the same per id for multi-id reads: ids requested
+within ``window_ms`` of each other are fetched in one backend call, and ids
+already being fetched are joined instead of fetched again.
+
+Waiters share the returned objects, so callers must not mutate them. A
+cancelled waiter never cancels the shared call.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Result of an id the backend did not return
+_MISSING = object()
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    """Mark a shared future's exception as retrieved if every waiter left."""
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls with the same key."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.stats: Dict[str, int] = {"calls": 0, "deduplicated": 0}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``call`` unless a call for ``key`` is already running, then share its outcome."""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["deduplicated"] += 1
+            return await asyncio.shield(future)
+
+        self.stats["calls"] += 1
+        future = asyncio.ensure_future(call())
+        future.add_done_callback(_consume_exception)
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._forget(key, future))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+
+class _PendingGroup:
+    """Ids of one namespace waiting for, or in, a backend call."""
+
+    __slots__ = ("pending", "inflight", "timer")
+
+    def __init__(self):
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class BatchCoalescer:
+    """Merges overlapping multi-id reads into batched backend calls."""
+
+    def __init__(
+        self,
+        fetch: Callable[[List[str], Optional[str]], Awaitable[Dict[str, Any]]],
+        window_ms: float = 0.0,
+        max_batch: int = 1000,
+    ):
+        """Initialize coalescer.
+
+        Args:
+            fetch: Batch read returning a mapping of the ids it found
+            window_ms: How long new ids wait for others to join their batch;
+                0 still merges ids requested in the same event loop pass
+            max_batch: Ids per backend call
+        """
+        self._fetch = fetch
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self._groups: Dict[Optional[str], _PendingGroup] = {}
+        # The loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats: Dict[str, int] = {
+            "requested": 0,
+            "deduplicated": 0,
+            "calls": 0,
+            "fetched": 0,
+        }
+
+    async def get_many(
+        self, vector_ids: Iterable[str], namespace: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Read ids through the shared batches.
+
+        Returns:
+            Mapping of the requested ids the backend found
+        """
+        loop = asyncio.get_running_loop()
+        group = self._groups.get(namespace)
+        if group is None:
+            group = self._groups[namespace] = _PendingGroup()
+
+        futures: Dict[str, asyncio.Future] = {}
+        for vector_id in vector_ids:
+            if vector_id in futures:
+                continue
+            self.stats["requested"] += 1
+            future = group.inflight.get(vector_id) or group.pending.get(vector_id)
+            if future is not None:
+                self.stats["deduplicated"] += 1
+            else:
+                future = group.pending[vector_id] = loop.create_future()
+                future.add_done_callback(_consume_exception)
+                if len(group.pending) >= self.max_batch:
+                    self._flush(namespace)
+            futures[vector_id] = future
+
+        if group.pending and group.timer is None:
+            group.timer = loop.call_later(self.window_ms / 1000, self._flush, namespace)
+        if not futures:
+            return {}
+
+        values = await asyncio.gather(*(asyncio.shield(f) for f in futures.values()))
+        return {
+            vector_id: value for vector_id, value in zip(futures, values) if value is not _MISSING
+        }
+
+    def forget(self, vector_ids: Iterable[str], namespace: Optional[str] = None) -> None:
+        """Stop sharing in-flight reads of ids that were just written.
+
+        Their current waiters still get the old values; later reads start a
+        new batch instead of joining a read that may predate the write.
+        """
+        group = self._groups.get(namespace)
+        if group is None:
+            return
+        for vector_id in vector_ids:
+            group.inflight.pop(vector_id, None)
+
+    def _flush(self, namespace: Optional[str]) -> None:
+        """Send the pending ids of a namespace as one backend call."""
+        group = self._groups[namespace]
+        if group.timer is not None:
+            group.timer.cancel()
+            group.timer = None
+        batch, group.pending = group.pending, {}
+        if not batch:
+            return
+        group.inflight.update(batch)
+        task = asyncio.get_running_loop().create_task(self._run(namespace, group, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self, namespace: Optional[str], group: _PendingGroup, batch: Dict[str, asyncio.Future]
+    ) -> None:
+        """Fetch a batch and resolve its futures."""
+        self.stats["calls"] += 1
+        self.stats["fetched"] += len(batch)
+        try:
+            found = await self._fetch(list(batch), namespace)
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for vector_id, future in batch.items():
+                if not future.done():
+                    future.set_result(found.get(vector_id, _MISSING))
+        finally:
+            for vector_id, future in batch.items():
+                if group.inflight.get(vector_id) is future:
+                    del group.inflight[vector_id]
+            if not group.pending and not group.inflight and group.timer is None:
+                self._groups.pop(namespace, None)
@@ -0,0 +1,336 @@
+"""Streaming namespace snapshots for ANFL Vector Store.
+
+A snapshot is a directory of fixed-size chunks. Each chunk is a float32
+``.npy`` matrix with a JSONL sidecar holding the id and metadata of every
+row, and ``manifest.json`` records the chunk list with SHA-256 checksums.
+Export and import both work one chunk at a time, so memory use depends on
+the chunk size and not on the namespace size.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .config import VectorStoreConfig
+from .db_manager import DatabaseManager
+from .exceptions import SnapshotIntegrityError
+
+logger = logging.getLogger(__name__)
+
+
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def _file_sha256(path: Path) -> str:
+    """Checksum a file in 1MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
+    """Write JSON through a temporary file so readers never see a partial file."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2, default=str))
+    os.replace(tmp, path)
+
+
+def _decode_jsonb(value: Any) -> Dict[str, Any]:
+    """Decode a JSONB column returned as text."""
+    if value is None:
+        return {}
+    if isinstance(value, str):
+        return json.loads(value)
+    return dict(value)
+
+
+class SnapshotManager:
+    """Exports and imports namespaces as chunked columnar snapshots."""
+
+    def __init__(self, config: VectorStoreConfig, db_manager: DatabaseManager):
+        """Initialize snapshot manager.
+
+        Args:
+            config: Vector store configuration
+            db_manager: Database manager instance
+        """
+        self.config = config
+        self.db_manager = db_manager
+
+    async def export_namespace(
+        self,
+        namespace: Optional[str],
+        path: Union[str, Path],
+        tier: str = "cold",
+        chunk_size: int = 2048,
+        resume: bool = True,
+    ) -> Dict[str, Any]:
+        """Stream a namespace from one storage tier into a snapshot.
+
+        Vector ids are paged from PostgreSQL in id order and each page is
+        fetched from ``tier`` with one batch read, which the database
+        manager splits into requests the backend accepts. An interrupted
+        export resumes after the last chunk recorded in the manifest.
+
+        Args:
+            namespace: Namespace to export
+            path: Snapshot directory
+            tier: Tier to read vectors from ('hot', 'warm' or 'cold')
+            chunk_size: Vectors per chunk
+            resume: Continue an incomplete export found at ``path``
+
+        Returns:
+            Snapshot manifest
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        manifest_path = path / MANIFEST_NAME
+
+        manifest = self._load_manifest(path) if manifest_path.exists() else None
+        if not (
+            resume
+            and manifest
+            and not manifest["complete"]
+            and manifest["namespace"] == namespace
+            and manifest["source_tier"] == tier
+        ):
+            manifest = {
+                "format_version": SNAPSHOT_FORMAT_VERSION,
+                "namespace": namespace,
+                "source_tier": tier,
+                "dtype": "float32",
+                "dimension": None,
+                "chunk_size": chunk_size,
+                "created_at": datetime.utcnow().isoformat(),
+                "last_vector_id": "",
+                "total_vectors": 0,
+                "missing_vectors": 0,
+                "chunks": [],
+                "complete": False,
+            }
+
+        while True:
+            page = await self._fetch_id_page(namespace, manifest["last_vector_id"], chunk_size)
+            if not page:
+                break
+
+            ids = [vector_id for vector_id, _ in page]
+            fetched = await self.db_manager.fetch_vectors(ids, tier, namespace, record_access=False)
+            rows = [
+                (vector_id, fetched[vector_id][0], meta or fetched[vector_id][1])
+                for vector_id, meta in page
+                if vector_id in fetched
+            ]
+            manifest["missing_vectors"] += len(page) - len(rows)
+            manifest["last_vector_id"] = ids[-1]
+
+            if rows:
+                chunk = self._write_chunk(path, len(manifest["chunks"]), rows)
+                manifest["dimension"] = manifest["dimension"] or chunk["dimension"]
+                if chunk["dimension"] != manifest["dimension"]:
+                    raise SnapshotIntegrityError(
+                        "Vectors of different dimensions in one namespace",
+                        str(path),
+                        {"expected": manifest["dimension"], "found": chunk["dimension"]},
+                    )
+                manifest["chunks"].append(chunk)
+                manifest["total_vectors"] += chunk["count"]
+            _write_json_atomic(manifest_path, manifest)
+
+        manifest["complete"] = True
+        _write_json_atomic(manifest_path, manifest)
+        logger.info(
+            f"Exported {manifest['total_vectors']} vectors from {tier} "
+            f"(namespace={namespace}) to {path}"
+        )
+        return manifest
+
+    async def _fetch_id_page(
+        self, namespace: Optional[str], after_vector_id: str, limit: int
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Page live vector ids and metadata of a namespace by keyset."""
+        async with self.db_manager._pg_pool.acquire() as conn:
+            records = await conn.fetch(
+                """
+                SELECT vector_id, metadata
+                FROM vector_metadata
+                WHERE namespace IS NOT DISTINCT FROM $1
+                AND NOT is_deleted
+                AND vector_id > $2
+                ORDER BY vector_id
+                LIMIT $3
+                """,
+                namespace,
+                after_vector_id,
+                limit,
+            )
+        return [(r["vector_id"], _decode_jsonb(r["metadata"])) for r in records]
+
+    def _write_chunk(
+        self, path: Path, index: int, rows: List[Tuple[str, List[float], Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Write one chunk and return its manifest entry."""
+        vectors_name = f"chunk-{index:06d}.npy"
+        metadata_name = f"chunk-{index:06d}.jsonl"
+
+        matrix = np.asarray([vector for _, vector, _ in rows], dtype=np.float32)
+        tmp = path / (vectors_name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, matrix)
+        os.replace(tmp, path / vectors_name)
+
+        tmp = path / (metadata_name + ".tmp")
+        with open(tmp, "w") as f:
+            for vector_id, _, meta in rows:
+                f.write(json.dumps({"id": vector_id, "metadata": meta}, default=str))
+                f.write("\n")
+        os.replace(tmp, path / metadata_name)
+
+        return {
+            "index": index,
+            "count": len(rows),
+            "dimension": int(matrix.shape[1]),
+            "vectors_file": vectors_name,
+            "metadata_file": metadata_name,
+            "sha256": {
+                "vectors": _file_sha256(path / vectors_name),
+                "metadata": _file_sha256(path / metadata_name),
+            },
+        }
+
+    async def import_namespace(
+        self,
+        path: Union[str, Path],
+        tiers: Optional[Sequence[str]] = None,
+        namespace: Optional[str] = None,
+        resume: bool = True,
+    ) -> Dict[str, Any]:
+        """Bulk-load a snapshot into storage tiers.
+
+        Every chunk is checksummed before it is loaded. Progress is saved to
+        a checkpoint file after each chunk, so a rerun resumes with the first
+        chunk that was not fully loaded.
+
+        Args:
+            path: Snapshot directory
+            tiers: Tiers to load ('metadata', 'hot', 'warm', 'cold');
+                defaults to every enabled tier
+            namespace: Target namespace, defaulting to the exported one
+            resume: Continue from the checkpoint if one exists
+
+        Returns:
+            Import summary
+        """
+        path = Path(path)
+        manifest = self._load_manifest(path)
+        if not manifest["complete"]:
+            raise SnapshotIntegrityError("Snapshot export did not complete", str(path))
+
+        target = manifest["namespace"] if namespace is None else namespace
+        tier_list = list(tiers or self.db_manager._enabled_tiers())
+        checkpoint_path = path / f"import-{'-'.join(tier_list)}-{target or 'default'}.checkpoint"
+        next_chunk = 0
+        if resume and checkpoint_path.exists():
+            next_chunk = json.loads(checkpoint_path.read_text())["next_chunk"]
+
+        imported = 0
+        for chunk in manifest["chunks"][next_chunk:]:
+            self.verify_chunk(path, chunk)
+            vectors = np.load(path / chunk["vectors_file"], mmap_mode="r")
+            ids, metadata = self._read_metadata(path / chunk["metadata_file"])
+
+            for start in range(0, len(ids), self.config.batch_size):
+                end = start + self.config.batch_size
+                await self.db_manager.store_vectors(
+                    list(zip(ids[start:end], vectors[start:end].tolist())),
+                    metadata[start:end],
+                    namespace=target,
+                    tiers=tier_list,
+                )
+
+            imported += chunk["count"]
+            _write_json_atomic(
+                checkpoint_path,
+                {
+                    "next_chunk": chunk["index"] + 1,
+                    "updated_at": datetime.utcnow().isoformat(),
+                },
+            )
+            logger.info(f"Imported chunk {chunk['index']} ({chunk['count']} vectors)")
+
+        return {
+            "namespace": target,
+            "tiers": tier_list,
+            "imported_vectors": imported,
+            "resumed_from_chunk": next_chunk,
+        }
+
+    def verify_chunk(self, path: Union[str, Path], chunk: Dict[str, Any]) -> None:
+        """Validate a chunk against its manifest checksums and shape.
+
+        Raises:
+            SnapshotIntegrityError: If the chunk is missing or corrupt
+        """
+        path = Path(path)
+        for kind, file_key in (("vectors", "vectors_file"), ("metadata", "metadata_file")):
+            file_path = path / chunk[file_key]
+            if not file_path.exists():
+                raise SnapshotIntegrityError(
+                    f"Missing snapshot file {chunk[file_key]}", str(path), {"chunk": chunk["index"]}
+                )
+            if _file_sha256(file_path) != chunk["sha256"][kind]:
+                raise SnapshotIntegrityError(
+                    f"Checksum mismatch for {chunk[file_key]}", str(path), {"chunk": chunk["index"]}
+                )
+
+        shape = np.load(path / chunk["vectors_file"], mmap_mode="r").shape
+        if shape != (chunk["count"], chunk["dimension"]):
+            raise SnapshotIntegrityError(
+                f"Unexpected vector block shape {shape}", str(path), {"chunk": chunk["index"]}
+            )
+
+    def verify_snapshot(self, path: Union[str, Path]) -> Dict[str, Any]:
+        """Validate every chunk of a snapshot.
+
+        Returns:
+            Snapshot manifest
+        """
+        manifest = self._load_manifest(Path(path))
+        for chunk in manifest["chunks"]:
+            self.verify_chunk(path, chunk)
+        return manifest
+
+    @staticmethod
+    def _read_metadata(path: Path) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Read the id and metadata sidecar of a chunk."""
+        ids, metadata = [], []
+        with open(path) as f:
+            for line in f:
+                row = json.loads(line)
+                ids.append(row["id"])
+                metadata.append(row["metadata"])
+        return ids, metadata
+
+    @staticmethod
+    def _load_manifest(path: Path) -> Dict[str, Any]:
+        """Load and version-check a snapshot manifest."""
+        manifest_path = path / MANIFEST_NAME
+        if not manifest_path.exists():
+            raise SnapshotIntegrityError("Snapshot manifest not found", str(path))
+        manifest = json.loads(manifest_path.read_text())
+        if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise SnapshotIntegrityError(
+                "Unsupported snapshot format",
+                str(path),
+                {"format_version": manifest.get("format_version")},
+            )
+        return manifest
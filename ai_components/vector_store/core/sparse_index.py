@@ -0,0 +1,366 @@
+"""Local BM25 index and rank fusion for ANFL Vector Store hybrid search.
+
+Postings are kept per term as delta-encoded document numbers and term
+frequencies in the smallest unsigned numpy dtype that fits. New postings are
+buffered in lists and sealed into the arrays in bulk, so incremental adds
+stay cheap. Deleted documents are masked out at query time and dropped when
+the index is compacted.
+"""
+
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import SparseIndexConfig
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9_]+")
+IDENTIFIER_PART_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms.
+
+    Identifiers such as ``getUserId`` or ``user_id`` are indexed whole and
+    also as their parts, so both exact and partial keyword queries match.
+    """
+    tokens = []
+    for word in TOKEN_PATTERN.findall(text):
+        tokens.append(word.lower())
+        parts = [
+            part.lower()
+            for piece in word.split("_")
+            for part in IDENTIFIER_PART_PATTERN.findall(piece)
+        ]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+def extract_text(metadata: Optional[Dict[str, Any]], text_field: str) -> Optional[str]:
+    """Get the indexed text from a metadata dict or its ``custom_metadata``."""
+    if not metadata:
+        return None
+    custom = metadata.get("custom_metadata")
+    if isinstance(custom, dict) and custom.get(text_field):
+        return str(custom[text_field])
+    value = metadata.get(text_field)
+    return str(value) if value else None
+
+
+def _append_compact(existing: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Append non-negative integers, widening the dtype only when needed."""
+    dtype = np.promote_types(existing.dtype, np.min_scalar_type(int(values.max())))
+    return np.concatenate((existing.astype(dtype, copy=False), values.astype(dtype)))
+
+
+class _Postings:
+    """Postings list of one term."""
+
+    __slots__ = ("deltas", "freqs", "last_doc", "pending_docs", "pending_freqs")
+
+    def __init__(self):
+        self.deltas = np.empty(0, dtype=np.uint8)
+        self.freqs = np.empty(0, dtype=np.uint8)
+        self.last_doc = 0
+        self.pending_docs: List[int] = []
+        self.pending_freqs: List[int] = []
+
+    def append(self, doc: int, freq: int) -> None:
+        """Buffer a posting. Document numbers only ever increase."""
+        self.pending_docs.append(doc)
+        self.pending_freqs.append(freq)
+
+    def seal(self) -> None:
+        """Delta-encode buffered postings into the compact arrays."""
+        if not self.pending_docs:
+            return
+        docs = np.asarray(self.pending_docs, dtype=np.int64)
+        self.deltas = _append_compact(self.deltas, np.diff(docs, prepend=self.last_doc))
+        self.freqs = _append_compact(self.freqs, np.asarray(self.pending_freqs, dtype=np.int64))
+        self.last_doc = int(docs[-1])
+        self.pending_docs = []
+        self.pending_freqs = []
+
+    def decode(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Document numbers and term frequencies, including buffered postings."""
+        docs = np.cumsum(self.deltas, dtype=np.int64)
+        freqs = self.freqs
+        if self.pending_docs:
+            docs = np.concatenate((docs, np.asarray(self.pending_docs, dtype=np.int64)))
+            freqs = np.concatenate((freqs, np.asarray(self.pending_freqs, dtype=np.int64)))
+        return docs, freqs
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the sealed arrays."""
+        return self.deltas.nbytes + self.freqs.nbytes
+
+
+class BM25Index:
+    """Incremental in-memory BM25 index over one namespace.
+
+    Safe to search from a worker thread while the event loop adds documents.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, seal_threshold: int = 4096):
+        """Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+            seal_threshold: Buffered postings before they are delta-encoded
+        """
+        self.k1 = k1
+        self.b = b
+        self.seal_threshold = seal_threshold
+        self._lock = threading.Lock()
+        self._postings: Dict[str, _Postings] = {}
+        self._doc_ids: List[str] = []
+        self._doc_numbers: Dict[str, int] = {}
+        self._lengths = np.zeros(1024, dtype=np.float32)
+        self._live = np.zeros(1024, dtype=bool)
+        self._total_length = 0.0
+        self._pending = 0
+
+    def __len__(self) -> int:
+        """Number of live documents."""
+        return len(self._doc_numbers)
+
+    def add(self, vector_id: str, text: str) -> None:
+        """Index a document, replacing any earlier version of it."""
+        with self._lock:
+            self._remove(vector_id)
+            tokens = tokenize(text)
+            if not tokens:
+                return
+
+            doc = len(self._doc_ids)
+            if doc == len(self._live):
+                self._lengths = np.concatenate((self._lengths, np.zeros_like(self._lengths)))
+                self._live = np.concatenate((self._live, np.zeros_like(self._live)))
+            self._doc_ids.append(vector_id)
+            self._doc_numbers[vector_id] = doc
+            self._lengths[doc] = len(tokens)
+            self._live[doc] = True
+            self._total_length += len(tokens)
+
+            counts = Counter(tokens)
+            for term, freq in counts.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = _Postings()
+                postings.append(doc, freq)
+            self._pending += len(counts)
+            if self._pending >= self.seal_threshold:
+                self._seal()
+
+    def remove(self, vector_ids: Iterable[str]) -> None:
+        """Drop documents from the index."""
+        with self._lock:
+            for vector_id in vector_ids:
+                self._remove(vector_id)
+            if len(self._doc_ids) > 1024 and len(self._doc_numbers) < len(self._doc_ids) // 2:
+                self._compact()
+
+    def _remove(self, vector_id: str) -> None:
+        """Mark a document dead; its postings are skipped until compaction."""
+        doc = self._doc_numbers.pop(vector_id, None)
+        if doc is not None:
+            self._live[doc] = False
+            self._total_length -= float(self._lengths[doc])
+
+    def _seal(self) -> None:
+        """Encode every buffered posting."""
+        for postings in self._postings.values():
+            postings.seal()
+        self._pending = 0
+
+    def _compact(self) -> None:
+        """Renumber live documents and rewrite postings without dead ones."""
+        count = len(self._doc_ids)
+        live = self._live[:count]
+        new_numbers = np.cumsum(live, dtype=np.int64) - 1
+
+        postings_map = {}
+        for term, postings in self._postings.items():
+            docs, freqs = postings.decode()
+            keep = live[docs]
+            if not keep.any():
+                continue
+            compacted = _Postings()
+            compacted.pending_docs = new_numbers[docs[keep]].tolist()
+            compacted.pending_freqs = freqs[keep].tolist()
+            compacted.seal()
+            postings_map[term] = compacted
+
+        self._postings = postings_map
+        self._doc_ids = [vector_id for vector_id, alive in zip(self._doc_ids, live) if alive]
+        self._doc_numbers = {vector_id: doc for doc, vector_id in enumerate(self._doc_ids)}
+        size = max(1024, 2 * len(self._doc_ids))
+        lengths = np.zeros(size, dtype=np.float32)
+        lengths[: len(self._doc_ids)] = self._lengths[:count][live]
+        self._lengths = lengths
+        self._live = np.zeros(size, dtype=bool)
+        self._live[: len(self._doc_ids)] = True
+        self._pending = 0
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """Score documents against a keyword query.
+
+        Returns:
+            (vector_id, BM25 score) pairs, best first
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            live_docs = len(self._doc_numbers)
+            if not terms or not live_docs:
+                return []
+            count = len(self._doc_ids)
+            live = self._live[:count]
+            avg_length = self._total_length / live_docs
+            norms = self.k1 * (1 - self.b + self.b * self._lengths[:count] / avg_length)
+            scores = np.zeros(count, dtype=np.float32)
+
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                docs, freqs = postings.decode()
+                keep = live[docs]
+                docs = docs[keep]
+                if not len(docs):
+                    continue
+                freqs = freqs[keep].astype(np.float32)
+                idf = math.log(1 + (live_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                scores[docs] += idf * freqs * (self.k1 + 1) / (freqs + norms[docs])
+
+            candidates = np.flatnonzero(scores)
+            if len(candidates) > top_k:
+                candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+            order = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [(self._doc_ids[doc], float(scores[doc])) for doc in order]
+
+    def stats(self) -> Dict[str, int]:
+        """Index size figures."""
+        with self._lock:
+            return {
+                "documents": len(self._doc_numbers),
+                "dead_documents": len(self._doc_ids) - len(self._doc_numbers),
+                "terms": len(self._postings),
+                "postings_bytes": sum(p.nbytes for p in self._postings.values()),
+                "pending_postings": self._pending,
+            }
+
+
+class SparseIndex:
+    """BM25 indexes for every namespace."""
+
+    def __init__(self, config: SparseIndexConfig):
+        """Initialize sparse index.
+
+        Args:
+            config: Sparse index configuration
+        """
+        self.config = config
+        self._indexes: Dict[Optional[str], BM25Index] = {}
+
+    def _index_for(self, namespace: Optional[str]) -> BM25Index:
+        """Get or create the index of a namespace."""
+        index = self._indexes.get(namespace)
+        if index is None:
+            index = self._indexes[namespace] = BM25Index(
+                self.config.k1, self.config.b, self.config.seal_threshold
+            )
+        return index
+
+    def add_documents(
+        self,
+        entries: Iterable[Tuple[str, Any, Optional[Dict[str, Any]]]],
+        namespace: Optional[str] = None,
+    ) -> int:
+        """Index the text field of (vector_id, vector, metadata) entries.
+
+        Returns:
+            int: Number of documents indexed
+        """
+        index = self._index_for(namespace)
+        added = 0
+        for vector_id, _, metadata in entries:
+            text = extract_text(metadata, self.config.text_field)
+            if text:
+                index.add(vector_id, text)
+                added += 1
+            else:
+                index.remove([vector_id])
+        return added
+
+    def remove(self, vector_ids: Iterable[str], namespace: Optional[str] = None) -> None:
+        """Drop documents from one namespace, or from all when none is given."""
+        vector_ids = list(vector_ids)
+        if namespace is not None:
+            if namespace in self._indexes:
+                self._indexes[namespace].remove(vector_ids)
+            return
+        for index in self._indexes.values():
+            index.remove(vector_ids)
+
+    def replace_namespace(self, namespace: Optional[str], source: "SparseIndex") -> None:
+        """Take over the index ``source`` holds for a namespace, or drop it if none."""
+        index = source._indexes.get(namespace)
+        if index is None:
+            self._indexes.pop(namespace, None)
+        else:
+            self._indexes[namespace] = index
+
+    def search(
+        self, query: str, top_k: int, namespace: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """Keyword search within a namespace."""
+        index = self._indexes.get(namespace)
+        return index.search(query, top_k) if index else []
+
+    def stats(self) -> Dict[Optional[str], Dict[str, int]]:
+        """Index size figures per namespace."""
+        return {namespace: index.stats() for namespace, index in self._indexes.items()}
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]], k: int = 60, weights: Optional[Sequence[float]] = None
+) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists with (weighted) reciprocal rank fusion.
+
+    Returns:
+        (vector_id, fused score) pairs, best first
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking, weight in zip(rankings, weights):
+        for rank, vector_id in enumerate(ranking, start=1):
+            scores[vector_id] += weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def weighted_score_fusion(
+    scored: Sequence[Sequence[Tuple[str, float]]], weights: Sequence[float]
+) -> List[Tuple[str, float]]:
+    """Fuse scored lists by a weighted sum of min-max normalized scores.
+
+    Every list must have higher-is-better scores.
+
+    Returns:
+        (vector_id, fused score) pairs, best first
+    """
+    fused: Dict[str, float] = defaultdict(float)
+    for results, weight in zip(scored, weights):
+        if not results:
+            continue
+        values = [score for _, score in results]
+        low, high = min(values), max(values)
+        span = high - low
+        for vector_id, score in results:
+            fused[vector_id] += weight * ((score - low) / span if span else 1.0)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,53 @@
+"""In-memory view of deleted vectors for ANFL Vector Store reads."""
+
+from typing import Iterable, Optional, Set
+
+
+class TombstoneSet:
+    """Deleted vector ids and namespaces that reads must hide.
+
+    Entries are added as soon as a delete is recorded in PostgreSQL and
+    removed once compaction has purged the vector from every layer, so the
+    set only holds the compaction backlog.
+    """
+
+    def __init__(self):
+        """Initialize an empty tombstone set."""
+        self._vectors: Set[str] = set()
+        self._namespaces: Set[Optional[str]] = set()
+
+    def __len__(self) -> int:
+        """Number of tombstoned vectors."""
+        return len(self._vectors)
+
+    def __bool__(self) -> bool:
+        """Whether anything is tombstoned."""
+        return bool(self._vectors or self._namespaces)
+
+    def add(self, vector_ids: Iterable[str]) -> None:
+        """Tombstone vectors."""
+        self._vectors.update(vector_ids)
+
+    def discard(self, vector_ids: Iterable[str]) -> None:
+        """Forget tombstones, after compaction or when a vector is stored again."""
+        self._vectors.difference_update(vector_ids)
+
+    def add_namespace(self, namespace: Optional[str]) -> None:
+        """Tombstone a whole namespace while it is being purged."""
+        self._namespaces.add(namespace)
+
+    def discard_namespace(self, namespace: Optional[str]) -> None:
+        """Forget a namespace tombstone once the purge has finished."""
+        self._namespaces.discard(namespace)
+
+    def is_namespace_deleted(self, namespace: Optional[str]) -> bool:
+        """Whether a namespace is being purged."""
+        return namespace in self._namespaces
+
+    def is_deleted(self, vector_id: str, namespace: Optional[str] = None) -> bool:
+        """Whether a vector is tombstoned."""
+        return vector_id in self._vectors or namespace in self._namespaces
+
+    def replace(self, vector_ids: Iterable[str]) -> None:
+        """Replace the vector tombstones with a fresh snapshot from PostgreSQL."""
+        self._vectors = set(vector_ids)
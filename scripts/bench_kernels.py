@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# File: bench_kernels.py
+# Location: /Volumes/mattstack/VSCode/AeonNovaFutureLabs/scripts/
+#
+# Purpose: Benchmark the vector store distance kernels
+# Security Level: Confidential
+# Owner: Infrastructure Team
+# Version: 1.0
+# Last Modified: 2025-02-08
+# ----------------------------------------------------------------------------
+
+"""Time the distance kernels against naive NumPy.
+
+Compares ``VectorMatrix`` with the straightforward NumPy expression for
+each metric and storage dtype. Edge-case behaviour is covered by
+tests/test_kernels.py.
+
+    python scripts/bench_kernels.py --rows 100000 --dimension 3072 --queries 16
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_components.vector_store.core.kernels import VectorMatrix  # noqa: E402
+
+
+def timed(fn: Callable[[], object], repeat: int) -> float:
+    """Best wall time of ``fn`` in milliseconds."""
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run_benchmark(rows: int, dimension: int, query_count: int, repeat: int) -> None:
+    """Time kernels against naive NumPy for each dtype and metric."""
+    rng = np.random.default_rng(1)
+    base = rng.normal(size=(rows, dimension)).astype(np.float32)
+    queries = rng.normal(size=(query_count, dimension)).astype(np.float32)
+    print(f"{rows} rows x {dimension} dims, {query_count} queries, best of {repeat}")
+    print(
+        f"{'dtype':<9}{'metric':<12}{'naive ms':>10}{'kernel ms':>11}{'top_k ms':>10}{'speedup':>9}"
+    )
+
+    for dtype in (np.float32, np.float16, np.int8):
+        stored = (
+            base
+            if dtype == np.float32
+            else (
+                base.astype(np.float16)
+                if dtype == np.float16
+                else np.clip(np.round(base * 40), -127, 127).astype(np.int8)
+            )
+        )
+        matrix = VectorMatrix(stored)
+        # Norms are cached per stored matrix, so keep them out of the timings
+        matrix.norms
+        out = np.empty((query_count, rows), dtype=np.float32)
+        naive = {
+            "dotproduct": lambda: queries @ stored.astype(np.float32).T,
+            "cosine": lambda: (queries @ stored.astype(np.float32).T)
+            / np.outer(
+                np.linalg.norm(queries, axis=1), np.linalg.norm(stored.astype(np.float32), axis=1)
+            ),
+            "euclidean": lambda: [
+                np.linalg.norm(stored.astype(np.float32) - query, axis=1) for query in queries
+            ],
+        }
+        for metric, reference in naive.items():
+            naive_ms = timed(reference, repeat)
+            kernel_ms = timed(lambda: matrix.scores(queries, metric, out), repeat)
+            top_ms = timed(lambda: matrix.top_k(queries, 10, metric), repeat)
+            print(
+                f"{np.dtype(dtype).name:<9}{metric:<12}{naive_ms:>10.1f}{kernel_ms:>11.1f}"
+                f"{top_ms:>10.1f}{naive_ms / kernel_ms:>9.2f}"
+            )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--dimension", type=int, default=3072)
+    parser.add_argument("--queries", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.dimension, args.queries, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# File: bench_moe_batching.py
+# Location: /Volumes/mattstack/VSCode/AeonNovaFutureLabs/scripts/
+#
+# Purpose: Throughput and latency of MoE expert micro-batching under load
+# Security Level: Confidential
+# Owner: Infrastructure Team
+# Version: 1.0
+# Last Modified: 2025-02-08
+# ----------------------------------------------------------------------------
+
+"""Throughput-vs-latency curves for per-expert micro-batching.
+
+A synthetic expert (a dense layer of input_dim x hidden_dim plus a fixed
+per-call overhead) is driven open-loop with Poisson arrivals at each
+request rate, once per batch size. Batch size 1 is the unbatched baseline.
+
+    python scripts/bench_moe_batching.py --rates 200 500 1000 2000 --batch-sizes 1 8 32
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_components.models.moe.batching import ExpertBatcher  # noqa: E402
+from ai_components.models.moe.config import ExpertConfig  # noqa: E402
+from ai_components.models.moe.exceptions import ExpertTimeoutError  # noqa: E402
+
+
+def make_forward(input_dim: int, hidden_dim: int, overhead_ms: float):
+    """Synthetic batched forward pass."""
+    weights = np.random.default_rng(0).normal(size=(input_dim, hidden_dim)).astype(np.float32)
+
+    def forward(inputs: List[np.ndarray]) -> List[np.ndarray]:
+        if overhead_ms:
+            time.sleep(overhead_ms / 1000)
+        return list(np.tanh(np.stack(inputs) @ weights))
+
+    return forward
+
+
+async def run_load(
+    batcher: ExpertBatcher, rate: float, duration: float, input_dim: int
+) -> Dict[str, Any]:
+    """Drive the batcher at ``rate`` requests per second for ``duration`` seconds."""
+    rng = np.random.default_rng(1)
+    sample = rng.normal(size=input_dim).astype(np.float32)
+    loop = asyncio.get_running_loop()
+    latencies: List[float] = []
+    rejected = 0
+
+    async def one() -> None:
+        nonlocal rejected
+        started = loop.time()
+        try:
+            await batcher.submit(sample)
+        except ExpertTimeoutError:
+            rejected += 1
+            return
+        latencies.append((loop.time() - started) * 1000)
+
+    tasks = []
+    started = loop.time()
+    next_at = started
+    while next_at - started < duration:
+        next_at += rng.exponential(1 / rate)
+        delay = next_at - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(loop.create_task(one()))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - started
+
+    batches = batcher.stats["batches"]
+    return {
+        "offered": len(tasks) / elapsed,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)) if latencies else 0.0,
+        "p99_ms": float(np.percentile(latencies, 99)) if latencies else 0.0,
+        "mean_batch": batcher.stats["processed"] / batches if batches else 0.0,
+        "rejected": rejected / len(tasks) if tasks else 0.0,
+    }
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    forward = make_forward(args.input_dim, args.hidden_dim, args.overhead_ms)
+    print(
+        f"dense {args.input_dim}x{args.hidden_dim}, {args.overhead_ms}ms per call, "
+        f"linger {args.linger_ms}ms, timeout {args.timeout_ms}ms, {args.duration}s per point"
+    )
+    print(
+        f"{'batch':>6}{'offered':>9}{'served/s':>10}{'p50 ms':>9}{'p99 ms':>9}"
+        f"{'mean batch':>12}{'rejected':>10}"
+    )
+    for batch_size in args.batch_sizes:
+        for rate in args.rates:
+            expert = ExpertConfig(
+                name="bench",
+                model_type="dense",
+                specialization=["general_purpose"],
+                batch_size=batch_size,
+                timeout_ms=args.timeout_ms,
+                linger_ms=args.linger_ms,
+            )
+            batcher = ExpertBatcher(expert, forward)
+            await batcher.start()
+            row = await run_load(batcher, rate, args.duration, args.input_dim)
+            await batcher.close()
+            print(
+                f"{batch_size:>6}{row['offered']:>9.0f}{row['throughput']:>10.0f}"
+                f"{row['p50_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['mean_batch']:>12.1f}"
+                f"{row['rejected']:>10.1%}"
+            )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rates", type=float, nargs="+", default=[100, 500, 1000, 2000, 4000])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--input-dim", type=int, default=768)
+    parser.add_argument("--hidden-dim", type=int, default=3072)
+    parser.add_argument(
+        "--overhead-ms", type=float, default=0.5, help="Fixed cost per forward call"
+    )
+    parser.add_argument("--linger-ms", type=float, default=2.0)
+    parser.add_argument("--timeout-ms", type=float, default=200.0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
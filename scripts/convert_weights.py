@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# File: convert_weights.py
+# Location: /Volumes/mattstack/VSCode/AeonNovaFutureLabs/scripts/
+#
+# Purpose: Convert model checkpoints into memory-mappable weight files
+# Security Level: Confidential
+# Owner: Infrastructure Team
+# Version: 1.0
+# Last Modified: 2025-02-08
+# ----------------------------------------------------------------------------
+
+"""Convert a checkpoint into a memory-mappable safetensors file or .npy directory.
+
+Reads .npz, .npy, .safetensors and PyTorch .pt/.pth/.bin state dicts (the
+latter need torch), writes the target, and checks that every tensor maps
+back unchanged.
+
+    python scripts/convert_weights.py model.pt models/expert/model.safetensors
+    python scripts/convert_weights.py weights.npz models/expert/weights --format npy
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_components.models.weights import (  # noqa: E402
+    convert_checkpoint,
+    load_weights,
+    read_checkpoint,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("source", type=Path, help="Existing checkpoint")
+    parser.add_argument("target", type=Path, help="Output .safetensors file or .npy directory")
+    parser.add_argument("--format", choices=["safetensors", "npy"], default="safetensors")
+    parser.add_argument(
+        "--no-verify", action="store_true", help="Skip comparing the output with the source"
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    target = convert_checkpoint(
+        args.source, args.target, args.format, metadata={"source": args.source.name}
+    )
+    weights = load_weights(target)
+    print(
+        f"Wrote {len(weights)} tensors, {weights.nbytes / 2 ** 20:.1f} MiB, to {target} "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+    if not args.no_verify:
+        source = read_checkpoint(args.source)
+        mismatched = [
+            name
+            for name, tensor in source.items()
+            if name not in weights
+            or not np.array_equal(weights[name], tensor.astype(weights[name].dtype, copy=False))
+        ]
+        if mismatched:
+            print(f"FAILED: {len(mismatched)} tensors differ, e.g. {mismatched[:5]}")
+            return 1
+        print("Verified: every tensor maps back unchanged")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
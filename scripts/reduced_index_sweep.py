@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# File: reduced_index_sweep.py
+# Location: /Volumes/mattstack/VSCode/AeonNovaFutureLabs/scripts/
+#
+# Purpose: Sweep reduced-index settings against recall and latency
+# Security Level: Confidential
+# Owner: Infrastructure Team
+# Version: 1.0
+# Last Modified: 2025-02-08
+# ----------------------------------------------------------------------------
+
+"""Pick two-stage search settings for a namespace.
+
+Reads vectors from a namespace snapshot directory (see SnapshotManager) or a
+single .npy matrix, holds out a set of them as queries, and reports recall
+and latency for every target dimension and candidate multiplier.
+
+    python scripts/reduced_index_sweep.py --snapshot /data/snapshots/docs \\
+        --dimensions 128 256 512 --multipliers 4 8 16
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_components.vector_store.core.reduced_index import sweep_reduced_search  # noqa: E402
+
+
+def load_vectors(args: argparse.Namespace) -> np.ndarray:
+    """Load the vectors to sweep over."""
+    if args.npy:
+        return np.load(args.npy).astype(np.float32)
+    path = Path(args.snapshot)
+    manifest = json.loads((path / "manifest.json").read_text())
+    chunks = []
+    loaded = 0
+    for chunk in manifest["chunks"]:
+        chunks.append(np.load(path / chunk["vectors_file"]))
+        loaded += chunk["count"]
+        if args.limit and loaded >= args.limit:
+            break
+    vectors = np.concatenate(chunks).astype(np.float32)
+    return vectors[: args.limit] if args.limit else vectors
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--snapshot", help="Snapshot directory of one namespace")
+    source.add_argument("--npy", help=".npy matrix of vectors")
+    parser.add_argument("--limit", type=int, default=0, help="Use at most this many vectors")
+    parser.add_argument("--queries", type=int, default=200, help="Vectors held out as queries")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--method", choices=("pca", "prefix"), default="pca")
+    parser.add_argument("--metric", choices=("cosine", "dotproduct", "euclidean"), default="cosine")
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[64, 128, 256, 512])
+    parser.add_argument("--multipliers", type=int, nargs="+", default=[2, 4, 8, 16])
+    parser.add_argument("--fit-size", type=int, default=4096)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    vectors = load_vectors(args)
+    order = np.random.default_rng(0).permutation(len(vectors))
+    queries = vectors[order[: args.queries]]
+    base = vectors[order[args.queries :]]
+
+    report = sweep_reduced_search(
+        base,
+        queries,
+        top_k=args.top_k,
+        dimensions=args.dimensions,
+        multipliers=args.multipliers,
+        method=args.method,
+        metric=args.metric,
+        fit_size=args.fit_size,
+    )
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(
+        f"{len(base)} vectors, {len(queries)} queries, "
+        f"dimension {vectors.shape[1]}, top_k {args.top_k}"
+    )
+    print(
+        f"{'method':<8}{'dim':>6}{'mult':>6}{'recall':>9}{'stage1 ms':>11}{'rerank ms':>11}"
+        f"{'total ms':>10}{'speedup':>9}"
+    )
+    for row in report:
+        print(
+            f"{row['method']:<8}{row['dimension']:>6}{row['candidate_multiplier'] or '-':>6}"
+            f"{row['recall']:>9.3f}{row['first_stage_ms']:>11.3f}{row['rerank_ms']:>11.3f}"
+            f"{row['total_ms']:>10.3f}{row['speedup']:>9.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
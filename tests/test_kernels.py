@@ -0,0 +1,115 @@
+"""Edge cases of the vector store distance kernels."""
+
+import numpy as np
+import pytest
+
+from ai_components.vector_store.core.kernels import (
+    VectorMatrix,
+    cosine,
+    cosine_batch,
+    dot,
+    l2,
+    l2_batch,
+)
+
+
+def naive_scores(queries: np.ndarray, vectors: np.ndarray, metric: str) -> np.ndarray:
+    """Reference scores computed the obvious way in float64."""
+    q = queries.astype(np.float64)
+    x = vectors.astype(np.float64)
+    if metric == "dotproduct":
+        return q @ x.T
+    if metric == "euclidean":
+        return ((q[:, None, :] - x[None, :, :]) ** 2).sum(axis=2)
+    qn = np.linalg.norm(q, axis=1)[:, None]
+    xn = np.linalg.norm(x, axis=1)[None, :]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = (q @ x.T) / (qn * xn)
+    scores[(qn * xn) == 0] = 0.0
+    return scores
+
+
+@pytest.fixture
+def queries() -> np.ndarray:
+    return np.random.default_rng(0).normal(size=(5, 33)).astype(np.float32)
+
+
+@pytest.fixture
+def vectors() -> np.ndarray:
+    return np.random.default_rng(1).normal(size=(301, 33)).astype(np.float32)
+
+
+@pytest.mark.parametrize("metric", ["cosine", "dotproduct", "euclidean"])
+def test_scores_match_reference(queries, vectors, metric):
+    matrix = VectorMatrix(vectors, block_rows=64)
+    expected = naive_scores(queries, vectors, metric)
+    assert np.allclose(matrix.scores(queries, metric), expected, atol=1e-4)
+
+    indices, _ = matrix.top_k(queries, 7, metric)
+    order = np.argsort(expected if metric == "euclidean" else -expected, axis=1)[:, :7]
+    assert np.array_equal(indices, order)
+
+
+def test_zero_vectors(vectors):
+    zero = np.zeros(33, dtype=np.float32)
+    assert cosine(zero, vectors[0]) == 0.0
+    assert cosine(zero, zero) == 0.0
+    assert dot(zero, vectors[0]) == 0.0
+    assert l2(vectors[0], vectors[0]) == 0.0
+    assert np.allclose(np.diag(l2_batch(vectors, vectors)), 0.0, atol=1e-4)
+
+
+def test_nan_propagates_to_its_row_only(queries, vectors):
+    with_nan = vectors.copy()
+    with_nan[3, 5] = np.nan
+    scores = cosine_batch(queries, with_nan)
+    assert np.isnan(scores[:, 3]).all()
+    assert not np.isnan(np.delete(scores, 3, axis=1)).any()
+    assert np.isnan(l2_batch(np.full((1, 33), np.nan), vectors)).all()
+
+
+def test_nan_ranks_last(queries, vectors):
+    with_nan = vectors.copy()
+    with_nan[3, 5] = np.nan
+    indices, _ = VectorMatrix(with_nan, block_rows=64).top_k(queries, 301, "cosine")
+    assert (indices[:, -1] == 3).all()
+
+
+def test_float16_storage(queries, vectors):
+    half = vectors.astype(np.float16)
+    assert np.allclose(
+        cosine_batch(queries, half), naive_scores(queries, half, "cosine"), atol=1e-3
+    )
+
+
+def test_int8_storage(queries, vectors):
+    quantized = np.clip(np.round(vectors * 40), -127, 127).astype(np.int8)
+    assert np.allclose(
+        VectorMatrix(quantized, block_rows=64).dot(queries),
+        naive_scores(queries, quantized, "dotproduct"),
+        rtol=1e-4,
+        atol=1e-2,
+    )
+
+
+def test_mixed_dtypes(queries, vectors):
+    assert np.allclose(
+        cosine_batch(queries.astype(np.float16), vectors.astype(np.float64)),
+        naive_scores(queries.astype(np.float16), vectors, "cosine"),
+        atol=1e-3,
+    )
+
+
+def test_out_buffer_is_reused(queries, vectors):
+    out = np.empty((5, 301), dtype=np.float32)
+    assert VectorMatrix(vectors, block_rows=64).cosine(queries, out) is out
+
+
+def test_norms_follow_updates(vectors):
+    matrix = VectorMatrix(vectors.copy(), block_rows=64)
+    matrix.norms
+    matrix.update_rows([0, 7], np.ones((2, 33)))
+    matrix.append(np.random.default_rng(2).normal(size=(4, 33)))
+    assert np.allclose(
+        matrix.norms, np.linalg.norm(matrix.data.astype(np.float64), axis=1), rtol=1e-5
+    )